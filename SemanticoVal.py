@@ -2,54 +2,110 @@ from antlr4 import *
 from LenParser import LenParser
 from LenListener import LenListener
 from collections import deque
+from diagnosticos import ColectorDiagnosticos, Diagnostico, desde_contexto, posicion
+from cfg_len import garantiza_retorno
+from simbolos import Simbolo, mapear_tipo
+
+
+_COMPARACIONES = frozenset(("<", ">", "<=", ">=", "==", "!="))
+_LOGICOS = frozenset(("&&", "||"))
+_ARITMETICOS = frozenset(("+", "-", "*", "/", "^", "%"))
+
 
 class SemanticError(Exception):
-    pass
+    def __init__(self, mensaje, errores=None):
+        super().__init__(mensaje)
+        # Todos los errores del análisis (uno solo salvo con max_errores distinto de 1)
+        self.errores = errores or [mensaje]
 
 class Scope:
     def __init__(self):
-        self.variables = {}
+        self.variables = {}     # nombre -> Simbolo, en orden de declaración
         self.functions = {}
 
 class SemanticListener(LenListener):
-    def __init__(self):
+    def __init__(self, imprimir_avisos=True, max_errores=1, diagnosticos=None):
+        # Errores y advertencias se registran en `diagnosticos` (ColectorDiagnosticos) y en
+        # self.errors / self.warnings como texto; las advertencias se imprimen juntas al final
+        # del recorrido (emitir_avisos), y con imprimir_avisos=False no se imprimen.
+        # `max_errores`: 1 corta en el primer error (como siempre); con N > 1 los errores se
+        # acumulan y el recorrido sigue hasta juntar N; None o 0 = sin límite
+        self.imprimir_avisos = imprimir_avisos
+        self.max_errores = max_errores or None
+        self._acumular = self.max_errores != 1
+        # Variables no declaradas ya reportadas: sus usos siguientes tienen tipo "error" sin repetir el aviso
+        self._no_declaradas = set()
+        # Tipo ya inferido de cada nodo de expresión: cada subárbol se tipa (y marca sus lecturas) una vez
+        self._tipos = {}
+        # Conversiones implícitas que aceptan las reglas (contexto -> tipo destino), para anotar el AST
+        self._conversiones = {}
         self.scopes = deque([Scope()])
+        # Símbolos visibles por nombre: pila de declaraciones que se sombrean (la última es la
+        # visible), así cada uso se resuelve sin recorrer los ámbitos
+        self._visibles = {}
+        # Símbolo al que quedó ligada cada declaración y cada uso (contexto -> Simbolo)
+        self._enlaces = {}
         self.current_function_return_type = None
         self.called_functions = set()
         self.errors = []
         self.warnings = []
+        self.diagnosticos = diagnosticos if diagnosticos is not None else ColectorDiagnosticos()
+        # Reglas por clase de contexto, en lugar de sondear hasattr/getText/nombres de clase en cada nodo
+        self._reglas_tipo = {
+            LenParser.NumeroContext: lambda ctx: "decimal" if '.' in ctx.NUMERO().getText() else "entero",
+            LenParser.BooleanoContext: lambda ctx: "bool",
+            LenParser.TextoContext: lambda ctx: "cadena",
+            LenParser.VariableContext: lambda ctx: self._resolve_variable_type(ctx, ctx.ID().getText()),
+            LenParser.AsignacionExpContext: lambda ctx: self._resolve_variable_type(ctx, ctx.ID().getText()),
+            LenParser.ParentesisContext: lambda ctx: self._infer_expr_type(ctx.expr()),
+            LenParser.LlamadaFuncionContext: self._tipo_llamada,
+            LenParser.OpLogicaORContext: self._tipo_binario,
+            LenParser.OpLogicaANDContext: self._tipo_binario,
+            LenParser.OpIgualdadDiferenciaContext: self._tipo_binario,
+            LenParser.OpComparacionContext: self._tipo_binario,
+            LenParser.OpSumaRestaContext: self._tipo_binario,
+            LenParser.OpMultDivContext: self._tipo_binario,
+            LenParser.OpPotenciaContext: self._tipo_binario,
+            LenParser.OpUnarioNotContext: self._tipo_not,
+            LenParser.OpUnarioPositivoContext: self._tipo_signo,
+            LenParser.OpUnarioNegativoContext: self._tipo_signo,
+        }
 
     def _map_type(self, raw_type):
-        t = raw_type.lower()
-        if t in ["int", "entero"]: return "entero"
-        if t in ["flt", "decimal"]: return "decimal"
-        if t in ["str", "cadena"]: return "cadena"
-        if t in ["bool", "bol"]: return "bool"
-        if t in ["void", "vd"]: return "void"
-        return t
+        return mapear_tipo(raw_type)
 
     def _is_compatible_assignment(self, declared, actual):
-        if declared == actual:
+        # "error" es el tipo de recuperación: ya se reportó y no genera errores en cascada
+        if declared == actual or "error" in (declared, actual):
             return True
         if declared == "decimal" and actual == "entero":
             return True
         return False
 
+    def _cerrar_ambito(self):
+        scope = self.scopes.pop()
+        for name in scope.variables:
+            pila = self._visibles[name]
+            pila.pop()
+            if not pila:
+                del self._visibles[name]
+        return scope
+
     def enterBloque(self, ctx: LenParser.BloqueContext):
         self.scopes.append(Scope())
 
     def exitBloque(self, ctx: LenParser.BloqueContext):
-        scope = self.scopes.pop()
-        for name, meta in scope.variables.items():
-            if not meta.get("read", False) and not meta.get("assigned", False):
-                self._warn(meta.get("ctx", ctx), f"La variable '{name}' fue declarada pero nunca utilizada en este bloque.")
-            elif meta.get("assigned", False) and not meta.get("read", False):
-                self._warn(meta.get("ctx", ctx), f"La variable '{name}' fue asignada pero nunca leída en este bloque.")
+        scope = self._cerrar_ambito()
+        for name, simbolo in scope.variables.items():
+            if not simbolo.leida and not simbolo.asignada:
+                self._warn_simbolo(simbolo, f"La variable '{name}' fue declarada pero nunca utilizada en este bloque.", "variable-sin-uso")
+            elif simbolo.asignada and not simbolo.leida:
+                self._warn_simbolo(simbolo, f"La variable '{name}' fue asignada pero nunca leída en este bloque.", "variable-sin-leer")
         if len(self.scopes) == 0:
             for scope in self.scopes:
                 for name in scope.functions:
                     if name not in self.called_functions:
-                        self._warn(ctx, f"La función '{name}' fue definida pero nunca llamada.")
+                        self._warn(ctx, f"La función '{name}' fue definida pero nunca llamada.", "funcion-sin-llamar")
 
     def enterLOPSentencia(self, ctx: LenParser.LOPSentenciaContext):
         try:
@@ -58,11 +114,14 @@ class SemanticListener(LenListener):
                 expr_ctx = expr_ctx[0]
             inferred = self._infer_expr_type(expr_ctx)
             cond_type = self._map_type(inferred)
-        except Exception:
+        except Exception as e:
+            # Al acumular, un error ya registrado (límite alcanzado) no se convierte en otro
+            if self._acumular and isinstance(e, SemanticError):
+                raise
             cond_type = "entero"
 
-        if cond_type != "bool":
-            self._error(ctx.expr(), f"La condición en un 'loop' debe ser de tipo 'bool'. Actualmente es '{cond_type}'.")
+        if cond_type not in ("bool", "error"):
+            self._error(ctx.expr(), f"La condición en un 'loop' debe ser de tipo 'bool'. Actualmente es '{cond_type}'.", "condicion-no-bool")
 
     def enterParaSentencia(self, ctx: LenParser.ParaSentenciaContext):
         try:
@@ -70,12 +129,14 @@ class SemanticListener(LenListener):
             if len(exprs) >= 2:
                 cond_expr = exprs[1]
                 cond_type = self._map_type(self._infer_expr_type(cond_expr))
-                if cond_type != "bool":
-                    self._error(cond_expr, f"La condición en un ciclo 'para' debe ser de tipo 'bool'. Actualmente es '{cond_type}'.")
+                if cond_type not in ("bool", "error"):
+                    self._error(cond_expr, f"La condición en un ciclo 'para' debe ser de tipo 'bool'. Actualmente es '{cond_type}'.", "condicion-no-bool")
             else:
-                self._warn(ctx, "El ciclo 'para' no tiene una condición explícita. Se ejecutará como bucle infinito si no hay control.")
+                self._warn(ctx, "El ciclo 'para' no tiene una condición explícita. Se ejecutará como bucle infinito si no hay control.", "para-sin-condicion")
         except Exception as e:
-            self._error(ctx, f"Error al validar la condición del ciclo 'para': {e}")
+            if self._acumular and isinstance(e, SemanticError):
+                raise
+            self._error(ctx, f"Error al validar la condición del ciclo 'para': {e}", "condicion-invalida")
 
     def enterFuncionDef(self, ctx: LenParser.FuncionDefContext):
         scope = self.scopes[-1]
@@ -94,20 +155,31 @@ class SemanticListener(LenListener):
         _, params = scope.functions[name]
         self.current_function_return_type = return_type
         self.scopes.append(Scope())
-        for ident, tipo in params:
-            self._declare_variable(ctx, ident, tipo)
+        param_ctxs = ctx.params().param() if ctx.params() and hasattr(ctx.params(), "param") else []
+        for i, (ident, tipo) in enumerate(params):
+            simbolo = self._declare_variable(ctx, ident, tipo)
+            if i < len(param_ctxs):
+                self._enlaces[param_ctxs[i]] = simbolo
 
     def exitFuncionDef(self, ctx: LenParser.FuncionDefContext):
-        self.scopes.pop()
+        self._cerrar_ambito()
         if self.current_function_return_type != "void":
-            if not self._has_guaranteed_return(ctx.bloque()):
-                self._error(ctx, f"La función '{ctx.ID().getText()}' de tipo '{self.current_function_return_type}' no garantiza un retorno en todos los caminos posibles.")
+            # Grafo de flujo del cuerpo: falta un retorno si algún camino llega al final sin 'ret'
+            try:
+                cuerpo = self._cuerpo_ast(ctx.bloque())
+            except Exception:
+                # Solo un cuerpo con errores ya reportados (p. ej. 'aut x;') puede quedar sin AST
+                if not self.errors:
+                    raise
+                cuerpo = None
+            if cuerpo is not None and not garantiza_retorno(cuerpo):
+                self._error(ctx, f"La función '{ctx.ID().getText()}' de tipo '{self.current_function_return_type}' no garantiza un retorno en todos los caminos posibles.", "retorno-faltante")
         self.current_function_return_type = None
 
     def exitDeclaracionGlobalSimple(self, ctx: LenParser.DeclaracionGlobalSimpleContext):
         tipo = self._map_type(ctx.tipo().getText())
         ident = ctx.ID().getText()
-        self._declare_variable(ctx, ident, tipo)
+        self._enlaces[ctx] = self._declare_variable(ctx, ident, tipo)
 
     def exitDeclaracionSimple(self, ctx: LenParser.DeclaracionSimpleContext):
         tipo = self._map_type(ctx.tipo().getText())
@@ -115,18 +187,20 @@ class SemanticListener(LenListener):
         expr_type = self._map_type(self._infer_expr_type(ctx.expr())) if ctx.expr() else None
 
         if expr_type and not self._is_compatible_assignment(tipo, expr_type):
-            self._error(ctx, f"Incompatibilidad de tipos en inicialización de '{ident}': se declaró como '{tipo}' pero se asignó valor de tipo '{expr_type}'.")
+            self._error(ctx, f"Incompatibilidad de tipos en inicialización de '{ident}': se declaró como '{tipo}' pero se asignó valor de tipo '{expr_type}'.", "tipo-incompatible")
+        elif expr_type:
+            self._registrar_conversion(ctx.expr(), expr_type, tipo)
 
-        self._declare_variable(ctx, ident, tipo)
+        self._enlaces[ctx] = self._declare_variable(ctx, ident, tipo)
         if ctx.expr():
             self._mark_assigned(ident)
 
     def exitDeclaracionInferida(self, ctx: LenParser.DeclaracionInferidaContext):
         ident = ctx.ID().getText()
         if not ctx.expr():
-            self._error(ctx, f"La variable '{ident}' declarada con inferencia requiere una expresión para deducir su tipo.")
+            self._error(ctx, f"La variable '{ident}' declarada con inferencia requiere una expresión para deducir su tipo.", "inferencia-sin-expresion")
         tipo = self._map_type(self._infer_expr_type(ctx.expr()))
-        self._declare_variable(ctx, ident, tipo)
+        self._enlaces[ctx] = self._declare_variable(ctx, ident, tipo)
         self._mark_assigned(ident)
 
     def exitAsignacionExp(self, ctx: LenParser.AsignacionExpContext):
@@ -135,116 +209,144 @@ class SemanticListener(LenListener):
         var_type = self._resolve_variable_type(ctx, name)
 
         if not self._is_compatible_assignment(var_type, expr_type):
-            self._error(ctx, f"Incompatibilidad de tipos en asignación a '{name}': tipo esperado '{var_type}', recibido '{expr_type}'.")
+            self._error(ctx, f"Incompatibilidad de tipos en asignación a '{name}': tipo esperado '{var_type}', recibido '{expr_type}'.", "tipo-incompatible")
+        else:
+            self._registrar_conversion(ctx.asignacion(), expr_type, var_type)
 
         self._mark_assigned(name)
 
     def exitMOSTRARSentencia(self, ctx: LenParser.MOSTRARSentenciaContext):
         if ctx.args():
             for expr in ctx.args().expr():
+                # La inferencia marca como leídas las variables de la expresión
                 self._infer_expr_type(expr)
-                self._marcar_leidas(expr)
-
-    def _marcar_leidas(self, ctx):
-        if hasattr(ctx, "ID") and ctx.ID():
-            name = ctx.ID().getText()
-            for scope in reversed(self.scopes):
-                if name in scope.variables:
-                    scope.variables[name]["read"] = True
-                    return
-            if name in self.scopes[0].functions:
-                return
-            self._error(ctx, f"La variable '{name}' fue usada pero no ha sido declarada en ningún ámbito visible.")
-        for i in range(ctx.getChildCount()):
-            child = ctx.getChild(i)
-            if isinstance(child, ParserRuleContext):
-                self._marcar_leidas(child)
 
     def check_funciones_no_usadas(self):
         for scope in self.scopes:
             for name in scope.functions:
                 if name not in self.called_functions:
                     ctx = scope.functions[name][2] if len(scope.functions[name]) > 2 else None
-                    self._warn(ctx, f"La función '{name}' fue declarada pero no se utilizó en ninguna parte del programa.")
+                    self._warn(ctx, f"La función '{name}' fue declarada pero no se utilizó en ninguna parte del programa.", "funcion-sin-llamar")
 
     def exitRetornarSentencia(self, ctx: LenParser.RetornarSentenciaContext):
         if self.current_function_return_type is None:
-            self._error(ctx, "Uso inválido de 'ret': esta sentencia solo puede estar dentro de una función.")
-        
+            self._error(ctx, "Uso inválido de 'ret': esta sentencia solo puede estar dentro de una función.", "retorno-fuera-de-funcion")
+            return
+
         expr_type = "void"
         if ctx.expr():
             expr_type = self._map_type(self._infer_expr_type(ctx.expr()))
-            self._marcar_leidas(ctx.expr())
 
-        if expr_type != self.current_function_return_type:
-            self._error(ctx, f"Tipo de retorno inválido: la función espera '{self.current_function_return_type}', pero se está retornando '{expr_type}'.")
+        if expr_type != self.current_function_return_type and expr_type != "error":
+            self._error(ctx, f"Tipo de retorno inválido: la función espera '{self.current_function_return_type}', pero se está retornando '{expr_type}'.", "tipo-retorno")
 
     def _declare_variable(self, ctx, name, tipo):
-        if name in self.scopes[-1].variables:
-            self._error(ctx, f"La variable '{name}' ya fue declarada en este mismo bloque.")
-        self.scopes[-1].variables[name] = {"type": tipo, "assigned": False, "read": False, "ctx": ctx}
+        scope = self.scopes[-1]
+        anterior = scope.variables.get(name)
+        if anterior is not None:
+            self._error(ctx, f"La variable '{name}' ya fue declarada en este mismo bloque.", "variable-duplicada")
+        # Una redeclaración en el mismo bloque reemplaza a la anterior (mismo slot)
+        slot = anterior.slot if anterior is not None else len(scope.variables)
+        simbolo = Simbolo(name, tipo, len(self.scopes) - 1, slot, *posicion(ctx))
+        scope.variables[name] = simbolo
+        pila = self._visibles.setdefault(name, [])
+        if anterior is not None:
+            pila[-1] = simbolo
+        else:
+            pila.append(simbolo)
+        return simbolo
 
     def _mark_assigned(self, name):
-        for scope in reversed(self.scopes):
-            if name in scope.variables:
-                scope.variables[name]["assigned"] = True
-                return
+        pila = self._visibles.get(name)
+        if pila:
+            pila[-1].asignada = True
 
     def _resolve_variable_type(self, ctx, name):
-        for scope in reversed(self.scopes):
-            if name in scope.variables:
-                scope.variables[name]["read"] = True
-                return scope.variables[name]["type"]
-        self._error(ctx, f"La variable '{name}' no fue declarada antes de su uso.")
+        pila = self._visibles.get(name)
+        if pila:
+            simbolo = pila[-1]
+            simbolo.leida = True
+            self._enlaces[ctx] = simbolo
+            return simbolo.tipo
+        if name not in self._no_declaradas:
+            self._no_declaradas.add(name)
+            self._error(ctx, f"La variable '{name}' no fue declarada antes de su uso.", "variable-no-declarada")
+        return "error"
 
     def _infer_expr_type(self, ctx):
         if ctx is None:
             return "void"
-        if hasattr(ctx, "NUMERO") and ctx.NUMERO():
-            text = ctx.NUMERO().getText()
-            return "decimal" if '.' in text else "entero"
-        if hasattr(ctx, "BOOL_LIT") and ctx.BOOL_LIT():
-            return "bool"
-        if hasattr(ctx, "TEXTO") and ctx.TEXTO():
-            return "cadena"
-        if ctx.getChildCount() >= 2 and ctx.getChild(1).getText() == '(':
-            name = ctx.getChild(0).getText()
-            args_ctx = ctx.getChild(2) if ctx.getChildCount() >= 3 else None
-            args = args_ctx.expr() if hasattr(args_ctx, "expr") else []
-            return self._check_function_call(ctx, name, args)
-        if hasattr(ctx, "ID") and ctx.ID():
-            return self._resolve_variable_type(ctx, ctx.ID().getText())
-        if ctx.getChildCount() == 3:
-            left = ctx.getChild(0)
-            op = ctx.getChild(1).getText()
-            right = ctx.getChild(2)
-            tipo_izq = self._infer_expr_type(left)
-            tipo_der = self._infer_expr_type(right)
-            if op in ["<", ">", "<=", ">=", "==", "!="]:
-                return "bool"
-            if op in ["&&", "||"]:
-                if tipo_izq == "bool" and tipo_der == "bool":
-                    return "bool"
-                else:
-                    self._error(ctx, f"Operador lógico '{op}' requiere valores booleanos. Se recibió '{tipo_izq}' y '{tipo_der}'.")
-                    return "bool"
-            if op == "+" and tipo_izq == "cadena" and tipo_der == "cadena":
-                return "cadena"
-            if op in ["+", "-", "*", "/", "^", "%"]:
-                if "decimal" in [tipo_izq, tipo_der]:
-                    return "decimal" if op != "%" else "entero"
-                return "entero"
-        if ctx.getChildCount() == 2 and ctx.getChild(0).getText() == "!":
-            tipo = self._infer_expr_type(ctx.getChild(1))
-            if tipo != "bool":
-                self._error(ctx, f"El operador '!' requiere un valor booleano. Se recibió '{tipo}'.")
-            return "bool"
+        tipo = self._tipos.get(ctx)
+        if tipo is None:
+            tipo = self._tipos[ctx] = self._inferir_tipo(ctx)
+        return tipo
+
+    def _inferir_tipo(self, ctx):
+        # Recorre cada subexpresión (también las que no deciden el tipo) para marcar sus lecturas
+        regla = self._reglas_tipo.get(type(ctx))
+        if regla is not None:
+            return regla(ctx)
+        # Alternativas de un solo hijo (soloExp, soloSuma, llamadaUnaria, expr...): el tipo del hijo
         if ctx.getChildCount() == 1:
             return self._infer_expr_type(ctx.getChild(0))
-        if hasattr(ctx, "expr") and callable(ctx.expr):
-            return self._infer_expr_type(ctx.expr())
         return "entero"
 
+    def _tipo_llamada(self, ctx):
+        if ctx.getChildCount() == 1:
+            return self._infer_expr_type(ctx.getChild(0))
+        name = ctx.getChild(0).getText()
+        args_ctx = ctx.getChild(2)
+        args = args_ctx.expr() if hasattr(args_ctx, "expr") else []
+        return self._check_function_call(ctx, name, args)
+
+    def _tipo_binario(self, ctx):
+        left = ctx.getChild(0)
+        op = ctx.getChild(1).getText()
+        right = ctx.getChild(2)
+        tipo_izq = self._infer_expr_type(left)
+        tipo_der = self._infer_expr_type(right)
+        if op not in _LOGICOS:
+            # Promoción entero -> decimal del operando entero (aritmética y comparaciones)
+            self._registrar_conversion(left, tipo_izq, tipo_der)
+            self._registrar_conversion(right, tipo_der, tipo_izq)
+        if op in _COMPARACIONES:
+            return "bool"
+        if op in _LOGICOS:
+            if tipo_izq in ("bool", "error") and tipo_der in ("bool", "error"):
+                return "bool"
+            else:
+                self._error(ctx, f"Operador lógico '{op}' requiere valores booleanos. Se recibió '{tipo_izq}' y '{tipo_der}'.", "operando-no-bool")
+                return "bool"
+        if "error" in (tipo_izq, tipo_der):
+            return "error"
+        if op == "+" and tipo_izq == "cadena" and tipo_der == "cadena":
+            return "cadena"
+        if op in _ARITMETICOS:
+            # '%' también: con un operando decimal el generador calcula frem (decimal)
+            if "decimal" in [tipo_izq, tipo_der]:
+                return "decimal"
+            return "entero"
+        return "entero"
+
+    def _tipo_not(self, ctx):
+        tipo = self._infer_expr_type(ctx.getChild(1))
+        if tipo not in ("bool", "error"):
+            self._error(ctx, f"El operador '!' requiere un valor booleano. Se recibió '{tipo}'.", "operando-no-bool")
+        return "bool"
+
+    def _tipo_signo(self, ctx):
+        # '+x' y '-x' conservan el tipo del operando, que debe ser numérico
+        tipo = self._infer_expr_type(ctx.getChild(1))
+        if tipo not in ("entero", "decimal", "error"):
+            self._error(ctx, f"El operador '{ctx.getChild(0).getText()}' requiere un valor numérico. Se recibió '{tipo}'.", "operando-no-numerico")
+            return "error"
+        return tipo
+
+    def _registrar_conversion(self, ctx, origen, destino):
+        # Única conversión implícita de las reglas: entero -> decimal
+        if origen == "entero" and destino == "decimal":
+            self._conversiones[ctx] = destino
+
     def _check_function_call(self, ctx, name, args):
         if name in self.scopes[0].functions:
             return_type, expected_params = self.scopes[0].functions[name]
@@ -254,45 +356,53 @@ class SemanticListener(LenListener):
                     return_type, expected_params = scope.functions[name]
                     break
             else:
-                self._error(ctx, f"La función '{name}' fue llamada pero no está definida en el programa.")
-                return "entero"
+                self._error(ctx, f"La función '{name}' fue llamada pero no está definida en el programa.", "funcion-no-definida")
+                for arg_expr in args:
+                    self._infer_expr_type(arg_expr)
+                return "error"
         if len(args) != len(expected_params):
-            self._error(ctx, f"La función '{name}' requiere {len(expected_params)} argumento(s), pero se proporcionaron {len(args)}.")
+            self._error(ctx, f"La función '{name}' requiere {len(expected_params)} argumento(s), pero se proporcionaron {len(args)}.", "numero-argumentos")
+            for arg_expr in args:
+                self._infer_expr_type(arg_expr)
             return return_type
         for i, (arg_expr, (param_name, expected_type)) in enumerate(zip(args, expected_params)):
             actual_type = self._map_type(self._infer_expr_type(arg_expr))
-            if actual_type != expected_type:
-                self._error(arg_expr, f"Argumento {i+1} inválido en llamada a '{name}': se esperaba '{expected_type}', pero se recibió '{actual_type}'.")
+            if actual_type != expected_type and actual_type != "error":
+                self._error(arg_expr, f"Argumento {i+1} inválido en llamada a '{name}': se esperaba '{expected_type}', pero se recibió '{actual_type}'.", "tipo-argumento")
         return return_type
 
-    def _has_guaranteed_return(self, ctx):
-        if ctx is None:
-            return False
-        class_name = ctx.__class__.__name__
-        if class_name == "RetornarSentenciaContext":
-            return True
-        if class_name == "SiSentenciaContext":
-            if not ctx.SINO():
-                return False
-            return self._has_guaranteed_return(ctx.sentencia(0)) and self._has_guaranteed_return(ctx.sentencia(1))
-        if hasattr(ctx, "sentencia") and callable(ctx.sentencia):
-            sentencias = ctx.sentencia()
-            if sentencias:
-                return self._has_guaranteed_return(sentencias[-1])
-            return False
-        if hasattr(ctx, "bloque") and callable(ctx.bloque):
-            return self._has_guaranteed_return(ctx.bloque())
-        if ctx.getChildCount() == 1 and isinstance(ctx.getChild(0), ParserRuleContext):
-            return self._has_guaranteed_return(ctx.getChild(0))
-        return False
-
-    def _error(self, ctx, msg):
-        line = ctx.start.line if ctx.start else "desconocida"
-        raise SemanticError(f"[Línea {line}] Error semántico: {msg}")
-
-    def _warn(self, ctx, msg):
-        line = ctx.start.line if ctx.start else "desconocida"
-        print(f"[Línea {line}] Advertencia: {msg}")
+    def _cuerpo_ast(self, bloque):
+        # AST del cuerpo de una función para el grafo de flujo (AnalizadorFusionado reusa el que ya armó)
+        from creador_ast import ASTBuilder
+        return ASTBuilder().visit(bloque)
+
+    def _error(self, ctx, msg, codigo="semantico"):
+        error = self.diagnosticos.agregar(desde_contexto("error", ctx, codigo, msg)).texto()
+        self.errors.append(error)
+        if not self._acumular:
+            raise SemanticError(error)
+        if self.max_errores and len(self.errors) >= self.max_errores:
+            raise SemanticError("\n".join(self.errors + [
+                f"Se alcanzó el límite de {self.max_errores} errores; el análisis se detuvo."]), list(self.errors))
+
+    def verificar_errores(self):
+        # Tras el recorrido: lanza los errores acumulados (modo con max_errores distinto de 1)
+        if self.errors:
+            raise SemanticError("\n".join(self.errors), list(self.errors))
+
+    def _warn(self, ctx, msg, codigo="semantico"):
+        aviso = self.diagnosticos.agregar(desde_contexto("advertencia", ctx, codigo, msg)).texto()
+        self.warnings.append(aviso)
+
+    def _warn_simbolo(self, simbolo, msg, codigo="semantico"):
+        # Aviso en la declaración de la variable
+        diagnostico = Diagnostico("advertencia", simbolo.linea, simbolo.columna, codigo, msg)
+        self.warnings.append(self.diagnosticos.agregar(diagnostico).texto())
+
+    def emitir_avisos(self):
+        # Todas las advertencias del recorrido en una sola escritura (con el filtro del colector)
+        if self.imprimir_avisos:
+            self.diagnosticos.emitir(severidades=("advertencia",))
 
     def pre_register_functions(self, funciones_node):
         if not funciones_node:
@@ -314,6 +424,6 @@ class SemanticListener(LenListener):
                         params.append((ident, tipo))
 
                 if name in global_scope.functions:
-                    self._error(child, f"La función '{name}' ya fue definida anteriormente.")
+                    self._error(child, f"La función '{name}' ya fue definida anteriormente.", "funcion-duplicada")
                 else:
                     global_scope.functions[name] = (return_type, params)
@@ -1,51 +1,121 @@
-from difflib import get_close_matches
+from difflib import SequenceMatcher
 import re
 
+# Conjuntos y patrones compartidos por los validadores y por la pasada única
+ESTRUCTURAS_SIN_VACIOS = {'loop', 'para', 'si', 'mostrar'}  # ajusta según tu gramática
+PALABRAS_SUGERIBLES = {
+    'prog', 'ini', 'end', 'si', 'no', 'loop', 'para', 'ret', 'mst', 'mostrar',
+    'int', 'flt', 'bool', 'str', 'aut', 'vd', 'funs', 'void', 'do', 'fin'
+}
+PATRON_IDENTIFICADOR = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+PATRON_DEF_FUNCION = re.compile(r'^\s*(int|flt|bol|str|aut|vd|void)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(')
+PATRON_LLAMADA_FUNCION = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\(')
+FUNCIONES_BUILTIN = {"mst"}
+PALABRAS_NO_FUNCION = {
+    'si', 'no', 'loop', 'para', 'ret', 'mostrar', 'ini', 'fin', 'funs', 'hacer',
+    'int', 'flt', 'bol', 'str', 'aut', 'vd', 'void', 'program', 'for'
+}
+PREFIJOS_SIN_PUNTO_Y_COMA = ("program", "ini", "end", "funs", "si", "no", "for", "loop", "do")
+PALABRAS_RESERVADAS_VARIABLES = {
+    'program', 'ini', 'end', 'si', 'no', 'for', 'loop', 'do', 'ret', 'mst',
+    'int', 'flt', 'bool', 'str', 'aut', 'vd', 'funs', 'void'
+}
+TIPOS_DECLARACION = {'int', 'flt', 'bool', 'str', 'aut', 'vd', 'void'}
+PREFIJOS_SIN_DECLARACION = ('program', 'ini', 'end', 'funs', 'ret', 'mostrar')
+PATRON_NOMBRE_VARIABLE = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+PATRON_DELIMITADOR = re.compile(r'["(){}]')
+
+# Entradas memorizadas por motor antes de vaciar la memoria (el servidor de compilación reutiliza el de palabras clave)
+LIMITE_MEMO_SUGERENCIAS = 10000
+
+
+class MotorSugerencias:
+    # Da el mismo resultado que get_close_matches(palabra, candidatos, n=1, cutoff=corte),
+    # pero agrupa los candidatos por longitud y memoriza la respuesta por palabra distinta.
+    # La similitud de dos palabras de longitudes a y b no supera 2*min(a, b)/(a + b), así que
+    # los grupos de longitud que no pueden llegar al corte se descartan sin compararlos.
+    def __init__(self, candidatos, corte=0.6):
+        self.corte = corte
+        self.por_longitud = {}
+        for candidato in candidatos:
+            self.por_longitud.setdefault(len(candidato), []).append(candidato)
+        self._memo = {}
+
+    def sugerir(self, palabra):
+        if palabra in self._memo:
+            return self._memo[palabra]
+        if len(self._memo) >= LIMITE_MEMO_SUGERENCIAS:
+            self._memo.clear()
+
+        largo = len(palabra)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(palabra)
+        mejor = None
+        for longitud, grupo in self.por_longitud.items():
+            total = largo + longitud
+            if total and 2.0 * min(largo, longitud) / total < self.corte:
+                continue
+            for candidato in grupo:
+                matcher.set_seq1(candidato)
+                if matcher.quick_ratio() < self.corte:
+                    continue
+                similitud = matcher.ratio()
+                # Empates: get_close_matches se queda con el candidato mayor
+                if similitud >= self.corte and (mejor is None or (similitud, candidato) > mejor):
+                    mejor = (similitud, candidato)
+
+        sugerencia = mejor[1] if mejor else None
+        self._memo[palabra] = sugerencia
+        return sugerencia
+
+
+MOTOR_PALABRAS_CLAVE = MotorSugerencias(PALABRAS_SUGERIBLES, corte=0.85)
+
+
 def limpiar_strings(linea):
     return re.sub(r'"[^"]*"', '', linea)
 
-def validar_parentesis_vacios(input_file):
+def validar_parentesis_vacios(lineas):
     errores = []
-    estructuras = {'loop', 'para', 'si', 'mostrar'}  # ajusta según tu gramática
+    estructuras = ESTRUCTURAS_SIN_VACIOS
 
-    with open(input_file, "r") as f:
-        for line_num, line in enumerate(f, 1):
-            linea = line.strip().lower()
-            if any(linea.startswith(e + ' ()') or f"{e}()" in linea for e in estructuras):
-                errores.append(f"[Línea {line_num}] Error: La estructura '{linea.split('(')[0]}' no puede tener paréntesis vacíos.")
+    for line_num, line in enumerate(lineas, 1):
+        linea = line.strip().lower()
+        if any(linea.startswith(e + ' ()') or f"{e}()" in linea for e in estructuras):
+            errores.append(f"[Línea {line_num}] Error: La estructura '{linea.split('(')[0]}' no puede tener paréntesis vacíos.")
     return errores
 
-def sugerir_palabras_clave_invalidas(ruta_archivo):
-    palabras_reservadas = {
-        'prog', 'ini', 'end', 'si', 'no', 'loop', 'para', 'ret', 'mst', 'mostrar',
-        'int', 'flt', 'bool', 'str', 'aut', 'vd', 'funs', 'void', 'do', 'fin'
-    }
+def sugerir_palabras_clave_invalidas(lineas):
+    palabras_reservadas = PALABRAS_SUGERIBLES
     errores = []
 
-    with open(ruta_archivo, "r") as file:
-        for line_num, line in enumerate(file, 1):
-            tokens = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', line)
-            for token in tokens:
-                if token not in palabras_reservadas:
-                    sugerencias = get_close_matches(token, palabras_reservadas, n=1, cutoff=0.85)
-                    if sugerencias:
-                        errores.append(
-                            f"[Línea {line_num}] Posible error de palabra clave: '{token}'. ¿Quiso decir '{sugerencias[0]}'?"
-                        )
+    for line_num, line in enumerate(lineas, 1):
+        tokens = PATRON_IDENTIFICADOR.findall(line)
+        for token in tokens:
+            if token not in palabras_reservadas:
+                sugerencia = MOTOR_PALABRAS_CLAVE.sugerir(token)
+                if sugerencia:
+                    errores.append(
+                        f"[Línea {line_num}] Posible error de palabra clave: '{token}'. ¿Quiso decir '{sugerencia}'?"
+                    )
     return errores
 
 
-def validar_llamadas_invalidas(input_file):
+def _mensaje_llamada_no_definida(line_num, nombre, motor):
+    sugerencia = motor.sugerir(nombre)
+    if sugerencia:
+        return f"[Línea {line_num}] Error: La función '{nombre}' no está definida. ¿Quiso decir '{sugerencia}'?"
+    return f"[Línea {line_num}] Error: La función '{nombre}' fue llamada pero no está definida o no ha sido declarada."
+
+
+def validar_llamadas_invalidas(lineas):
     errores = []
 
-    patron_def_func = re.compile(r'^\s*(int|flt|bol|str|aut|vd|void)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(')
-    patron_llamada_func = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\(')
+    patron_def_func = PATRON_DEF_FUNCION
+    patron_llamada_func = PATRON_LLAMADA_FUNCION
 
-    funciones_builtin = {"mst"}
-    palabras_clave = {
-        'si', 'no', 'loop', 'para', 'ret', 'mostrar', 'ini', 'fin', 'funs', 'hacer',
-        'int', 'flt', 'bol', 'str', 'aut', 'vd', 'void', 'program', 'for'
-    }
+    funciones_builtin = FUNCIONES_BUILTIN
+    palabras_clave = PALABRAS_NO_FUNCION
 
     funciones_definidas = set()
     llamadas = []
@@ -53,58 +123,47 @@ def validar_llamadas_invalidas(input_file):
     brace_stack = []
     inside_funs_block = False
 
-    with open(input_file, 'r') as f:
-        for line_num, line in enumerate(f, 1):
-            linea = line.strip()
-            if not linea or linea.startswith("#"):
-                continue
+    for line_num, line in enumerate(lineas, 1):
+        linea = line.strip()
+        if not linea or linea.startswith("#"):
+            continue
 
-            if linea.lower().startswith("funs"):
-                inside_funs_block = True
+        if linea.lower().startswith("funs"):
+            inside_funs_block = True
 
-            if "{" in linea:
-                brace_stack.append("{")
-            if "}" in linea and brace_stack:
-                brace_stack.pop()
-                if inside_funs_block and not brace_stack:
-                    inside_funs_block = False
+        if "{" in linea:
+            brace_stack.append("{")
+        if "}" in linea and brace_stack:
+            brace_stack.pop()
+            if inside_funs_block and not brace_stack:
+                inside_funs_block = False
 
-            if inside_funs_block:
-                match_def = patron_def_func.match(linea)
-                if match_def:
-                    funciones_definidas.add(match_def.group(2))
-                    continue
+        if inside_funs_block:
+            match_def = patron_def_func.match(linea)
+            if match_def:
+                funciones_definidas.add(match_def.group(2))
+                continue
 
-            linea_sin_strings = limpiar_strings(linea)
-            for match in patron_llamada_func.findall(linea_sin_strings):
-                if match in palabras_clave:
-                    continue
-                llamadas.append((line_num, match))
+        linea_sin_strings = limpiar_strings(linea)
+        for match in patron_llamada_func.findall(linea_sin_strings):
+            if match in palabras_clave:
+                continue
+            llamadas.append((line_num, match))
 
     todas_las_funciones = funciones_definidas | funciones_builtin
+    motor = MotorSugerencias(todas_las_funciones)
 
     for line_num, nombre in llamadas:
         if nombre not in todas_las_funciones:
-            sugerencias = get_close_matches(nombre, todas_las_funciones, n=1)
-            if sugerencias:
-                errores.append(
-                    f"[Línea {line_num}] Error: La función '{nombre}' no está definida. ¿Quiso decir '{sugerencias[0]}'?"
-                )
-            else:
-                errores.append(
-                    f"[Línea {line_num}] Error: La función '{nombre}' fue llamada pero no está definida o no ha sido declarada."
-                )
+            errores.append(_mensaje_llamada_no_definida(line_num, nombre, motor))
 
     return errores
 
 
 
-def validar_punto_y_coma(input_file):
-    with open(input_file, "r") as file:
-        lines = file.readlines()
-
+def validar_punto_y_coma(lineas):
     errores = []
-    for i, line in enumerate(lines):
+    for i, line in enumerate(lineas):
         original_line = line.strip()
         if not original_line or original_line.startswith("#"):
             continue
@@ -117,7 +176,7 @@ def validar_punto_y_coma(input_file):
             continue
 
         estructuras_sin_punto_y_coma = (
-            line_lower.startswith(("program", "ini", "end", "funs", "si", "no", "for", "loop", "do"))
+            line_lower.startswith(PREFIJOS_SIN_PUNTO_Y_COMA)
             or line_lower.endswith("{")
             or line_lower in ("{", "}", "fin")
         )
@@ -133,14 +192,11 @@ def validar_punto_y_coma(input_file):
 
     return errores
 
-def validar_parentesis(input_file):
-    with open(input_file, "r") as file:
-        lines = file.readlines()
-
+def validar_parentesis(lineas):
     errores = []
     stack = []
 
-    for num_linea, line in enumerate(lines, 1):
+    for num_linea, line in enumerate(lineas, 1):
         line = line.strip()
         if not line or line.startswith("#"):
             continue
@@ -162,14 +218,11 @@ def validar_parentesis(input_file):
 
     return errores
 
-def validar_llaves(input_file):
-    with open(input_file, "r") as file:
-        lines = file.readlines()
-
+def validar_llaves(lineas):
     errores = []
     stack = []
 
-    for num_linea, line in enumerate(lines, 1):
+    for num_linea, line in enumerate(lineas, 1):
         line = line.strip()
         if not line or line.startswith("#"):
             continue
@@ -191,83 +244,211 @@ def validar_llaves(input_file):
 
     return errores
 
-def validar_nombres_variables(input_file):
-    palabras_reservadas = {
-        'program', 'ini', 'end', 'si', 'no', 'for', 'loop', 'do', 'ret', 'mst',
-        'int', 'flt', 'bool', 'str', 'aut', 'vd', 'funs', 'void'
-    }
-
-    tipos_validos = {'int', 'flt', 'bool', 'str', 'aut', 'vd', 'void'}
-    patron_variable = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+def validar_nombres_variables(lineas):
+    palabras_reservadas = PALABRAS_RESERVADAS_VARIABLES
+    tipos_validos = TIPOS_DECLARACION
+    patron_variable = PATRON_NOMBRE_VARIABLE
     errores = []
 
-    with open(input_file, 'r') as file:
-        for line_num, line in enumerate(file, 1):
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
+    for line_num, line in enumerate(lineas, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
 
-            line_lower = line.lower()
-            if (
-                line.endswith("{") or
-                line == "{" or line == "}" or
-                any(line_lower.startswith(kw) for kw in {'program', 'ini', 'end', 'funs', 'ret', 'mostrar'})
-            ):
-                continue
+        line_lower = line.lower()
+        if (
+            line.endswith("{") or
+            line == "{" or line == "}" or
+            line_lower.startswith(PREFIJOS_SIN_DECLARACION)
+        ):
+            continue
 
-            if '=' in line:
-                izquierda = line.split('=')[0].strip()
-                partes = izquierda.split()
-            else:
-                partes = line.split()
+        if '=' in line:
+            izquierda = line.split('=')[0].strip()
+            partes = izquierda.split()
+        else:
+            partes = line.split()
 
-            if not partes:
-                continue
+        if not partes:
+            continue
 
-            tipo = partes[0].lower()
-            if tipo not in tipos_validos:
-                continue
+        tipo = partes[0].lower()
+        if tipo not in tipos_validos:
+            continue
 
-            if len(partes) < 2:
-                errores.append(f"[Línea {line_num}] Error: Se esperaba un nombre de variable después del tipo '{tipo}'.")
-                continue
+        if len(partes) < 2:
+            errores.append(f"[Línea {line_num}] Error: Se esperaba un nombre de variable después del tipo '{tipo}'.")
+            continue
 
-            nombre_var = partes[1]
-            if not patron_variable.match(nombre_var):
-                errores.append(f"[Línea {line_num}] Error: El nombre de variable '{nombre_var}' no es válido. Debe comenzar con letra o '_' y contener solo letras, números o '_'.")
-            elif nombre_var.lower() in palabras_reservadas:
-                errores.append(f"[Línea {line_num}] Error: El nombre '{nombre_var}' es una palabra reservada y no puede usarse como identificador.")
+        nombre_var = partes[1]
+        if not patron_variable.match(nombre_var):
+            errores.append(f"[Línea {line_num}] Error: El nombre de variable '{nombre_var}' no es válido. Debe comenzar con letra o '_' y contener solo letras, números o '_'.")
+        elif nombre_var.lower() in palabras_reservadas:
+            errores.append(f"[Línea {line_num}] Error: El nombre '{nombre_var}' es una palabra reservada y no puede usarse como identificador.")
 
     return errores
 
-def validar_tipos_invalidos(input_file):
+def validar_tipos_invalidos(lineas):
     errores = []
     tipos_validos = {'int',
                       'flt', 'bol', 'str', 'aut', 'vd', 'void'}
     patron_tipo = re.compile(r'^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s+[a-zA-Z_][a-zA-Z0-9_]*\s*(=.*)?;')
 
-    with open(input_file, 'r') as f:
-        for line_num, line in enumerate(f, 1):
-            linea = line.strip()
-            if not linea or linea.startswith("#"):
-                continue
+    for line_num, line in enumerate(lineas, 1):
+        linea = line.strip()
+        if not linea or linea.startswith("#"):
+            continue
 
-            match = patron_tipo.match(linea)
-            if match:
-                tipo = match.group(1).lower()
-                if tipo not in tipos_validos:
-                    errores.append(f"[Línea {line_num}] Error: Tipo de dato inválido '{match.group(1)}'. ¿Quiso decir 'int', 'flt', 'bol', etc.?")
+        match = patron_tipo.match(linea)
+        if match:
+            tipo = match.group(1).lower()
+            if tipo not in tipos_validos:
+                errores.append(f"[Línea {line_num}] Error: Tipo de dato inválido '{match.group(1)}'. ¿Quiso decir 'int', 'flt', 'bol', etc.?")
 
     return errores
 
 
-def validar_len_sintaxis_general(ruta_archivo):
+def validar_lineas(lineas):
+    # Pasada única equivalente a los siete validadores de VALIDADORES: cada línea se limpia
+    # una vez y los paréntesis y llaves se recorren juntos. Los errores se juntan por
+    # validador para devolverlos en el mismo orden que la versión por separado.
+    punto_y_coma, parentesis, llaves, nombres, llamadas_err, palabras, vacios = [], [], [], [], [], [], []
+    pila_parentesis, pila_llaves = [], []
+    funciones_definidas = set()
+    llamadas = []
+    profundidad = 0
+    dentro_funs = False
+
+    for line_num, line in enumerate(lineas, 1):
+        linea = line.strip()
+        linea_lower = linea.lower()
+
+        # Estos dos revisan también líneas vacías y comentarios
+        if any(linea_lower.startswith(e + ' ()') or f"{e}()" in linea_lower for e in ESTRUCTURAS_SIN_VACIOS):
+            vacios.append(f"[Línea {line_num}] Error: La estructura '{linea_lower.split('(')[0]}' no puede tener paréntesis vacíos.")
+        for token in PATRON_IDENTIFICADOR.findall(line):
+            if token not in PALABRAS_SUGERIBLES:
+                sugerencia = MOTOR_PALABRAS_CLAVE.sugerir(token)
+                if sugerencia:
+                    palabras.append(
+                        f"[Línea {line_num}] Posible error de palabra clave: '{token}'. ¿Quiso decir '{sugerencia}'?"
+                    )
+
+        if not linea or linea.startswith("#"):
+            continue
+
+        # Punto y coma
+        sin_comentario = linea.split("#", 1)[0].strip()
+        sin_comentario_lower = sin_comentario.lower()
+        if sin_comentario_lower.startswith("} loop") and not sin_comentario.endswith(";"):
+            punto_y_coma.append(f"[Línea {line_num}] Error: Se esperaba ';' al final del bloque 'loop'. Instrucción: {linea}")
+        elif not (
+            sin_comentario_lower.startswith(PREFIJOS_SIN_PUNTO_Y_COMA)
+            or sin_comentario_lower.endswith("{")
+            or sin_comentario_lower in ("{", "}", "fin")
+        ) and not sin_comentario.endswith(";"):
+            if "(" in sin_comentario_lower and ")" in sin_comentario_lower:
+                punto_y_coma.append(f"[Línea {line_num}] Error: Posible llamada o retorno sin ';'. Instrucción: {linea}")
+            else:
+                punto_y_coma.append(f"[Línea {line_num}] Error: Falta ';' al final de la instrucción. Línea: {linea}")
+
+        # Paréntesis y llaves: solo se visitan comillas y delimitadores
+        in_string = False
+        for match in PATRON_DELIMITADOR.finditer(linea):
+            char = match.group()
+            if char == '"':
+                in_string = not in_string
+            elif in_string:
+                continue
+            elif char == '(':
+                pila_parentesis.append((line_num, match.start() + 1))
+            elif char == ')':
+                if pila_parentesis:
+                    pila_parentesis.pop()
+                else:
+                    parentesis.append(f"[Línea {line_num}, Columna {match.start() + 1}] Error: Paréntesis de cierre ')' sin apertura correspondiente.")
+            elif char == '{':
+                pila_llaves.append((line_num, match.start() + 1))
+            elif pila_llaves:
+                pila_llaves.pop()
+            else:
+                llaves.append(f"[Línea {line_num}, Columna {match.start() + 1}] Error: Llave de cierre '}}' sin apertura correspondiente.")
+
+        # Nombres de variables
+        if not (linea.endswith("{") or linea == "}" or linea_lower.startswith(PREFIJOS_SIN_DECLARACION)):
+            partes = (linea.split('=')[0].strip() if '=' in linea else linea).split()
+            tipo = partes[0].lower() if partes else None
+            if tipo in TIPOS_DECLARACION:
+                if len(partes) < 2:
+                    nombres.append(f"[Línea {line_num}] Error: Se esperaba un nombre de variable después del tipo '{tipo}'.")
+                elif not PATRON_NOMBRE_VARIABLE.match(partes[1]):
+                    nombres.append(f"[Línea {line_num}] Error: El nombre de variable '{partes[1]}' no es válido. Debe comenzar con letra o '_' y contener solo letras, números o '_'.")
+                elif partes[1].lower() in PALABRAS_RESERVADAS_VARIABLES:
+                    nombres.append(f"[Línea {line_num}] Error: El nombre '{partes[1]}' es una palabra reservada y no puede usarse como identificador.")
+
+        # Llamadas: definiciones dentro de 'funs' y llamadas en el resto
+        if linea_lower.startswith("funs"):
+            dentro_funs = True
+        if "{" in linea:
+            profundidad += 1
+        if "}" in linea and profundidad:
+            profundidad -= 1
+            if dentro_funs and not profundidad:
+                dentro_funs = False
+        definicion = PATRON_DEF_FUNCION.match(linea) if dentro_funs else None
+        if definicion:
+            funciones_definidas.add(definicion.group(2))
+        else:
+            for nombre in PATRON_LLAMADA_FUNCION.findall(limpiar_strings(linea)):
+                if nombre not in PALABRAS_NO_FUNCION:
+                    llamadas.append((line_num, nombre))
+
+    for linea, columna in pila_parentesis:
+        parentesis.append(f"[Línea {linea}, Columna {columna}] Error: Paréntesis de apertura '(' sin cierre correspondiente.")
+    for linea, columna in pila_llaves:
+        llaves.append(f"[Línea {linea}, Columna {columna}] Error: Llave de apertura '{{' sin cierre correspondiente.")
+
+    todas_las_funciones = funciones_definidas | FUNCIONES_BUILTIN
+    motor = MotorSugerencias(todas_las_funciones)
+    for line_num, nombre in llamadas:
+        if nombre not in todas_las_funciones:
+            llamadas_err.append(_mensaje_llamada_no_definida(line_num, nombre, motor))
+
+    return punto_y_coma + parentesis + llaves + nombres + llamadas_err + palabras + vacios
+
+
+def dividir_lineas(fuente):
+    # Igual que iterar un archivo abierto en modo texto: solo separa en '\n'
+    return fuente.split("\n")
+
+
+VALIDADORES = (
+    validar_punto_y_coma,
+    validar_parentesis,
+    validar_llaves,
+    validar_nombres_variables,
+    validar_llamadas_invalidas,
+    sugerir_palabras_clave_invalidas,
+    validar_parentesis_vacios,
+)
+
+
+def validar_len_sintaxis_separado(fuente, metricas=None):
+    # Los siete validadores uno tras otro; se conserva para comparar y medir cada uno
+    lineas = dividir_lineas(fuente)
     errores = []
-    errores += validar_punto_y_coma(ruta_archivo)
-    errores += validar_parentesis(ruta_archivo)
-    errores += validar_llaves(ruta_archivo)
-    errores += validar_nombres_variables(ruta_archivo)
-    errores += validar_llamadas_invalidas(ruta_archivo)
-    errores += sugerir_palabras_clave_invalidas(ruta_archivo)
-    errores += validar_parentesis_vacios(ruta_archivo)
-    return errores
\ No newline at end of file
+    for validador in VALIDADORES:
+        if metricas is None:
+            errores += validador(lineas)
+        else:
+            with metricas.fase(validador.__name__):
+                errores += validador(lineas)
+    return errores
+
+
+def validar_len_sintaxis_general(fuente, metricas=None):
+    lineas = dividir_lineas(fuente)
+    if metricas is None:
+        return validar_lineas(lineas)
+    with metricas.fase('validar_lineas'):
+        return validar_lineas(lineas)
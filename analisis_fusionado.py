@@ -0,0 +1,199 @@
+from antlr4 import ParseTreeWalker
+from LenParser import LenParser
+from SemanticoVal import SemanticListener
+from ast_node import ASTNode
+
+
+class AnalizadorFusionado(SemanticListener):
+    # Análisis semántico y construcción del AST en un solo recorrido del árbol.
+    # Las reglas semánticas son las de SemanticListener (métodos enter/exit específicos);
+    # el nodo de cada contexto se arma en exitEveryRule, que el walker llama después
+    # del exit específico, a partir de los nodos ya guardados en sus hijos.
+    # El resultado es idéntico al de ASTBuilder, más las anotaciones de tipo (_anotar_ast).
+
+    def __init__(self, imprimir_avisos=True, max_errores=1, diagnosticos=None):
+        super().__init__(imprimir_avisos, max_errores, diagnosticos)
+        self._fallo_ast = None
+        self._constructores = {
+            LenParser.ProgContext: self._prog,
+            LenParser.DeclaracionGlobalSimpleContext: self._declaracion_global,
+            LenParser.DeclaracionSimpleContext: self._declaracion,
+            LenParser.DeclaracionInferidaContext: self._declaracion_inferida,
+            LenParser.DeclaracionSentenciaContext: lambda ctx: ctx.declaracion().nodo_ast,
+            LenParser.FuncionesContext: self._funciones,
+            LenParser.FuncionDefContext: self._funcion,
+            LenParser.ParamSimpleContext: lambda ctx: ASTNode("Param", value={'tipo': ctx.tipo().getText().lower(), 'nombre': ctx.ID().getText()}),
+            LenParser.Bloque_PROGRAMContext: lambda ctx: ctx.bloque().nodo_ast,
+            LenParser.BloqueContext: self._bloque,
+            LenParser.BloqueSentenciaContext: lambda ctx: ctx.bloque().nodo_ast,
+            LenParser.MOSTRARSentenciaContext: self._mostrar,
+            LenParser.SiSentenciaContext: self._si,
+            LenParser.LOPSentenciaContext: self._lop,
+            LenParser.HacerLOPSentenciaContext: self._hacer_lop,
+            LenParser.ParaSentenciaContext: self._para,
+            LenParser.RetornarSentenciaContext: self._retornar,
+            LenParser.AsignacionSentenciaContext: lambda ctx: ctx.asignacion().nodo_ast,
+            LenParser.ExprContext: lambda ctx: ctx.asignacion().nodo_ast,
+            LenParser.AsignacionExpContext: self._asignacion,
+            LenParser.SoloExpContext: lambda ctx: ctx.logicaOr().nodo_ast,
+            LenParser.OpLogicaORContext: lambda ctx: self._binaria(ctx, "or", ctx.logicaOr(), ctx.logicaAnd()),
+            LenParser.SoloLogicaAndContext: lambda ctx: ctx.logicaAnd().nodo_ast,
+            LenParser.OpLogicaANDContext: lambda ctx: self._binaria(ctx, "and", ctx.logicaAnd(), ctx.igualdad()),
+            LenParser.SoloIgualdadContext: lambda ctx: ctx.igualdad().nodo_ast,
+            LenParser.OpIgualdadDiferenciaContext: lambda ctx: self._binaria(ctx, None, ctx.igualdad(), ctx.comparacion()),
+            LenParser.SoloComparacionContext: lambda ctx: ctx.comparacion().nodo_ast,
+            LenParser.OpComparacionContext: lambda ctx: self._binaria(ctx, None, ctx.comparacion(), ctx.suma()),
+            LenParser.SoloSumaContext: lambda ctx: ctx.suma().nodo_ast,
+            LenParser.OpSumaRestaContext: lambda ctx: self._binaria(ctx, None, ctx.suma(), ctx.mult()),
+            LenParser.SoloMultContext: lambda ctx: ctx.mult().nodo_ast,
+            LenParser.OpMultDivContext: lambda ctx: self._binaria(ctx, None, ctx.mult(), ctx.potencia()),
+            LenParser.SoloPotenciaContext: lambda ctx: ctx.potencia().nodo_ast,
+            LenParser.OpPotenciaContext: lambda ctx: self._binaria(ctx, "^", ctx.unario(), ctx.potencia()),
+            LenParser.SoloUnarioContext: lambda ctx: ctx.unario().nodo_ast,
+            LenParser.OpUnarioNotContext: lambda ctx: ASTNode("UnaryOp", value="not", children=[ctx.unario().nodo_ast]),
+            LenParser.OpUnarioPositivoContext: lambda ctx: ASTNode("UnaryOp", value="+", children=[ctx.unario().nodo_ast]),
+            LenParser.OpUnarioNegativoContext: lambda ctx: ASTNode("UnaryOp", value="-", children=[ctx.unario().nodo_ast]),
+            LenParser.LlamadaUnariaContext: lambda ctx: ctx.llamada().nodo_ast,
+            LenParser.LlamadaFuncionContext: self._llamada,
+            LenParser.ParentesisContext: lambda ctx: ctx.expr().nodo_ast,
+            LenParser.NumeroContext: self._numero,
+            LenParser.BooleanoContext: lambda ctx: ASTNode("Literal", value=ctx.BOOL_LIT().getText().lower() == 'true'),
+            LenParser.TextoContext: lambda ctx: ASTNode("Literal", value=ctx.TEXTO().getText()[1:-1]),
+            LenParser.VariableContext: lambda ctx: ASTNode("Variable", value=ctx.ID().getText()),
+        }
+
+    def analizar(self, tree):
+        # Firmas desde el bloque 'funs' del programa (sin buscarlo recorriendo el árbol)
+        funciones = tree.funciones() if isinstance(tree, LenParser.ProgContext) else None
+        if funciones:
+            self.pre_register_functions(funciones)
+        try:
+            ParseTreeWalker.DEFAULT.walk(self, tree)
+            self.verificar_errores()
+        finally:
+            self.emitir_avisos()
+        if self._fallo_ast is not None:
+            # Mismo orden que antes: primero todos los errores semánticos, luego el fallo del AST
+            raise self._fallo_ast
+        self._anotar_ast()
+        return getattr(tree, "nodo_ast", None)
+
+    def _cuerpo_ast(self, bloque):
+        # El bloque sale antes que su función: su nodo ya está armado
+        return bloque.nodo_ast
+
+    def _anotar_ast(self):
+        # Tipos inferidos, conversiones implícitas y símbolos del análisis en los nodos del AST:
+        # el generador emite las conversiones desde las anotaciones en lugar de comparar tipos de LLVM
+        for ctx, tipo in self._tipos.items():
+            nodo = getattr(ctx, "nodo_ast", None)
+            if nodo is not None:
+                nodo.tipo = tipo
+        for ctx, destino in self._conversiones.items():
+            nodo = getattr(ctx, "nodo_ast", None)
+            if nodo is not None:
+                nodo.conversion = destino
+        # Cada declaración, parámetro y uso de variable apunta a su Simbolo: el generador
+        # guarda y busca las variables por símbolo, sin diccionarios por nombre ni copias por función
+        for ctx, simbolo in self._enlaces.items():
+            nodo = getattr(ctx, "nodo_ast", None)
+            if nodo is not None:
+                nodo.simbolo = simbolo
+
+    def exitEveryRule(self, ctx):
+        constructor = self._constructores.get(type(ctx))
+        if constructor is None:
+            ctx.nodo_ast = None
+            return
+        try:
+            ctx.nodo_ast = constructor(ctx)
+        except Exception as e:
+            ctx.nodo_ast = None
+            if self._fallo_ast is None:
+                self._fallo_ast = e
+
+    # ===== Constructores de nodos (mismo resultado que ASTBuilder) =====
+
+    def _prog(self, ctx):
+        children = [decl.nodo_ast for decl in ctx.declaracion_global()]
+        if ctx.funciones():
+            children.append(ctx.funciones().nodo_ast)
+        children.append(ctx.bloque_PROGRAM().nodo_ast)
+        return ASTNode("Program", children=children)
+
+    def _declaracion_global(self, ctx):
+        tipo = ctx.tipo().getText().lower()
+        expr = ctx.expr().nodo_ast if ctx.expr() else None
+        return ASTNode("GlobalDeclaration", value={'tipo': tipo, 'nombre': ctx.ID().getText()},
+                       children=[expr] if expr else [])
+
+    def _declaracion(self, ctx):
+        tipo = ctx.tipo().getText().lower()
+        expr = ctx.expr().nodo_ast if ctx.expr() else None
+        return ASTNode("Declaration", value={'tipo': tipo, 'nombre': ctx.ID().getText()},
+                       children=[expr] if expr else [])
+
+    def _declaracion_inferida(self, ctx):
+        return ASTNode("InferredDeclaration", value=ctx.ID().getText(), children=[ctx.expr().nodo_ast])
+
+    def _funciones(self, ctx):
+        return ASTNode("Functions", children=[f.nodo_ast for f in ctx.funcion()])
+
+    def _funcion(self, ctx):
+        tipo_ret = ctx.tipo().getText().lower() if ctx.tipo() else "void"
+        parametros = []
+        if ctx.params() and hasattr(ctx.params(), "param"):
+            parametros = [p.nodo_ast for p in ctx.params().param()]
+        return ASTNode("Function", value={'nombre': ctx.ID().getText(), 'tipo': tipo_ret},
+                       children=parametros + [ctx.bloque().nodo_ast])
+
+    def _bloque(self, ctx):
+        return ASTNode("Block", children=[s.nodo_ast for s in ctx.sentencia() if s.nodo_ast is not None])
+
+    def _mostrar(self, ctx):
+        args = [e.nodo_ast for e in ctx.args().expr()] if ctx.args() else []
+        return ASTNode("Print", children=args)
+
+    def _si(self, ctx):
+        sino = ctx.sentencia(1).nodo_ast if ctx.SINO() else None
+        return ASTNode("If", children=[ctx.expr().nodo_ast, ctx.sentencia(0).nodo_ast] + ([sino] if sino else []))
+
+    def _lop(self, ctx):
+        return ASTNode("While", children=[ctx.expr().nodo_ast, ctx.sentencia().nodo_ast])
+
+    def _hacer_lop(self, ctx):
+        return ASTNode("DoWhile", children=[ctx.sentencia().nodo_ast, ctx.expr().nodo_ast])
+
+    def _para(self, ctx):
+        # Igual que ASTBuilder.visitParaSentencia, incluida la indexación por posición
+        init = ctx.declaracion().nodo_ast if ctx.declaracion() else ctx.expr(0).nodo_ast
+        cond = ctx.expr(1).nodo_ast if ctx.expr(1) else None
+        step = ctx.expr(2).nodo_ast if ctx.expr(2) else None
+        return ASTNode("For", children=[init, cond, step, ctx.sentencia().nodo_ast])
+
+    def _retornar(self, ctx):
+        expr = ctx.expr().nodo_ast if ctx.expr() else None
+        return ASTNode("Return", children=[expr] if expr else [])
+
+    def _asignacion(self, ctx):
+        return ASTNode("Assign", value=ctx.ID().getText(), children=[ctx.asignacion().nodo_ast])
+
+    def _binaria(self, ctx, op, izquierda, derecha):
+        op = op or ctx.getChild(1).getText()
+        return ASTNode("BinaryOp", value=op, children=[izquierda.nodo_ast, derecha.nodo_ast])
+
+    def _numero(self, ctx):
+        txt = ctx.getText()
+        return ASTNode("Literal", value=float(txt) if '.' in txt else int(txt))
+
+    def _llamada(self, ctx):
+        if ctx.getChildCount() == 1:
+            return ctx.primary().nodo_ast
+        nombre = ctx.primary().ID().getText()
+        args = [e.nodo_ast for e in ctx.args(0).expr()] if ctx.args() else []
+        return ASTNode("FunctionCall", value=nombre, children=args)
+
+
+def analizar_y_construir_ast(tree, max_errores=1, diagnosticos=None):
+    # Un solo recorrido: valida (lanza SemanticError con los errores acumulados) y devuelve el AST
+    return AnalizadorFusionado(max_errores=max_errores, diagnosticos=diagnosticos).analizar(tree)
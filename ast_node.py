@@ -3,6 +3,12 @@ class ASTNode:
         self.type = type
         self.value = value
         self.children = children or []
+        # Anotaciones del análisis semántico (AnalizadorFusionado); None si el AST no viene anotado.
+        # `tipo`: tipo del lenguaje de la expresión; `conversion`: tipo al que se convierte su valor.
+        self.tipo = None
+        self.conversion = None
+        # `simbolo`: Simbolo (simbolos.py) al que se ligó una variable (declaración, parámetro o uso)
+        self.simbolo = None
 
     def __repr__(self):
         children_repr = f"[{', '.join(repr(child) for child in self.children)}]" if self.children else "[]"
@@ -0,0 +1,760 @@
+import argparse
+import io
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+from metricas import RegistroMetricas, datos_maquina
+
+# Exponente de la curva tiempo ~ tamaño a partir del cual una fase se marca como superlineal
+UMBRAL_EXPONENTE = 1.2
+# Por debajo de este tiempo (seg) en el tamaño mayor la medición es puro ruido
+TIEMPO_MINIMO = 0.002
+
+ARCHIVO_PRUEBAS = "pruebas.txt"
+ARCHIVO_SNIPPETS = "PRUEBAS QUE REALIZA.txt"
+
+
+# ===== Corpus fijo =====
+
+def extraer_programas(texto):
+    # Los snippets vienen pegados uno tras otro con notas sueltas en medio:
+    # se toma cada 'prog NOMBRE {' hasta cerrar su llave
+    programas = []
+    for inicio in re.finditer(r'^prog\s+(\w+)\s*\{', texto, re.MULTILINE):
+        profundidad = 0
+        en_texto = False
+        fin = None
+        for i in range(inicio.start(), len(texto)):
+            c = texto[i]
+            if c == '"':
+                en_texto = not en_texto
+            elif c == '\n':
+                en_texto = False
+                if texto.startswith("\nprog ", i):
+                    break  # llaves sin cerrar: el siguiente programa empieza antes
+            elif not en_texto and c == '{':
+                profundidad += 1
+            elif not en_texto and c == '}':
+                profundidad -= 1
+                if profundidad == 0:
+                    fin = i + 1
+                    break
+        if fin is not None:
+            programas.append((inicio.group(1), texto[inicio.start():fin] + "\n"))
+    return programas
+
+
+def corpus_fijo(directorio="."):
+    programas = []
+    ruta = os.path.join(directorio, ARCHIVO_PRUEBAS)
+    if os.path.exists(ruta):
+        with open(ruta, "r", encoding="utf-8") as f:
+            programas.append((os.path.splitext(ARCHIVO_PRUEBAS)[0], f.read()))
+    ruta = os.path.join(directorio, ARCHIVO_SNIPPETS)
+    if os.path.exists(ruta):
+        with open(ruta, "r", encoding="utf-8") as f:
+            vistos = {}
+            for nombre, fuente in extraer_programas(f.read()):
+                # Hay nombres repetidos (p. ej. BUCLES_FUNCION en dos versiones)
+                vistos[nombre] = vistos.get(nombre, 0) + 1
+                if vistos[nombre] > 1:
+                    nombre = f"{nombre}_{vistos[nombre]}"
+                programas.append((nombre, fuente))
+    return programas
+
+
+# ===== Programas generados =====
+
+def _programa(nombre, sentencias, funciones=None):
+    lineas = [f"prog {nombre} {{"]
+    if funciones:
+        lineas += ["    funs {"] + funciones + ["    }"]
+    lineas += ["    ini {"] + sentencias + ["    }", "    Fin", "}", ""]
+    return "\n".join(lineas)
+
+
+def generar_funciones(n):
+    funciones = []
+    sentencias = []
+    for k in range(n):
+        funciones += [
+            f"        int f{k}(int a, int b) {{",
+            f"            int r = a * {k % 7 + 1} + b;",
+            f"            si (r > {k % 50}) {{",
+            f"                ret r - {k % 5};",
+            "            } no {",
+            f"                ret r + {k % 3};",
+            "            }",
+            "        }",
+        ]
+        sentencias += [f"        int x{k} = f{k}({k % 10}, 2);", f"        mst(x{k});"]
+    return _programa("FUNCIONES", sentencias, funciones)
+
+
+def generar_expresiones(n):
+    operadores = ("+", "*", "-", "+", "*")
+    terminos = ["a"]
+    for k in range(1, n):
+        operando = "b" if k % 3 == 0 else str(k % 9 + 1)
+        terminos.append(f"{operadores[k % len(operadores)]} {operando}")
+    sentencias = [
+        "        int a = 3;",
+        "        int b = 7;",
+        f"        int r = {' '.join(terminos)};",
+        "        mst(r);",
+    ]
+    return _programa("EXPRESIONES", sentencias)
+
+
+def generar_anidado(n):
+    # Alterna 'si' y 'loop'; cada loop incrementa su variable para terminar.
+    # La sangría se limita para que el tamaño del programa crezca linealmente con n
+    apertura = []
+    cierre = []
+    for k in range(n):
+        sangria = "    " * min(k + 2, 10)
+        apertura.append(f"{sangria}int v{k + 1} = v{k} + 1;")
+        if k % 2 == 0:
+            apertura.append(f"{sangria}si (v{k + 1} > {k}) {{")
+            cierre.append(f"{sangria}}}")
+        else:
+            apertura.append(f"{sangria}loop (v{k + 1} < {k + 3}) {{")
+            cierre.append(f"{sangria}}}")
+            cierre.append(f"{sangria}    v{k + 1} = v{k + 1} + 1;")
+    centro = "    " * min(n + 2, 10) + f"mst(v{n});"
+    sentencias = ["        int v0 = 0;"] + apertura + [centro] + list(reversed(cierre))
+    return _programa("ANIDADO", sentencias)
+
+
+def generar_mst(n):
+    sentencias = ["        int x = 0;"]
+    for k in range(n):
+        if k % 2 == 0:
+            sentencias.append(f'        mst("linea {k}");')
+        else:
+            sentencias.append(f"        mst(x + {k});")
+    return _programa("MOSTRAR", sentencias)
+
+
+# Tamaños base de cada familia; --escala los multiplica
+FAMILIAS = {
+    "funciones": (generar_funciones, (25, 50, 100, 200, 400)),
+    "expresiones": (generar_expresiones, (50, 100, 200, 400, 800)),
+    "anidado": (generar_anidado, (10, 20, 40, 80, 160)),
+    "mst": (generar_mst, (250, 500, 1000, 2000, 4000)),
+}
+
+
+# La condición con efectos (mst) muestra si el ciclo se evaluó
+_FUNCION_AVISA = ["        int avisa(int n) {", "            mst(n);", "            ret 0;", "        }"]
+
+# Casos de la poda de código inalcanzable (cfg_len.podar_inalcanzable): salida esperada al ejecutar.
+# Cuerpos de ciclo y ramas que quedan vacíos tras podar no deben borrar el ciclo ni la condición
+PROGRAMAS_PODA = [
+    ("PODA_LOOP_CUERPO_VACIO", ["        loop (avisa(7) > 0) si (false) mst(9);"], _FUNCION_AVISA, "7"),
+    ("PODA_FOR_CUERPO_VACIO", ["        int i = 0;", "        for (i = 0; i < 3; i = i + 1) si (false) mst(9);",
+                               "        mst(i);"], None, "3"),
+    ("PODA_DO_CUERPO_VACIO", ["        do si (false) mst(9); loop (avisa(8) > 0);"], _FUNCION_AVISA, "8"),
+    ("PODA_SI_RAMA_VACIA", ["        si (avisa(6) < 1) si (false) mst(9);"], _FUNCION_AVISA, "6"),
+    ("PODA_LOOP_FALSE", ["        int i = 0;", "        loop (false) mst(9);", "        mst(i);"], None, "0"),
+    ("PODA_FOR_FALSE", ["        int i = 0;", "        for (i = 5; false; i = i + 1) mst(9);",
+                        "        mst(i);"], None, "5"),
+    ("PODA_SI_LITERAL", ["        si (true) mst(1); no mst(9);", "        si (false) mst(9); no mst(2);"], None, "1 2"),
+    ("PODA_TRAS_RET", ["        mst(f(4));"],
+     ["        int f(int n) {", "            ret n;", "            mst(9);", "        }"], "4"),
+]
+
+# Reglas de tipos y de alcance que fijan los cambios del analizador: salida esperada al ejecutar,
+# o "error:<código>" si la compilación debe fallar con ese diagnóstico
+PROGRAMAS_COMPORTAMIENTO = [
+    ("MODULO_DECIMAL", ["        flt r = 7.5 % 2;", "        mst(r);", "        mst(7 % 3);"], None, "1.500000 1"),
+    ("MODULO_DECIMAL_A_INT", ["        int m = 7.5 % 2;", "        mst(m);"], None, "error:tipo-incompatible"),
+    # Sin sitofp el entero llegaría como bits crudos al double
+    ("ENTERO_A_FLT", ["        flt f = 3;", "        mst(f / 2);", "        int n = 1;", "        f = n;",
+                      "        mst(f + 0.25);"], None, "1.500000 1.250000"),
+    ("MENOS_CADENA", ['        str s = "a";', "        mst(-s);"], None, "error:operando-no-numerico"),
+    ("MAS_CADENA", ['        str s = "a";', "        mst(+s);"], None, "error:operando-no-numerico"),
+    ("MENOS_BOOL", ["        mst(-true);"], None, "error:operando-no-numerico"),
+    ("SOMBRA_EN_BLOQUE", ["        int x = 1;", "        si (x > 0) {", "            int x = 2;", "            mst(x);",
+                          "        }", "        mst(x);"], None, "2 1"),
+    ("SOMBRA_EN_CICLO", ["        int x = 1;", "        int i = 0;", "        loop (i < 2) {", "            int x = i + 5;",
+                         "            mst(x);", "            i = i + 1;", "        }", "        mst(x);"], None, "5 6 1"),
+]
+
+
+# ===== Medición =====
+
+def medir_fuente(fuente, directorio, nombre, repeticiones=3, optimizar=False):
+    # Compila la fuente varias veces y se queda con el mínimo de cada fase (menos ruido)
+    from menu import compilar_archivo
+
+    ruta = os.path.join(directorio, f"{nombre}.txt")
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(fuente)
+
+    mejores = {}
+    for _ in range(repeticiones):
+        metricas = RegistroMetricas()
+        salida = io.StringIO()
+        try:
+            with redirect_stdout(salida):
+                resultado = compilar_archivo(ruta, optimizar=optimizar, ejecutar=False, metricas=metricas)
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+        if not resultado:
+            lineas = salida.getvalue().splitlines()
+            errores = [l for l in lineas if l.startswith("[Línea")] or [l for l in lineas if l.startswith("✖")]
+            return None, "\n".join(errores[:5]) or "La compilación falló."
+        for medicion in metricas.mediciones:
+            fase = medicion["fase"]
+            if fase not in mejores or medicion["tiempo_pared"] < mejores[fase]:
+                mejores[fase] = medicion["tiempo_pared"]
+    return mejores, ""
+
+
+def exponente_crecimiento(tamanos, tiempos):
+    # Pendiente de la recta de mínimos cuadrados en escala log-log: 1 = lineal, 2 = cuadrático
+    puntos = [(math.log(x), math.log(y)) for x, y in zip(tamanos, tiempos) if x > 0 and y > 0]
+    if len(puntos) < 2:
+        return None
+    media_x = sum(x for x, _ in puntos) / len(puntos)
+    media_y = sum(y for _, y in puntos) / len(puntos)
+    varianza = sum((x - media_x) ** 2 for x, _ in puntos)
+    if not varianza:
+        return None
+    return sum((x - media_x) * (y - media_y) for x, y in puntos) / varianza
+
+
+def analizar_escalamiento(tamanos, tiempos_por_tamano, umbral=UMBRAL_EXPONENTE, tiempo_minimo=TIEMPO_MINIMO):
+    # tiempos_por_tamano: lista paralela a tamanos con {fase: segundos}
+    fases = {}
+    for tiempos in tiempos_por_tamano:
+        for fase in tiempos:
+            fases.setdefault(fase, None)
+
+    analisis = {}
+    for fase in fases:
+        serie = [t.get(fase, 0.0) for t in tiempos_por_tamano]
+        exponente = exponente_crecimiento(tamanos, serie)
+        superlineal = exponente is not None and exponente > umbral and max(serie) >= tiempo_minimo
+        analisis[fase] = {"tiempos": serie, "exponente": exponente, "superlineal": superlineal}
+    return analisis
+
+
+def medir_familia(nombre, generador, tamanos, directorio, repeticiones=3, optimizar=False):
+    medidos = []
+    tiempos_por_tamano = []
+    error = ""
+    for n in tamanos:
+        fuente = generador(n)
+        tiempos, error = medir_fuente(fuente, directorio, f"{nombre}_{n}", repeticiones, optimizar)
+        if tiempos is None:
+            print(f"✖ {nombre} n={n}: {error}")
+            break
+        # El tamaño de entrada es el largo del programa en caracteres
+        medidos.append(len(fuente))
+        tiempos_por_tamano.append(tiempos)
+        print(f"  {nombre:12} n={n:<6} {len(fuente):>9} caracteres  {tiempos.get('TOTAL', 0.0):.4f} seg")
+    return medidos, tiempos_por_tamano, error
+
+
+def comparar_parseo(familias, escala=1.0, repeticiones=3):
+    # Tiempo de parser.prog() por modo de predicción sobre el programa más grande de cada familia
+    import time
+    from parseo_len import MODOS_PARSEO, parsear_fuente
+
+    resultados = {}
+    for familia in familias:
+        generador, base = FAMILIAS[familia]
+        fuente = generador(max(1, int(max(base) * escala)))
+        tiempos = {}
+        for modo in MODOS_PARSEO:
+            mejor = None
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                parsear_fuente(fuente, modo)
+                duracion = time.perf_counter() - inicio
+                mejor = duracion if mejor is None else min(mejor, duracion)
+            tiempos[modo] = mejor
+        resultados[familia] = {"caracteres": len(fuente), "tiempos": tiempos}
+    return resultados
+
+
+def imprimir_comparacion_parseo(resultados):
+    print("\n=== PARSEO: LL vs SLL vs DOS ETAPAS ===")
+    print(f"{'familia':12} {'caracteres':>10} {'ll':>9} {'sll':>9} {'dos_etapas':>11} {'aceleración':>12}")
+    for familia, datos in resultados.items():
+        t = datos["tiempos"]
+        aceleracion = t["ll"] / t["dos_etapas"] if t["dos_etapas"] else 0.0
+        print(f"{familia:12} {datos['caracteres']:>10} {t['ll']:9.4f} {t['sll']:9.4f} "
+              f"{t['dos_etapas']:11.4f} {aceleracion:11.2f}x")
+
+
+def _contar_nodos(raiz, hijos):
+    pendientes, total = [raiz], 0
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo is None:
+            continue
+        total += 1
+        pendientes.extend(hijos(nodo))
+    return total
+
+
+def _recorridos_de_referencia():
+    # Línea base de --recorridos: el despacho anterior a las tablas por tipo, con las mismas reglas.
+    # La inferencia sondea hasattr y el texto de los tokens en cada nodo; el generador compara el
+    # tipo de nodo en orden, como la cadena if/elif
+    from antlr4.tree.Tree import TerminalNode
+    from analisis_fusionado import AnalizadorFusionado
+    from generador_len import LLVMGeneratorLen
+
+    def texto_token(nodo):
+        return nodo.getText() if isinstance(nodo, TerminalNode) else None
+
+    class AnalizadorPorSondeo(AnalizadorFusionado):
+        def _inferir_tipo(self, ctx):
+            if hasattr(ctx, "NUMERO") and ctx.NUMERO():
+                return "decimal" if '.' in ctx.NUMERO().getText() else "entero"
+            if hasattr(ctx, "BOOL_LIT") and ctx.BOOL_LIT():
+                return "bool"
+            if hasattr(ctx, "TEXTO") and ctx.TEXTO():
+                return "cadena"
+            if ctx.getChildCount() >= 2 and texto_token(ctx.getChild(1)) == '(':
+                return self._tipo_llamada(ctx)
+            if hasattr(ctx, "ID") and ctx.ID():
+                return self._resolve_variable_type(ctx, ctx.ID().getText())
+            if ctx.getChildCount() == 3 and texto_token(ctx.getChild(1)) is not None:
+                return self._tipo_binario(ctx)
+            if ctx.getChildCount() == 2 and texto_token(ctx.getChild(0)) == "!":
+                return self._tipo_not(ctx)
+            if ctx.getChildCount() == 2 and texto_token(ctx.getChild(0)) in ("+", "-"):
+                return self._tipo_signo(ctx)
+            if ctx.getChildCount() == 1:
+                return self._infer_expr_type(ctx.getChild(0))
+            if hasattr(ctx, "expr") and callable(ctx.expr):
+                return self._infer_expr_type(ctx.expr())
+            return "entero"
+
+    class GeneradorPorCadena(LLVMGeneratorLen):
+        def generate(self, node):
+            for tipo, manejador in self._sentencias.items():
+                if node.type == tipo:
+                    return manejador(node)
+            raise Exception(f"⚠️ Nodo no soportado en generate: {node.type}")
+
+        def _generar_valor(self, node):
+            for tipo, manejador in self._expresiones.items():
+                if node.type == tipo:
+                    return manejador(node)
+            raise Exception(f"No se pudo generar código para el nodo: {node}")
+
+    return AnalizadorPorSondeo, GeneradorPorCadena
+
+
+def medir_recorridos(familias, escala=1.0, repeticiones=3):
+    # Micro-benchmark del despacho: costo por nodo del recorrido Semántico+AST (nodos del árbol
+    # de ANTLR) y de LLVM Gen (nodos del AST) sobre el programa más grande de cada familia, junto
+    # al despacho anterior (_recorridos_de_referencia) medido de forma intercalada
+    import time
+    from analisis_fusionado import AnalizadorFusionado
+    from generador_len import LLVMGeneratorLen
+    from parseo_len import parsear_fuente
+
+    AnalizadorPorSondeo, GeneradorPorCadena = _recorridos_de_referencia()
+
+    def mejor_tiempo(mejores, clave, funcion):
+        inicio = time.perf_counter()
+        valor = funcion()
+        duracion = time.perf_counter() - inicio
+        mejores[clave] = min(mejores.get(clave, duracion), duracion)
+        return valor
+
+    resultados = {}
+    for familia in familias:
+        generador, base = FAMILIAS[familia]
+        arbol = parsear_fuente(generador(max(1, int(max(base) * escala))))
+        mejores, ast = {}, None
+        for _ in range(repeticiones):
+            ast = mejor_tiempo(mejores, "semantico", lambda: AnalizadorFusionado(imprimir_avisos=False).analizar(arbol))
+            mejor_tiempo(mejores, "semantico_base", lambda: AnalizadorPorSondeo(imprimir_avisos=False).analizar(arbol))
+            mejor_tiempo(mejores, "generacion", lambda: LLVMGeneratorLen().generate(ast))
+            mejor_tiempo(mejores, "generacion_base", lambda: GeneradorPorCadena().generate(ast))
+        nodos_arbol = _contar_nodos(arbol, lambda n: n.getChildren() if hasattr(n, "getChildren") else ())
+        nodos_ast = _contar_nodos(ast, lambda n: n.children)
+        resultados[familia] = {
+            "nodos_arbol": nodos_arbol,
+            "us_por_nodo_semantico": mejores["semantico"] / nodos_arbol * 1e6,
+            "us_por_nodo_semantico_base": mejores["semantico_base"] / nodos_arbol * 1e6,
+            "nodos_ast": nodos_ast,
+            "us_por_nodo_generacion": mejores["generacion"] / nodos_ast * 1e6,
+            "us_por_nodo_generacion_base": mejores["generacion_base"] / nodos_ast * 1e6,
+        }
+    return resultados
+
+
+def imprimir_recorridos(resultados):
+    print("\n=== RECORRIDOS: COSTO POR NODO (µs), TABLAS vs DESPACHO ANTERIOR ===")
+    print(f"{'familia':12} {'nodos árbol':>12} {'semántico':>10} {'sondeo':>8} {'ahorro':>7} "
+          f"{'nodos AST':>10} {'LLVM Gen':>9} {'if/elif':>8} {'ahorro':>7}")
+    for familia, datos in resultados.items():
+        ahorro_sem = 1 - datos["us_por_nodo_semantico"] / datos["us_por_nodo_semantico_base"]
+        ahorro_gen = 1 - datos["us_por_nodo_generacion"] / datos["us_por_nodo_generacion_base"]
+        print(f"{familia:12} {datos['nodos_arbol']:>12} {datos['us_por_nodo_semantico']:10.2f} "
+              f"{datos['us_por_nodo_semantico_base']:8.2f} {ahorro_sem:7.0%} "
+              f"{datos['nodos_ast']:>10} {datos['us_por_nodo_generacion']:9.2f} "
+              f"{datos['us_por_nodo_generacion_base']:8.2f} {ahorro_gen:7.0%}")
+
+
+def prueba_diferencial(programas):
+    # El parser rápido debe producir exactamente el AST de ANTLR + ASTBuilder
+    import time
+    from creador_ast import ASTBuilder
+    from parseo_len import crear_parser
+    from parser_rapido import ErrorParseoRapido, diferencia_ast, parsear_rapido
+
+    resultados = []
+    for nombre, fuente in programas:
+        inicio = time.perf_counter()
+        parser = crear_parser(fuente)
+        parser.removeErrorListeners()
+        arbol = parser.prog()
+        referencia = None
+        if not parser.getNumberOfSyntaxErrors():
+            try:
+                referencia = ASTBuilder().visit(arbol)
+            except Exception:
+                pass  # ASTBuilder tampoco acepta el programa (p. ej. 'aut x;')
+        tiempo_antlr = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        try:
+            ast = parsear_rapido(fuente)
+        except ErrorParseoRapido as e:
+            ast = None
+            detalle = str(e)
+        tiempo_rapido = time.perf_counter() - inicio
+
+        if referencia is None:
+            # Entrada inválida: el parser rápido debe rechazarla para que ANTLR reporte los errores
+            estado = "✔" if ast is None else "✖"
+            detalle = "entrada inválida rechazada" if ast is None else "aceptó una entrada que ANTLR rechaza"
+        elif ast is None:
+            estado = "✖"
+            detalle = f"rechazó una entrada válida: {detalle}"
+        else:
+            detalle = diferencia_ast(referencia, ast)
+            estado = "✖" if detalle else "✔"
+        resultados.append({"programa": nombre, "estado": estado, "detalle": detalle or "",
+                           "tiempo_antlr": tiempo_antlr, "tiempo_rapido": tiempo_rapido})
+    return resultados
+
+
+def imprimir_diferencial(resultados, titulo="ANTLR + ASTBuilder vs PARSER RÁPIDO"):
+    print(f"\n=== DIFERENCIAL: {titulo} ===")
+    for r in resultados:
+        aceleracion = r["tiempo_antlr"] / r["tiempo_rapido"] if r["tiempo_rapido"] else 0.0
+        print(f"{r['estado']} {r['programa']:28} {r['tiempo_antlr']:8.4f} {r['tiempo_rapido']:8.4f} "
+              f"{aceleracion:6.1f}x  {r['detalle']}")
+    fallidos = sum(1 for r in resultados if r["estado"] != "✔")
+    print(f"{len(resultados) - fallidos}/{len(resultados)} programas con resultado idéntico")
+
+
+def _analisis_separado(arbol):
+    # Referencia: SemanticListener y luego ASTBuilder, cada uno con su recorrido
+    from antlr4 import ParseTreeWalker
+    from creador_ast import ASTBuilder
+    from SemanticoVal import SemanticListener
+    listener = SemanticListener()
+    if arbol.funciones():
+        listener.pre_register_functions(arbol.funciones())
+    try:
+        ParseTreeWalker.DEFAULT.walk(listener, arbol)
+    finally:
+        listener.emitir_avisos()
+    return ASTBuilder().visit(arbol)
+
+
+def _resultado_analisis(funcion, arbol):
+    # (ast, error, avisos impresos); el error es el texto de la excepción
+    salida = io.StringIO()
+    ast, error = None, None
+    with redirect_stdout(salida):
+        try:
+            ast = funcion(arbol)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return ast, error, salida.getvalue()
+
+
+def prueba_fusionada(programas):
+    # El recorrido fusionado debe dar los mismos errores, avisos y AST que las dos pasadas separadas
+    import time
+    from analisis_fusionado import analizar_y_construir_ast
+    from parseo_len import crear_parser
+    from parser_rapido import diferencia_ast
+
+    resultados = []
+    for nombre, fuente in programas:
+        parser = crear_parser(fuente)
+        parser.removeErrorListeners()
+        arbol = parser.prog()
+        if parser.getNumberOfSyntaxErrors():
+            continue
+
+        inicio = time.perf_counter()
+        referencia, error_ref, avisos_ref = _resultado_analisis(_analisis_separado, arbol)
+        tiempo_separado = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        ast, error, avisos = _resultado_analisis(analizar_y_construir_ast, arbol)
+        tiempo_fusionado = time.perf_counter() - inicio
+
+        if error != error_ref:
+            detalle = f"error distinto: {error_ref!r} vs {error!r}"
+        elif avisos != avisos_ref:
+            detalle = "avisos distintos"
+        elif referencia is not None:
+            detalle = diferencia_ast(referencia, ast)
+        else:
+            detalle = None
+        resultados.append({"programa": nombre, "estado": "✖" if detalle else "✔", "detalle": detalle or "",
+                           "tiempo_antlr": tiempo_separado, "tiempo_rapido": tiempo_fusionado})
+    return resultados
+
+
+def _ir_comparable(texto):
+    # Los nombres de las cadenas globales llevan id() de Python: cambian entre compilaciones
+    return re.sub(r"str_\d+(_x)*", "str_N", texto) if texto else texto
+
+
+def prueba_semantica_rapida(programas):
+    # Con --parseo rapido el resultado (errores, avisos, IR) debe ser el mismo que con ANTLR;
+    # el camino rápido solo se toma si semantico_rapido acepta el programa
+    import time
+    from compilador import compilar_fuente
+    from parser_rapido import ErrorParseoRapido, parsear_rapido
+    from semantico_rapido import NoVerificable, verificar_ast_rapido
+
+    resultados = []
+    for nombre, fuente in programas:
+        try:
+            verificar_ast_rapido(parsear_rapido(fuente))
+            camino = "camino rápido"
+        except (ErrorParseoRapido, NoVerificable) as e:
+            camino = f"ANTLR ({e})"
+        inicio = time.perf_counter()
+        referencia = compilar_fuente(fuente)
+        tiempo_antlr = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        rapido = compilar_fuente(fuente, {"modo_parseo": "rapido"})
+        tiempo_rapido = time.perf_counter() - inicio
+
+        if (rapido.ok, rapido.errores) != (referencia.ok, referencia.errores):
+            detalle = f"resultado distinto: {referencia.errores[:1]} vs {rapido.errores[:1]}"
+        elif rapido.avisos != referencia.avisos:
+            detalle = "avisos distintos"
+        elif _ir_comparable(rapido.ir) != _ir_comparable(referencia.ir):
+            detalle = "IR distinto"
+        else:
+            detalle = None
+        resultados.append({"programa": nombre, "estado": "✖" if detalle else "✔", "detalle": detalle or camino,
+                           "tiempo_antlr": tiempo_antlr, "tiempo_rapido": tiempo_rapido})
+    return resultados
+
+
+def prueba_salida_esperada(programas):
+    # Regresión por salida: cada caso se compila (con ANTLR y en modo rápido) y se ejecuta con JIT;
+    # la salida debe ser la esperada, o la compilación debe fallar con el código "error:<código>"
+    import time
+    from compilador import compilar_fuente
+    from ejecutor_jit import capturar_descriptor_salida, compilar_jit, ejecutar_main
+
+    resultados = []
+    for nombre, sentencias, funciones, esperada in programas:
+        fuente = _programa(nombre, sentencias, funciones)
+        codigo_esperado = esperada[len("error:"):] if esperada.startswith("error:") else None
+        salidas, tiempos, detalle = {}, {}, None
+        for modo in ("dos_etapas", "rapido"):
+            inicio = time.perf_counter()
+            resultado = compilar_fuente(fuente, {"modo_parseo": modo})
+            tiempos[modo] = time.perf_counter() - inicio
+            if codigo_esperado is not None:
+                codigos = [d.codigo for d in resultado.diagnosticos if d.severidad == "error"]
+                if resultado.ok or codigo_esperado not in codigos:
+                    detalle = f"{modo}: códigos {codigos or resultado.errores[:1]}, se esperaba '{codigo_esperado}'"
+                    break
+                continue
+            if not resultado.ok:
+                detalle = f"{modo}: {resultado.errores[:1]}"
+                break
+            with capturar_descriptor_salida() as salida:
+                ejecutar_main(compilar_jit(resultado.modulo))
+            salidas[modo] = " ".join(salida["texto"].split())
+            if salidas[modo] != esperada:
+                detalle = f"{modo}: salida '{salidas[modo]}', se esperaba '{esperada}'"
+                break
+        resultados.append({"programa": nombre, "estado": "✖" if detalle else "✔", "detalle": detalle or esperada,
+                           "tiempo_antlr": tiempos.get("dos_etapas", 0.0), "tiempo_rapido": tiempos.get("rapido", 0.0)})
+    return resultados
+
+
+def prueba_validacion(programas):
+    # La pasada única de SintacticoVal debe dar los mismos diagnósticos que los siete validadores
+    import time
+    from SintacticoVal import validar_len_sintaxis_general, validar_len_sintaxis_separado
+
+    resultados = []
+    for nombre, fuente in programas:
+        inicio = time.perf_counter()
+        referencia = validar_len_sintaxis_separado(fuente)
+        tiempo_separado = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        errores = validar_len_sintaxis_general(fuente)
+        tiempo_unico = time.perf_counter() - inicio
+
+        detalle = ""
+        if errores != referencia:
+            distintos = [e for e in errores + referencia if (e in errores) != (e in referencia)]
+            detalle = distintos[0] if distintos else "mismos diagnósticos en otro orden"
+        resultados.append({"programa": nombre, "estado": "✖" if detalle else "✔", "detalle": detalle,
+                           "tiempo_antlr": tiempo_separado, "tiempo_rapido": tiempo_unico})
+    return resultados
+
+
+# ===== Reporte =====
+
+def imprimir_corpus(resultados):
+    print("\n=== CORPUS FIJO ===")
+    for nombre, tiempos, error in resultados:
+        if tiempos is None:
+            print(f"✖ {nombre:24} {error.splitlines()[0] if error else ''}")
+        else:
+            print(f"✔ {nombre:24} {tiempos.get('TOTAL', 0.0):.4f} seg")
+
+
+def imprimir_escalamiento(familia, tamanos, analisis):
+    print(f"\n=== ESCALAMIENTO: {familia} (caracteres: {', '.join(str(t) for t in tamanos)}) ===")
+    for fase, datos in analisis.items():
+        serie = " ".join(f"{t:8.4f}" for t in datos["tiempos"])
+        exponente = "   -" if datos["exponente"] is None else f"{datos['exponente']:4.2f}"
+        marca = "  ⚠ SUPERLINEAL" if datos["superlineal"] else ""
+        print(f"{fase:35} {serie}  k={exponente}{marca}")
+
+
+def parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark del compilador Len: corpus de ejemplo más programas generados de tamaño creciente."
+    )
+    parser.add_argument("--familias", default=",".join(FAMILIAS),
+                        help=f"Familias de programas generados ({', '.join(FAMILIAS)})")
+    parser.add_argument("--escala", type=float, default=1.0, help="Multiplica los tamaños de cada familia")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Compilaciones por tamaño (se toma el mínimo)")
+    parser.add_argument("-O", "--optimizar", default=None, metavar="NIVEL", help="Incluir la fase de optimización")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_EXPONENTE,
+                        help="Exponente a partir del cual una fase se marca como superlineal")
+    parser.add_argument("--sin-corpus", action="store_true", help="Omitir pruebas.txt y los snippets de ejemplo")
+    parser.add_argument("--comparar-parseo", action="store_true",
+                        help="Medir además el parser con predicción LL, SLL y en dos etapas")
+    parser.add_argument("--recorridos", action="store_true",
+                        help="Medir el costo por nodo del análisis semántico y de la generación de LLVM")
+    parser.add_argument("--diferencial", action="store_true",
+                        help="Comparar el parser rápido, el recorrido fusionado, la validación de una pasada y el modo rápido "
+                             "con su referencia, y ejecutar los casos de la poda del CFG y de tipos y alcance")
+    parser.add_argument("--json", default=None, metavar="RUTA", help="Guardar los resultados en JSON")
+    parser.add_argument("--estricto", action="store_true", help="Terminar con código 1 si alguna fase es superlineal")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parsear_argumentos(argv)
+    # Los programas muy anidados o con expresiones largas generan árboles profundos
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+    optimizar = args.optimizar or False
+
+    resultados = {"maquina": datos_maquina(), "corpus": [], "escalamiento": {}}
+    superlineales = []
+    diferencias = 0
+
+    with tempfile.TemporaryDirectory(prefix="len_bench_") as directorio:
+        if not args.sin_corpus:
+            print("[INFO] Midiendo el corpus de ejemplo...")
+            corpus = []
+            for nombre, fuente in corpus_fijo(os.path.dirname(os.path.abspath(__file__))):
+                tiempos, error = medir_fuente(fuente, directorio, nombre, args.repeticiones, optimizar)
+                corpus.append((nombre, tiempos, error))
+                resultados["corpus"].append({"programa": nombre, "tiempos": tiempos, "error": error})
+            imprimir_corpus(corpus)
+
+        for familia in [f.strip() for f in args.familias.split(",") if f.strip()]:
+            if familia not in FAMILIAS:
+                print(f"✖ Familia desconocida: {familia}")
+                continue
+            generador, base = FAMILIAS[familia]
+            tamanos_n = sorted({max(1, int(n * args.escala)) for n in base})
+            print(f"\n[INFO] Midiendo familia '{familia}'...")
+            medidos, tiempos_por_tamano, error = medir_familia(
+                familia, generador, tamanos_n, directorio, args.repeticiones, optimizar)
+            analisis = analizar_escalamiento(medidos, tiempos_por_tamano, args.umbral)
+            if analisis:
+                imprimir_escalamiento(familia, medidos, analisis)
+            superlineales += [(familia, fase) for fase, datos in analisis.items() if datos["superlineal"]]
+            resultados["escalamiento"][familia] = {
+                "n": tamanos_n[:len(medidos)], "caracteres": medidos, "fases": analisis, "error": error,
+            }
+
+    if args.comparar_parseo:
+        familias = [f.strip() for f in args.familias.split(",") if f.strip() in FAMILIAS]
+        resultados["parseo"] = comparar_parseo(familias, args.escala, args.repeticiones)
+        imprimir_comparacion_parseo(resultados["parseo"])
+
+    if args.recorridos:
+        familias = [f.strip() for f in args.familias.split(",") if f.strip() in FAMILIAS]
+        resultados["recorridos"] = medir_recorridos(familias, args.escala, args.repeticiones)
+        imprimir_recorridos(resultados["recorridos"])
+
+    if args.diferencial:
+        programas = [] if args.sin_corpus else corpus_fijo(os.path.dirname(os.path.abspath(__file__)))
+        for familia in [f.strip() for f in args.familias.split(",") if f.strip() in FAMILIAS]:
+            generador, base = FAMILIAS[familia]
+            for n in sorted({max(1, int(n * args.escala)) for n in base}):
+                programas.append((f"{familia}_{n}", generador(n)))
+        resultados["diferencial"] = prueba_diferencial(programas)
+        imprimir_diferencial(resultados["diferencial"])
+        resultados["fusionado"] = prueba_fusionada(programas)
+        imprimir_diferencial(resultados["fusionado"], "SEMÁNTICO + AST SEPARADOS vs RECORRIDO FUSIONADO")
+        resultados["validacion"] = prueba_validacion(programas)
+        imprimir_diferencial(resultados["validacion"], "SIETE VALIDADORES vs PASADA ÚNICA")
+        resultados["semantica_rapida"] = prueba_semantica_rapida(programas)
+        imprimir_diferencial(resultados["semantica_rapida"], "COMPILACIÓN CON ANTLR vs MODO RÁPIDO")
+        resultados["poda"] = prueba_salida_esperada(PROGRAMAS_PODA)
+        imprimir_diferencial(resultados["poda"], "PODA DEL CFG vs SALIDA ESPERADA")
+        resultados["comportamiento"] = prueba_salida_esperada(PROGRAMAS_COMPORTAMIENTO)
+        imprimir_diferencial(resultados["comportamiento"], "TIPOS Y ALCANCE vs SALIDA ESPERADA")
+        diferencias = sum(1 for clave in ("diferencial", "fusionado", "validacion", "semantica_rapida", "poda",
+                                          "comportamiento")
+                          for r in resultados[clave] if r["estado"] != "✔")
+
+    if superlineales:
+        print("\n⚠ Fases con crecimiento superlineal:")
+        for familia, fase in superlineales:
+            print(f"  - {familia}: {fase}")
+    else:
+        print("\n✔ Ninguna fase crece más rápido que lineal.")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"✔ Resultados guardados en '{args.json}'")
+
+    if diferencias:
+        return 1
+    return 1 if args.estricto and superlineales else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
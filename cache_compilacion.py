@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+VERSION_COMPILADOR = "1.1"  # 1.1: las entradas guardan las advertencias del análisis
+DIRECTORIO_CACHE = os.environ.get("LEN_CACHE_DIR", ".len_cache")
+TAMANO_MAXIMO_CACHE = 100 * 1024 * 1024  # bytes
+
+# Cualquier cambio en estos archivos invalida la caché aunque no se suba la versión
+_ARCHIVOS_COMPILADOR = ("Len.g4", "SintacticoVal.py", "SemanticoVal.py", "creador_ast.py", "generador_len.py",
+                        "analisis_fusionado.py", "ast_node.py", "cfg_len.py", "parser_rapido.py", "parseo_len.py",
+                        "optimizador.py", "semantico_rapido.py", "simbolos.py")
+_EXTENSIONES = (".ll", ".bc", ".diag")
+
+_huella_compilador = None
+
+
+def huella_compilador():
+    global _huella_compilador
+    if _huella_compilador is None:
+        h = hashlib.sha256(VERSION_COMPILADOR.encode())
+        base = os.path.dirname(os.path.abspath(__file__))
+        for nombre in _ARCHIVOS_COMPILADOR:
+            try:
+                with open(os.path.join(base, nombre), "rb") as f:
+                    h.update(f.read())
+            except OSError:
+                h.update(nombre.encode())
+        try:
+            from importlib.metadata import version
+            h.update(version("llvmlite").encode())
+        except Exception:
+            pass
+        _huella_compilador = h.hexdigest()[:16]
+    return _huella_compilador
+
+
+def descripcion_optimizacion(nivel=None, pases=None):
+    if pases:
+        return "pases:" + ",".join(pases)
+    return nivel or "sin-opt"
+
+
+class CacheCompilacion:
+    def __init__(self, directorio=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO_CACHE):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+
+    def clave(self, fuente, nivel=None, pases=None, modo_parseo="dos_etapas"):
+        h = hashlib.sha256()
+        h.update(huella_compilador().encode())
+        h.update(b"\0" + descripcion_optimizacion(nivel, pases).encode() + b"\0")
+        # El modo de parseo decide qué cadena produjo el IR: una entrada no se comparte entre modos
+        h.update(modo_parseo.encode() + b"\0")
+        h.update(fuente.encode("utf-8"))
+        return h.hexdigest()
+
+    def _ruta(self, clave, extension):
+        return os.path.join(self.directorio, clave + extension)
+
+    def obtener(self, clave):
+        # Devuelve (texto_ir, bitcode_optimizado | None, diagnósticos) o None si no hay entrada.
+        # Los diagnósticos (dicts de Diagnostico.a_dict) son las advertencias del análisis que se salta
+        ruta_ll = self._ruta(clave, ".ll")
+        ruta_bc = self._ruta(clave, ".bc")
+        ruta_diag = self._ruta(clave, ".diag")
+        try:
+            with open(ruta_ll, "r", encoding="ascii") as f:
+                texto_ir = f.read()
+            bitcode = None
+            if os.path.exists(ruta_bc):
+                with open(ruta_bc, "rb") as f:
+                    bitcode = f.read()
+            diagnosticos = []
+            if os.path.exists(ruta_diag):
+                with open(ruta_diag, "r", encoding="utf-8") as f:
+                    diagnosticos = json.load(f)
+        except (OSError, ValueError):
+            # Otra compilación pudo desalojarla mientras se leía
+            return None
+
+        # LRU: la fecha de modificación marca el último uso
+        ahora = time.time()
+        for ruta in (ruta_ll, ruta_bc, ruta_diag):
+            try:
+                os.utime(ruta, (ahora, ahora))
+            except OSError:
+                pass
+        return texto_ir, bitcode, diagnosticos
+
+    def guardar(self, clave, texto_ir, bitcode_optimizado=None, diagnosticos=None):
+        os.makedirs(self.directorio, exist_ok=True)
+        if bitcode_optimizado is not None:
+            self._escribir_atomico(self._ruta(clave, ".bc"), bitcode_optimizado)
+        if diagnosticos:
+            self._escribir_atomico(self._ruta(clave, ".diag"),
+                                   json.dumps([d.a_dict() for d in diagnosticos], ensure_ascii=False).encode("utf-8"))
+        # El .ll se escribe al final: su presencia marca la entrada como completa
+        self._escribir_atomico(self._ruta(clave, ".ll"), texto_ir.encode("ascii"))
+        self.desalojar()
+
+    def _escribir_atomico(self, ruta, datos):
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+    def entradas(self):
+        # {clave: {"tamano": bytes, "ultimo_uso": epoch, "optimizado": bool}}
+        entradas = {}
+        if not os.path.isdir(self.directorio):
+            return entradas
+        for nombre in os.listdir(self.directorio):
+            clave, extension = os.path.splitext(nombre)
+            if extension not in _EXTENSIONES:
+                continue
+            try:
+                info = os.stat(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+            entrada = entradas.setdefault(clave, {"tamano": 0, "ultimo_uso": 0.0, "optimizado": False})
+            entrada["tamano"] += info.st_size
+            entrada["ultimo_uso"] = max(entrada["ultimo_uso"], info.st_mtime)
+            entrada["optimizado"] = entrada["optimizado"] or extension == ".bc"
+        return entradas
+
+    def desalojar(self):
+        entradas = self.entradas()
+        total = sum(e["tamano"] for e in entradas.values())
+        eliminadas = 0
+        for clave, entrada in sorted(entradas.items(), key=lambda item: item[1]["ultimo_uso"]):
+            if total <= self.tamano_maximo:
+                break
+            self._eliminar(clave)
+            total -= entrada["tamano"]
+            eliminadas += 1
+        return eliminadas
+
+    def _eliminar(self, clave):
+        for extension in _EXTENSIONES:
+            try:
+                os.remove(self._ruta(clave, extension))
+            except OSError:
+                pass
+
+    def limpiar(self):
+        entradas = self.entradas()
+        for clave in entradas:
+            self._eliminar(clave)
+        return len(entradas)
+
+    def imprimir_estadisticas(self):
+        entradas = self.entradas()
+        total = sum(e["tamano"] for e in entradas.values())
+        print(f"\n=== CACHÉ DE COMPILACIÓN ({self.directorio}) ===")
+        print(f"Entradas: {len(entradas)}  |  Tamaño: {total / 1024:.1f} KiB de {self.tamano_maximo / 1024:.0f} KiB")
+        for clave, entrada in sorted(entradas.items(), key=lambda item: item[1]["ultimo_uso"], reverse=True):
+            ultimo_uso = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entrada["ultimo_uso"]))
+            optimizado = "IR + optimizado" if entrada["optimizado"] else "IR"
+            print(f"{clave[:16]}  {entrada['tamano'] / 1024:8.1f} KiB  {ultimo_uso}  {optimizado}")
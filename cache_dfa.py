@@ -0,0 +1,157 @@
+import atexit
+import glob
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from multiprocessing import util
+
+import antlr4
+from antlr4.PredictionContext import PredictionContext
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.SemanticContext import SemanticContext
+import LenLexer as modulo_lexer
+import LenParser as modulo_parser
+from LenLexer import LenLexer
+from LenParser import LenParser
+from cache_compilacion import DIRECTORIO_CACHE
+
+# El runtime de ANTLR arma el DFA de predicción desde cero en cada proceso. Aquí se guarda al
+# salir y se recarga en la siguiente ejecución; la huella del ATN invalida el archivo si cambia la gramática.
+# Se activa con LEN_CACHE_DFA=1: en un proceso nuevo cargar el pickle costó más (Lexer/Parser de
+# 0.10-0.13 seg) que armar el DFA desde cero (0.04-0.06 seg), así que no está activa por defecto.
+VERSION_CACHE_DFA = "1"
+ACTIVADA = os.environ.get("LEN_CACHE_DFA", "0") == "1"
+
+_estado = {"cargada": False, "estados_guardados": 0, "huella": None}
+
+
+def huella_gramatica():
+    if _estado["huella"]:
+        return _estado["huella"]
+    h = hashlib.sha256(VERSION_CACHE_DFA.encode())
+    h.update(repr(modulo_lexer.serializedATN()).encode())
+    h.update(repr(modulo_parser.serializedATN()).encode())
+    # Reinstalar o actualizar el runtime cambia la fecha de su paquete (importlib.metadata tarda más que el parseo)
+    try:
+        h.update(f"{antlr4.__file__}:{os.stat(antlr4.__file__).st_mtime_ns}".encode())
+    except OSError:
+        pass
+    h.update(f"{sys.version_info[0]}.{sys.version_info[1]}".encode())
+    _estado["huella"] = h.hexdigest()[:16]
+    return _estado["huella"]
+
+
+def ruta_cache_dfa(directorio=DIRECTORIO_CACHE):
+    return os.path.join(directorio, f"dfa_{huella_gramatica()}.pickle")
+
+
+def contar_estados():
+    return sum(len(dfa._states) for dfa in LenLexer.decisionsToDFA + LenParser.decisionsToDFA)
+
+
+class _PicklerDFA(pickle.Pickler):
+    # Los estados del ATN y los contextos únicos no se copian: se guardan como referencias
+    # y al cargar se resuelven contra el ATN ya construido del lexer/parser
+    def persistent_id(self, objeto):
+        if isinstance(objeto, ATNState):
+            return ("estado", "parser" if objeto.atn is LenParser.atn else "lexer", objeto.stateNumber)
+        if objeto is PredictionContext.EMPTY:
+            return ("contexto_vacio",)
+        if objeto is SemanticContext.NONE:
+            return ("semantica_vacia",)
+        return None
+
+
+class _UnpicklerDFA(pickle.Unpickler):
+    # El archivo está en un directorio relativo al de trabajo: solo se aceptan clases del DFA y del
+    # ATN de ANTLR, nunca funciones ni otros módulos (un pickle arbitrario ejecutaría código)
+    def find_class(self, modulo, nombre):
+        if "." not in nombre and (modulo == "antlr4.PredictionContext"
+                                  or modulo.startswith(("antlr4.atn.", "antlr4.dfa."))):
+            clase = super().find_class(modulo, nombre)
+            if isinstance(clase, type):
+                return clase
+        raise pickle.UnpicklingError(f"Clase no permitida en la caché DFA: {modulo}.{nombre}")
+
+    def persistent_load(self, referencia):
+        if referencia[0] == "estado":
+            atn = LenParser.atn if referencia[1] == "parser" else LenLexer.atn
+            return atn.states[referencia[2]]
+        if referencia[0] == "contexto_vacio":
+            return PredictionContext.EMPTY
+        if referencia[0] == "semantica_vacia":
+            return SemanticContext.NONE
+        raise pickle.UnpicklingError(f"Referencia desconocida: {referencia}")
+
+
+def cargar_cache_dfa(directorio=DIRECTORIO_CACHE):
+    # Una vez por proceso, antes del primer parseo. Devuelve True si se cargó un DFA guardado
+    if _estado["cargada"] or not ACTIVADA:
+        return False
+    _estado["cargada"] = True
+    atexit.register(guardar_cache_dfa, directorio)
+    # Los procesos de un pool de multiprocessing terminan con os._exit y no corren atexit
+    util.Finalize(None, guardar_cache_dfa, args=(directorio,), exitpriority=0)
+
+    if contar_estados():
+        # El proceso ya parseó algo (p. ej. el servidor): su DFA no se reemplaza
+        return False
+    ruta = ruta_cache_dfa(directorio)
+    try:
+        with open(ruta, "rb") as f:
+            lexer_dfa, parser_dfa = _UnpicklerDFA(f).load()
+        if len(lexer_dfa) != len(LenLexer.decisionsToDFA) or len(parser_dfa) != len(LenParser.decisionsToDFA):
+            raise ValueError("número de decisiones distinto")
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"[INFO] Caché DFA inválida ({type(e).__name__}); se descarta.")
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+        return False
+
+    LenLexer.decisionsToDFA[:] = lexer_dfa
+    LenParser.decisionsToDFA[:] = parser_dfa
+    _estado["estados_guardados"] = contar_estados()
+    return True
+
+
+def guardar_cache_dfa(directorio=DIRECTORIO_CACHE):
+    # Solo escribe si el DFA creció desde que se cargó o se guardó
+    estados = contar_estados()
+    if estados <= _estado["estados_guardados"]:
+        return False
+    ruta = ruta_cache_dfa(directorio)
+    limite = sys.getrecursionlimit()
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        # Escritura atómica: otros procesos del lote pueden estar leyendo el archivo
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        # Las cadenas de estados del DFA se serializan de forma recursiva
+        sys.setrecursionlimit(max(limite, 20000))
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                _PicklerDFA(f, protocol=pickle.HIGHEST_PROTOCOL).dump(
+                    (LenLexer.decisionsToDFA, LenParser.decisionsToDFA))
+            os.replace(temporal, ruta)
+        except BaseException:
+            os.remove(temporal)
+            raise
+    except (OSError, pickle.PicklingError, RecursionError):
+        return False
+    finally:
+        sys.setrecursionlimit(limite)
+
+    # Archivos de gramáticas anteriores
+    for viejo in glob.glob(os.path.join(directorio, "dfa_*.pickle")):
+        if viejo != ruta:
+            try:
+                os.remove(viejo)
+            except OSError:
+                pass
+    _estado["estados_guardados"] = estados
+    return True
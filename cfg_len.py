@@ -0,0 +1,214 @@
+# Grafo de flujo de control sobre el AST del cuerpo de una función o del programa principal.
+# Cada bloque básico guarda las sentencias simples que ejecuta en orden y sus sucesores; las
+# sentencias compuestas (si, loop, hacer-loop, for) se desarman en bloques y aristas.
+# Una condición literal true/false decide qué aristas existen. Como el lenguaje no tiene
+# break, un 'loop (true)' (o un for sin condición) nunca termina y lo que sigue es inalcanzable.
+
+from ast_node import ASTNode
+
+
+class BloqueBasico:
+    __slots__ = ("nombre", "sentencias", "sucesores")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.sentencias = []
+        self.sucesores = []
+
+    def __repr__(self):
+        return f"BloqueBasico({self.nombre}, {len(self.sentencias)} sentencia(s) -> {[b.nombre for b in self.sucesores]})"
+
+
+def _constante(cond):
+    # Valor de una condición literal true/false; None si depende de la ejecución
+    if cond is not None and cond.type == "Literal" and isinstance(cond.value, bool):
+        return cond.value
+    return None
+
+
+class GrafoFlujo:
+    def __init__(self, cuerpo):
+        self.bloques = []
+        self.retorno = self._nuevo("retorno")   # destino de cada 'ret'
+        self.fin = self._nuevo("fin")           # salida por el final del cuerpo, sin 'ret'
+        self.entrada = self._nuevo("entrada")
+        self._bloque_de = {}                    # id(sentencia) -> bloque en el que empieza
+        self._reglas = {
+            "Block": self._bloque,
+            "If": self._si,
+            "While": self._loop,
+            "DoWhile": self._hacer_loop,
+            "For": self._para,
+            "Return": self._retorno,
+        }
+        salida = self._sentencia(cuerpo, self.entrada)
+        if salida is not None:
+            salida.sucesores.append(self.fin)
+        self.alcanzables = self._recorrer(self.entrada)
+
+    def _nuevo(self, nombre):
+        bloque = BloqueBasico(nombre)
+        self.bloques.append(bloque)
+        return bloque
+
+    def _unir(self, salidas, nombre):
+        vivas = [s for s in salidas if s is not None]
+        if not vivas:
+            return None
+        union = self._nuevo(nombre)
+        for s in vivas:
+            s.sucesores.append(union)
+        return union
+
+    def _sentencia(self, nodo, actual):
+        # Devuelve el bloque donde sigue el control, o None si nunca sigue ('ret', ciclo infinito)
+        if nodo is None:
+            return actual
+        if actual is None:
+            # Detrás de una sentencia que no termina: bloque sin predecesores
+            actual = self._nuevo("inalcanzable")
+        self._bloque_de[id(nodo)] = actual
+        regla = self._reglas.get(nodo.type)
+        if regla is None:
+            actual.sentencias.append(nodo)
+            return actual
+        return regla(nodo, actual)
+
+    def _bloque(self, nodo, actual):
+        for hijo in nodo.children:
+            actual = self._sentencia(hijo, actual)
+        return actual
+
+    def _retorno(self, nodo, actual):
+        actual.sentencias.append(nodo)
+        actual.sucesores.append(self.retorno)
+        return None
+
+    def _si(self, nodo, actual):
+        cond = _constante(nodo.children[0])
+        entonces = self._nuevo("si_entonces")
+        if cond is not False:
+            actual.sucesores.append(entonces)
+        salidas = [self._sentencia(nodo.children[1], entonces)]
+        if len(nodo.children) == 3:
+            sino = self._nuevo("si_sino")
+            if cond is not True:
+                actual.sucesores.append(sino)
+            salidas.append(self._sentencia(nodo.children[2], sino))
+        elif cond is not True:
+            salidas.append(actual)
+        return self._unir(salidas, "si_fin")
+
+    def _ciclo(self, cond, cuerpo, paso, actual, nombre):
+        # cond: condición literal (True/False) o None; el cuerpo (y el paso) vuelven a la cabecera
+        cabecera = self._nuevo(f"{nombre}_cond")
+        actual.sucesores.append(cabecera)
+        entrada = self._nuevo(f"{nombre}_cuerpo")
+        if cond is not False:
+            cabecera.sucesores.append(entrada)
+        salida = self._sentencia(cuerpo, entrada)
+        if paso is not None and salida is not None:
+            salida = self._sentencia(paso, salida)
+        if salida is not None:
+            salida.sucesores.append(cabecera)
+        if cond is True:
+            return None
+        fin = self._nuevo(f"{nombre}_fin")
+        cabecera.sucesores.append(fin)
+        return fin
+
+    def _loop(self, nodo, actual):
+        return self._ciclo(_constante(nodo.children[0]), nodo.children[1], None, actual, "loop")
+
+    def _para(self, nodo, actual):
+        init, cond, paso, cuerpo = nodo.children
+        if init is not None:
+            actual = self._sentencia(init, actual)
+        # Sin condición el for no termina nunca
+        constante = True if cond is None else _constante(cond)
+        return self._ciclo(constante, cuerpo, paso, actual, "for")
+
+    def _hacer_loop(self, nodo, actual):
+        # El cuerpo se ejecuta al menos una vez; después, la condición decide si se repite
+        cuerpo = self._nuevo("hacer_cuerpo")
+        actual.sucesores.append(cuerpo)
+        salida = self._sentencia(nodo.children[0], cuerpo)
+        if salida is None:
+            return None
+        cond = _constante(nodo.children[1])
+        if cond is not False:
+            salida.sucesores.append(cuerpo)
+        if cond is True:
+            return None
+        fin = self._nuevo("hacer_fin")
+        salida.sucesores.append(fin)
+        return fin
+
+    def _recorrer(self, inicio):
+        vistos = {inicio}
+        pendientes = [inicio]
+        while pendientes:
+            for sucesor in pendientes.pop().sucesores:
+                if sucesor not in vistos:
+                    vistos.add(sucesor)
+                    pendientes.append(sucesor)
+        return vistos
+
+    def termina_sin_retorno(self):
+        # Algún camino llega al final del cuerpo sin pasar por un 'ret'
+        return self.fin in self.alcanzables
+
+    def es_alcanzable(self, nodo):
+        return self._bloque_de.get(id(nodo)) in self.alcanzables
+
+
+def garantiza_retorno(cuerpo):
+    return not GrafoFlujo(cuerpo).termina_sin_retorno()
+
+
+def _podar_cuerpo(nodo, grafo):
+    # Cuerpo de un ciclo o rama de un si: si no queda nada se reemplaza por un bloque vacío
+    podado = _podar(nodo, grafo)
+    return ASTNode("Block") if podado is None else podado
+
+
+def _podar(nodo, grafo):
+    # Nodo sin lo que nunca se ejecuta; None si el nodo entero es inalcanzable o no hace nada
+    if nodo is None or not grafo.es_alcanzable(nodo):
+        return None
+    tipo = nodo.type
+    if tipo == "Block":
+        nodo.children = [h for h in (_podar(c, grafo) for c in nodo.children) if h is not None]
+    elif tipo == "If":
+        cond = _constante(nodo.children[0])
+        # Con condición literal queda solo la rama que se ejecuta (el literal no tiene efectos)
+        if cond is True:
+            return _podar(nodo.children[1], grafo)
+        if cond is False:
+            return _podar(nodo.children[2], grafo) if len(nodo.children) == 3 else None
+        sino = _podar(nodo.children[2], grafo) if len(nodo.children) == 3 else None
+        nodo.children = [nodo.children[0], _podar_cuerpo(nodo.children[1], grafo)] + ([sino] if sino is not None else [])
+    elif tipo == "While":
+        if _constante(nodo.children[0]) is False:
+            return None     # loop (false)
+        nodo.children[1] = _podar_cuerpo(nodo.children[1], grafo)
+    elif tipo == "DoWhile":
+        nodo.children[0] = _podar_cuerpo(nodo.children[0], grafo)
+    elif tipo == "For":
+        if _constante(nodo.children[1]) is False:
+            return nodo.children[0]     # for con condición false: solo la inicialización
+        nodo.children[3] = _podar_cuerpo(nodo.children[3], grafo)
+    return nodo
+
+
+def podar_inalcanzable(programa):
+    # Quita del AST (en el lugar) las sentencias y ramas que nunca se ejecutan, antes de generar IR:
+    # lo que sigue a un 'ret' o a un ciclo infinito y las ramas de condiciones literales
+    for hijo in programa.children:
+        if hijo.type == "Functions":
+            for funcion in hijo.children:
+                cuerpo = funcion.children[-1]
+                funcion.children[-1] = _podar(cuerpo, GrafoFlujo(cuerpo))
+        elif hijo.type == "Block":
+            _podar(hijo, GrafoFlujo(hijo))
+    return programa
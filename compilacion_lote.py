@@ -0,0 +1,126 @@
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+
+from diagnosticos import ColectorDiagnosticos
+from metricas import RegistroMetricas
+
+
+def recolectar_fuentes(rutas, extension=".txt"):
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            for raiz, _, nombres in os.walk(ruta):
+                for nombre in sorted(nombres):
+                    if nombre.endswith(extension):
+                        archivos.append(os.path.join(raiz, nombre))
+        elif os.path.isfile(ruta):
+            archivos.append(ruta)
+        else:
+            print(f"✖ Ruta no encontrada, se omite: {ruta}")
+    # Sin duplicados, conservando el orden
+    return list(dict.fromkeys(archivos))
+
+
+def _compilar_uno(ruta, opciones, medir_memoria=False, diagnosticos=None):
+    # Corre en un proceso del pool: captura la salida y nunca deja escapar excepciones.
+    # `diagnosticos`: filtro del ColectorDiagnosticos ({"severidad", "ignorar"})
+    from ejecutor_jit import capturar_descriptor_salida
+    from menu import compilar_archivo
+    from SemanticoVal import SemanticError
+
+    metricas = RegistroMetricas(medir_memoria=medir_memoria)
+    colector = ColectorDiagnosticos(**(diagnosticos or {}))
+    salida = io.StringIO()
+    mensaje = ""
+    inicio = time.perf_counter()
+    try:
+        # La salida del programa (printf del JIT o de `lli`) va al descriptor 1, no a sys.stdout
+        with capturar_descriptor_salida() as ejecucion, redirect_stdout(salida):
+            resultado = compilar_archivo(ruta, metricas=metricas, diagnosticos=colector, **opciones)
+        estado = 0 if resultado else 1
+    except SemanticError as e:
+        estado = 1
+        mensaje = str(e)
+    except Exception as e:
+        estado = 1
+        mensaje = f"{type(e).__name__}: {e}"
+
+    if estado and not mensaje:
+        errores = [l for l in salida.getvalue().splitlines() if l.startswith(("✖", "["))]
+        mensaje = "\n".join(errores[:10]) or "La compilación falló."
+
+    return {
+        "ruta": ruta,
+        "estado": estado,
+        "tiempos": metricas.tiempos,
+        "mediciones": metricas.filas(ruta),
+        "duracion": time.perf_counter() - inicio,
+        "mensaje": mensaje,
+        "ejecucion": ejecucion["texto"],
+        "diagnosticos": [{**d.a_dict(), "archivo": ruta} for d in colector.filtrar()],
+    }
+
+
+def compilar_lote(archivos, opciones=None, trabajadores=None, medir_memoria=False, diagnosticos=None):
+    opciones = opciones or {}
+    resultados = []
+    total = len(archivos)
+    print(f"[INFO] Compilando {total} archivo(s) con {trabajadores or os.cpu_count()} proceso(s)...")
+
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        futuros = {pool.submit(_compilar_uno, ruta, opciones, medir_memoria, diagnosticos): ruta
+                   for ruta in archivos}
+        for n, futuro in enumerate(as_completed(futuros), 1):
+            ruta = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                # El proceso trabajador murió (p. ej. un fallo dentro de LLVM)
+                resultado = {"ruta": ruta, "estado": 1, "tiempos": {}, "mediciones": [], "duracion": 0.0,
+                             "mensaje": f"{type(e).__name__}: {e}", "ejecucion": "", "diagnosticos": []}
+            marca = "✔" if resultado["estado"] == 0 else "✖"
+            print(f"[{n}/{total}] {marca} {ruta} ({resultado['duracion']:.3f} seg)")
+            for linea in resultado["ejecucion"].splitlines():
+                print(f"    {linea}")
+            resultados.append(resultado)
+
+    orden = {ruta: i for i, ruta in enumerate(archivos)}
+    resultados.sort(key=lambda r: orden[r["ruta"]])
+    return resultados
+
+
+def imprimir_resumen(resultados):
+    exitosos = [r for r in resultados if r["estado"] == 0]
+    fallidos = [r for r in resultados if r["estado"] != 0]
+
+    print("\n=== RESUMEN DEL LOTE ===")
+    print(f"Archivos: {len(resultados)}  |  Exitosos: {len(exitosos)}  |  Fallidos: {len(fallidos)}")
+    advertencias = sum(1 for r in resultados for d in r["diagnosticos"] if d["severidad"] == "advertencia")
+    if advertencias:
+        print(f"Advertencias semánticas: {advertencias}")
+
+    acumulado = {}
+    for r in exitosos:
+        for fase, duracion in r["tiempos"].items():
+            acumulado[fase] = acumulado.get(fase, 0.0) + duracion
+    if acumulado:
+        print("\n=== TIEMPO ACUMULADO POR FASE ===")
+        for fase, duracion in acumulado.items():
+            print(f"{fase:15}: {duracion:.4f} seg")
+
+    if fallidos:
+        print("\n=== ARCHIVOS CON ERRORES ===")
+        for r in fallidos:
+            print(f"✖ {r['ruta']}")
+            for linea in r["mensaje"].splitlines():
+                print(f"    {linea}")
+
+
+def guardar_resumen_json(resultados, ruta):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    print(f"✔ Resumen guardado en '{ruta}'")
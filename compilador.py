@@ -0,0 +1,183 @@
+import threading
+
+from metricas import RegistroMetricas
+from SintacticoVal import validar_len_sintaxis_general
+
+# Punto de entrada como biblioteca: compila texto en memoria, sin imprimir, sin escribir archivos
+# y sin estado global propio, para poder compilar varios programas a la vez desde un mismo proceso.
+# menu.compilar_archivo sigue siendo la versión de consola (caché, .ll en disco, ejecución).
+
+OPCIONES_POR_DEFECTO = {
+    "optimizar": False,        # False o un nivel (O0-O3, Os)
+    "pases": None,             # lista de pases propios de LLVM
+    "modo_parseo": "dos_etapas",
+    "validacion": "previa",
+    "max_errores": 1,          # errores semánticos a reunir (0 = todos)
+    "verificar": False,        # verificar el módulo con LLVM aunque no se optimice
+}
+
+# El DFA de predicción de ANTLR es compartido por todos los parsers del proceso y
+# llvmlite usa un único contexto de LLVM: esas dos partes se serializan
+_CANDADO_ANTLR = threading.Lock()
+_CANDADO_LLVM = threading.Lock()
+
+
+class ResultadoCompilacion:
+    def __init__(self, nombre="<fuente>"):
+        self.nombre = nombre
+        self.ok = False
+        self.errores = []
+        self.avisos = []
+        self.diagnosticos = []      # registros Diagnostico de errores y advertencias semánticos
+        self.ast = None
+        self.modulo = None          # ir.Module de llvmlite
+        self.ir = None              # texto del IR sin optimizar
+        self.ir_optimizado = None
+        self.tiempos = {}
+        self.mediciones = []
+
+    def __repr__(self):
+        estado = "ok" if self.ok else f"{len(self.errores)} error(es)"
+        return f"ResultadoCompilacion({self.nombre!r}, {estado}, {len(self.avisos)} aviso(s))"
+
+
+def compilar_fuente(fuente, opciones=None, nombre="<fuente>"):
+    desconocidas = set(opciones or {}) - set(OPCIONES_POR_DEFECTO)
+    if desconocidas:
+        raise ValueError(f"Opciones desconocidas: {', '.join(sorted(desconocidas))}")
+    opciones = {**OPCIONES_POR_DEFECTO, **(opciones or {})}
+
+    resultado = ResultadoCompilacion(nombre)
+    metricas = RegistroMetricas()
+    try:
+        resultado.ok = _compilar(fuente, opciones, resultado, metricas)
+    finally:
+        metricas.registrar_total()
+        resultado.tiempos = metricas.tiempos
+        resultado.mediciones = metricas.mediciones
+    return resultado
+
+
+compile_source = compilar_fuente
+
+
+def _compilar(fuente, opciones, resultado, metricas):
+    nivel = None
+    if opciones["optimizar"] or opciones["pases"]:
+        from optimizador import normalizar_nivel
+        try:
+            nivel = normalizar_nivel(opciones["optimizar"]) if opciones["optimizar"] else "O0"
+        except ValueError as e:
+            resultado.errores.append(str(e))
+            return False
+
+    if opciones["validacion"] not in ("previa", "en_error"):
+        resultado.errores.append(f"Modo de validación desconocido '{opciones['validacion']}'.")
+        return False
+    if opciones["validacion"] == "previa":
+        with metricas.fase('Sintáctico'):
+            resultado.errores = validar_len_sintaxis_general(fuente, metricas)
+        if resultado.errores:
+            return False
+
+    ast = None
+    if opciones["modo_parseo"] == "rapido":
+        from parser_rapido import ErrorParseoRapido, parsear_rapido
+        from semantico_rapido import NoVerificable, verificar_ast_rapido
+        with metricas.fase('Parser rápido'):
+            try:
+                ast = parsear_rapido(fuente)
+            except ErrorParseoRapido:
+                ast = None
+        if ast is not None:
+            # Solo sigue por el camino rápido lo que el análisis semántico acepta sin avisos
+            with metricas.fase('Semántico rápido'):
+                try:
+                    ast = verificar_ast_rapido(ast)
+                except NoVerificable:
+                    ast = None
+        if ast is not None and not _generar(ast, resultado, metricas, verificar=True, silencioso=True):
+            ast = None
+    if ast is None:
+        modo = "dos_etapas" if opciones["modo_parseo"] == "rapido" else opciones["modo_parseo"]
+        ast = _analizar(fuente, modo, opciones, resultado, metricas)
+        if ast is None or not _generar(ast, resultado, metricas, verificar=opciones["verificar"]):
+            return False
+    resultado.ast = ast
+
+    if nivel:
+        from optimizador import optimizar_modulo
+        with metricas.fase('Optimización'):
+            try:
+                with _CANDADO_LLVM:
+                    modulo_opt, tiempos_pases = optimizar_modulo(resultado.modulo, nivel=nivel,
+                                                                 pases=opciones["pases"])
+                    resultado.ir_optimizado = str(modulo_opt)
+            except (RuntimeError, ValueError) as e:
+                resultado.errores.append(f"Error al optimizar: {e}")
+                return False
+            for nombre_pase, (pared, cpu) in tiempos_pases.items():
+                metricas.registrar(nombre_pase, pared, cpu)
+    return True
+
+
+def _analizar(fuente, modo_parseo, opciones, resultado, metricas):
+    # Lexer/Parser y Semántico+AST; devuelve el AST o None con los errores en `resultado`
+    from analisis_fusionado import AnalizadorFusionado
+    from parseo_len import ColectorErroresSintaxis, parsear_fuente
+    from SemanticoVal import SemanticError
+
+    colector = ColectorErroresSintaxis()
+    with metricas.fase('Lexer/Parser'):
+        try:
+            with _CANDADO_ANTLR:
+                tree = parsear_fuente(fuente, modo_parseo, metricas, colector)
+        except ValueError as e:
+            resultado.errores.append(str(e))
+            return None
+        except RecursionError:
+            resultado.errores.append("El programa anida demasiadas expresiones o bloques para el parser.")
+            return None
+    if colector.errores:
+        if opciones["validacion"] == "en_error":
+            with metricas.fase('Sintáctico'):
+                resultado.errores = validar_len_sintaxis_general(fuente, metricas)
+        resultado.errores += colector.errores
+        return None
+
+    analizador = AnalizadorFusionado(imprimir_avisos=False, max_errores=opciones["max_errores"])
+    try:
+        with metricas.fase('Semántico+AST'):
+            return analizador.analizar(tree)
+    except SemanticError as e:
+        resultado.errores.extend(e.errores)
+    except Exception as e:
+        resultado.errores.append(f"Error al construir el AST: {type(e).__name__}: {e}")
+    finally:
+        resultado.avisos = analizador.warnings
+        resultado.diagnosticos = analizador.diagnosticos.registros
+    return None
+
+
+def _generar(ast, resultado, metricas, verificar=False, silencioso=False):
+    # Con `silencioso` un fallo no se reporta (el parser rápido reintenta con ANTLR)
+    from cfg_len import podar_inalcanzable
+    from generador_len import LLVMGeneratorLen
+    try:
+        with metricas.fase('Poda CFG'):
+            podar_inalcanzable(ast)
+        with metricas.fase('LLVM Gen'):
+            generator = LLVMGeneratorLen()
+            generator.generate(ast)
+            texto_ir = str(generator.module)
+            if verificar:
+                from entorno_llvm import parsear_modulo
+                with _CANDADO_LLVM:
+                    parsear_modulo(texto_ir)
+    except Exception as e:
+        if not silencioso:
+            resultado.errores.append(f"Error al generar LLVM IR: {type(e).__name__}: {e}")
+        return False
+    resultado.modulo = generator.module
+    resultado.ir = texto_ir
+    return True
@@ -0,0 +1,114 @@
+import argparse
+import json
+
+# Errores y advertencias como registros en memoria (severidad, línea, columna, código, mensaje).
+# Nada se imprime durante el análisis: la salida se arma de una vez, como texto o JSON,
+# después del recorrido y con el filtro de severidad y códigos que pida el llamador.
+
+SEVERIDADES = ("error", "advertencia")          # de mayor a menor
+ETIQUETAS = {"error": "Error semántico", "advertencia": "Advertencia"}
+
+
+def limite_errores(texto):
+    # Tipo de argparse para --max-errores: entero >= 0 (0 = sin límite)
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{texto}' no es un número entero")
+    if valor < 0:
+        raise argparse.ArgumentTypeError(f"debe ser 0 (sin límite) o mayor, no {valor}")
+    return valor
+
+
+class Diagnostico:
+    __slots__ = ("severidad", "linea", "columna", "codigo", "mensaje", "archivo")
+
+    def __init__(self, severidad, linea, columna, codigo, mensaje, archivo=None):
+        self.severidad = severidad
+        self.linea = linea
+        self.columna = columna
+        self.codigo = codigo
+        self.mensaje = mensaje
+        self.archivo = archivo
+
+    def texto(self):
+        # Mismo formato que los mensajes de SemanticoVal
+        linea = self.linea if self.linea is not None else "desconocida"
+        return f"[Línea {linea}] {ETIQUETAS[self.severidad]}: {self.mensaje}"
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __repr__(self):
+        return f"Diagnostico({self.severidad}, {self.codigo}, línea {self.linea})"
+
+
+def posicion(ctx):
+    # Línea y columna (desde 1) del primer token del contexto de ANTLR; (None, None) si no tiene
+    token = getattr(ctx, "start", None)
+    if token is None:
+        return None, None
+    return token.line, token.column + 1
+
+
+def desde_contexto(severidad, ctx, codigo, mensaje):
+    return Diagnostico(severidad, *posicion(ctx), codigo, mensaje)
+
+
+class ColectorDiagnosticos:
+    # `severidad`: la mínima que se muestra ("error" oculta las advertencias).
+    # `ignorar`: códigos que no se muestran. Ambos filtros solo afectan la salida, no el registro.
+    def __init__(self, severidad="advertencia", ignorar=()):
+        if severidad not in SEVERIDADES:
+            raise ValueError(f"Severidad desconocida '{severidad}'. Opciones: {', '.join(SEVERIDADES)}")
+        self.severidad = severidad
+        self.ignorar = set(ignorar)
+        self.registros = []
+
+    def agregar(self, diagnostico):
+        self.registros.append(diagnostico)
+        return diagnostico
+
+    def filtrar(self, severidades=None, codigos=None):
+        # Siempre aplica el filtro del colector; `severidades` y `codigos` lo restringen más
+        visibles = SEVERIDADES[:SEVERIDADES.index(self.severidad) + 1]
+        return [d for d in self.registros
+                if d.severidad in visibles and d.codigo not in self.ignorar
+                and (severidades is None or d.severidad in severidades)
+                and (codigos is None or d.codigo in codigos)]
+
+    @property
+    def errores(self):
+        return [d for d in self.registros if d.severidad == "error"]
+
+    @property
+    def advertencias(self):
+        return [d for d in self.registros if d.severidad == "advertencia"]
+
+    def como_texto(self, registros=None):
+        registros = self.filtrar() if registros is None else registros
+        return "\n".join(d.texto() for d in registros)
+
+    def como_json(self, registros=None):
+        registros = self.filtrar() if registros is None else registros
+        return json.dumps([d.a_dict() for d in registros], ensure_ascii=False, indent=2)
+
+    def emitir(self, formato="texto", severidades=None):
+        # Una sola escritura a la salida estándar
+        registros = self.filtrar(severidades)
+        if not registros:
+            return
+        print(self.como_json(registros) if formato == "json" else self.como_texto(registros))
+
+
+def exportar_diagnosticos(ruta, registros):
+    # `registros`: diccionarios de Diagnostico.a_dict(). El formato se elige por la extensión:
+    # .json, o texto con una línea por diagnóstico (archivo:línea:columna: severidad [código] mensaje)
+    with open(ruta, "w", encoding="utf-8") as f:
+        if ruta.lower().endswith(".json"):
+            json.dump(registros, f, ensure_ascii=False, indent=2)
+        else:
+            for d in registros:
+                posicion = ":".join(str(x) for x in (d["archivo"], d["linea"], d["columna"]) if x is not None)
+                f.write(f"{posicion}: {d['severidad']} [{d['codigo']}] {d['mensaje']}\n")
+    print(f"✔ Diagnósticos guardados en '{ruta}'")
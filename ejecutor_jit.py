@@ -0,0 +1,126 @@
+import ctypes
+import os
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from contextlib import contextmanager
+
+import llvmlite.binding as llvm
+from entorno_llvm import crear_target_machine, parsear_modulo
+from metricas import RegistroMetricas
+
+_libc = ctypes.CDLL(None)
+
+
+@contextmanager
+def capturar_descriptor_salida():
+    # printf del programa escribe en el descriptor 1, no en sys.stdout:
+    # se redirige el descriptor a un archivo temporal mientras corre
+    capturado = {"texto": ""}
+    sys.stdout.flush()
+    _libc.fflush(None)
+    original = os.dup(1)
+    with tempfile.TemporaryFile() as temporal:
+        os.dup2(temporal.fileno(), 1)
+        try:
+            yield capturado
+        finally:
+            _libc.fflush(None)
+            os.dup2(original, 1)
+            os.close(original)
+            temporal.seek(0)
+            capturado["texto"] = temporal.read().decode("utf-8", errors="replace")
+
+
+def compilar_jit(modulo):
+    # Parsea y compila a código nativo el módulo en memoria (sin pasar por disco)
+    mod = parsear_modulo(modulo)
+    target_machine = crear_target_machine()
+    motor = llvm.create_mcjit_compiler(mod, target_machine)
+    motor.finalize_object()
+    motor.run_static_constructors()
+    return motor
+
+
+def ejecutar_main(motor):
+    direccion = motor.get_function_address("main")
+    if not direccion:
+        raise RuntimeError("El módulo no define la función 'main'.")
+    main = ctypes.CFUNCTYPE(None)(direccion)
+
+    # printf escribe directo al descriptor 1; vaciar antes el buffer de Python
+    sys.stdout.flush()
+    main()
+
+
+def ejecutar_modulo_jit(modulo, metricas=None):
+    print("\n[INFO] Ejecutando IR con JIT (en proceso)...")
+    metricas = metricas or RegistroMetricas()
+    try:
+        with metricas.fase("Compilación JIT") as compilacion:
+            motor = compilar_jit(modulo)
+        with metricas.fase("Ejecución IR") as ejecucion:
+            ejecutar_main(motor)
+        print(f"[INFO] Tiempo de compilación JIT: {compilacion['tiempo_pared']:.4f} segundos")
+        print(f"[INFO] Tiempo de ejecución: {ejecucion['tiempo_pared']:.4f} segundos")
+        return compilacion['tiempo_pared'], ejecucion['tiempo_pared']
+
+    except RuntimeError as e:
+        print(f"✖ Error al compilar/ejecutar con JIT: {e}")
+    return None
+
+
+def ejecutar_aislado(modulo, limite=None):
+    # Compila y ejecuta `main` en un proceso hijo: un desbordamiento de pila o un ciclo infinito
+    # no alcanzan al proceso que llama. Devuelve (codigo, salida): codigo 0 si terminó bien,
+    # negativo si lo terminó una señal (-11 = SIGSEGV) y None si superó `limite` segundos
+    sys.stdout.flush()
+    _libc.fflush(None)
+    with tempfile.TemporaryFile() as temporal:
+        pid = os.fork()
+        if pid == 0:
+            codigo = 1
+            try:
+                os.dup2(temporal.fileno(), 1)
+                ejecutar_main(compilar_jit(modulo))
+                codigo = 0
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                _libc.fflush(None)
+                os._exit(codigo)
+
+        codigo = _esperar_hijo(pid, limite)
+        temporal.seek(0)
+        return codigo, temporal.read().decode("utf-8", errors="replace")
+
+
+def _esperar_hijo(pid, limite):
+    fin = None if limite is None else time.monotonic() + limite
+    while True:
+        terminado, estado = os.waitpid(pid, os.WNOHANG)
+        if terminado:
+            return os.waitstatus_to_exitcode(estado)
+        if fin is not None and time.monotonic() >= fin:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return None
+        time.sleep(0.001)
+
+
+def describir_fallo(codigo, limite=None):
+    # Mensaje para el código que devuelve ejecutar_aislado (None si terminó bien)
+    if codigo is None:
+        return f"El programa superó el límite de {limite} seg y se detuvo."
+    if codigo < 0:
+        try:
+            nombre = signal.Signals(-codigo).name
+        except ValueError:
+            nombre = f"señal {-codigo}"
+        return f"El programa terminó por {nombre} (p. ej. recursión sin fin o acceso inválido a memoria)."
+    if codigo:
+        return f"El programa terminó con código {codigo}."
+    return None
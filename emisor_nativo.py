@@ -0,0 +1,90 @@
+import os
+import subprocess
+
+import llvmlite.binding as llvm
+from entorno_llvm import crear_target_machine, inicializar_llvm, parsear_modulo
+
+# triple None = el del equipo actual
+OBJETIVOS = {
+    "linux": {"triple": None, "enlazador": "cc", "extension": "", "reloc": "pic", "bibliotecas": ["-lm"]},
+    "windows": {"triple": "x86_64-pc-windows-gnu", "enlazador": "x86_64-w64-mingw32-gcc", "extension": ".exe",
+                "reloc": "default", "bibliotecas": []},
+}
+
+
+def datos_cpu(cpu="", features=""):
+    # "native" usa el CPU y las extensiones del equipo que compila
+    if cpu == "native":
+        inicializar_llvm()
+        cpu = llvm.get_host_cpu_name()
+        if not features:
+            features = llvm.get_host_cpu_features().flatten()
+    return cpu, features
+
+
+def emitir_objeto(modulo, ruta_objeto, objetivo="linux", triple=None, cpu="", features="", opt=2):
+    config = OBJETIVOS[objetivo]
+    cpu, features = datos_cpu(cpu, features)
+    triple = triple or config["triple"] or llvm.get_default_triple()
+
+    mod = parsear_modulo(modulo)
+    if mod is modulo:
+        # No alterar el triple del módulo que se usa después para ejecutar con JIT
+        mod = mod.clone()
+    target_machine = crear_target_machine(triple, cpu=cpu, features=features, opt=opt,
+                                          reloc=config["reloc"], codemodel="default")
+    mod.triple = triple
+    mod.data_layout = str(target_machine.target_data)
+
+    with open(ruta_objeto, "wb") as f:
+        f.write(target_machine.emit_object(mod))
+    return ruta_objeto
+
+
+def enlazar(ruta_objeto, ruta_ejecutable, objetivo="linux", enlazador=None):
+    config = OBJETIVOS[objetivo]
+    comando = [enlazador or config["enlazador"], ruta_objeto, "-o", ruta_ejecutable] + config["bibliotecas"]
+    try:
+        resultado = subprocess.run(comando, capture_output=True, text=True)
+    except FileNotFoundError:
+        print(f"✖ Error: No se encontró el enlazador `{comando[0]}` en PATH.")
+        return False
+    if resultado.returncode != 0:
+        print(f"✖ Falló el enlace con {comando[0]}:")
+        print(resultado.stderr)
+        return False
+    return True
+
+
+def generar_ejecutable(modulo, nombre_base, objetivo="linux", triple=None, cpu="", features="",
+                       enlazador=None, metricas=None, ruta_fuente=None):
+    # Devuelve la ruta del ejecutable o None si falla
+    if objetivo not in OBJETIVOS:
+        print(f"✖ Objetivo desconocido '{objetivo}'. Opciones: {', '.join(OBJETIVOS)}")
+        return None
+    ruta_objeto = f"{nombre_base}.o"
+    ruta_ejecutable = nombre_base + OBJETIVOS[objetivo]["extension"]
+    if ruta_fuente is not None and os.path.abspath(ruta_ejecutable) == os.path.abspath(ruta_fuente):
+        # Fuente sin extensión (objetivo linux): el ejecutable no debe reemplazarla
+        ruta_ejecutable += ".out"
+
+    try:
+        if metricas is None:
+            emitir_objeto(modulo, ruta_objeto, objetivo, triple, cpu, features)
+        else:
+            with metricas.fase('Emisión objeto'):
+                emitir_objeto(modulo, ruta_objeto, objetivo, triple, cpu, features)
+    except RuntimeError as e:
+        print(f"✖ Error al generar el archivo objeto: {e}")
+        return None
+    print(f"✔ Archivo objeto generado: {ruta_objeto}")
+
+    if metricas is None:
+        enlazado = enlazar(ruta_objeto, ruta_ejecutable, objetivo, enlazador)
+    else:
+        with metricas.fase('Enlace'):
+            enlazado = enlazar(ruta_objeto, ruta_ejecutable, objetivo, enlazador)
+    if not enlazado:
+        return None
+    print(f"✔ Ejecutable generado: {ruta_ejecutable}")
+    return ruta_ejecutable
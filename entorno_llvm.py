@@ -0,0 +1,36 @@
+from llvmlite import ir
+import llvmlite.binding as llvm
+
+_inicializado = False
+
+
+def inicializar_llvm():
+    # Solo se necesita una vez por proceso
+    global _inicializado
+    if not _inicializado:
+        llvm.initialize_native_target()
+        llvm.initialize_native_asmprinter()
+        _inicializado = True
+
+
+def crear_target_machine(triple=None, cpu="", features="", opt=2, reloc="default", codemodel="jitdefault"):
+    inicializar_llvm()
+    if triple:
+        target = llvm.Target.from_triple(triple)
+    else:
+        target = llvm.Target.from_default_triple()
+    return target.create_target_machine(cpu=cpu, features=features, opt=opt, reloc=reloc, codemodel=codemodel)
+
+
+def parsear_modulo(modulo):
+    # Acepta un ir.Module de llvmlite, texto IR, bitcode o un ModuleRef ya parseado
+    inicializar_llvm()
+    if isinstance(modulo, llvm.ModuleRef):
+        return modulo
+    if isinstance(modulo, bytes):
+        return llvm.parse_bitcode(modulo)
+    if isinstance(modulo, ir.Module):
+        modulo = str(modulo)
+    mod = llvm.parse_assembly(modulo)
+    mod.verify()
+    return mod
@@ -1,18 +1,79 @@
 from llvmlite import ir
 import llvmlite.binding as llvm
 
+# Conversiones implícitas entre tipos del lenguaje: (origen, destino) -> instrucción de LLVM
+CONVERSIONES = {
+    ("entero", "decimal"): "sitofp",
+    ("decimal", "entero"): "fptosi",
+    ("bool", "entero"): "zext",
+    ("entero", "bool"): "trunc",
+}
+
+# Operadores aritméticos: instrucción para decimales y para enteros
+_ARITMETICOS = {
+    "+": ("fadd", "add"),
+    "-": ("fsub", "sub"),
+    "*": ("fmul", "mul"),
+    "/": ("fdiv", "sdiv"),
+    "%": ("frem", "srem"),
+}
+_COMPARACIONES = ("<", "<=", ">", ">=", "==", "!=")
+
+# Tipo del lenguaje de cada tipo escalar de LLVM (para un AST sin anotaciones)
+_TIPOS_LEN = {
+    ir.IntType(32): "entero",
+    ir.DoubleType(): "decimal",
+    ir.IntType(1): "bool",
+}
+
 class LLVMGeneratorLen:
     def __init__(self):
         self.module = ir.Module(name="len_module")
         self.module.triple = llvm.get_default_triple()  # ← ESTA LÍNEA
         self.builder = None
         self.funcs = {}
-        self.variables = {}
+        self.variables = {}     # variables visibles en el bloque en curso, por nombre
+        self._declaradas = []   # (nombre, puntero que tapó) de cada variable local, para deshacerla
+        self.globales = {}
+        self.simbolos = {}      # Simbolo del análisis semántico -> puntero (AST anotado)
         self.printf = self.declare_printf()
         self.fflush = self.declare_fflush()
         self.string_constants = {}
         self.concat_fn = None
         self.declare_string_helpers()
+        # Despacho por tipo de nodo y por operador (en lugar de cadenas de if/elif)
+        self._sentencias = {
+            "Program": self.handle_program,
+            "Block": self.handle_block,
+            "GlobalDeclaration": self.handle_global_declaration,
+            "Declaration": self.handle_declaration,
+            "Function": self.handle_function,
+            "Print": self.handle_print,
+            "If": self.handle_if,
+            "While": self.handle_while,
+            "Assign": self.handle_assign,
+            "DoWhile": self.handle_do_while,
+            "For": self.handle_for,
+            "Return": self.handle_return,
+            "InferredDeclaration": self.handle_inferred_declaration,
+            "FunctionCall": self.handle_function_call,
+            "Functions": self.handle_functions,
+        }
+        self._expresiones = {
+            "Literal": lambda node: self.handle_literal(node.value),
+            "Variable": lambda node: self.handle_variable(node.value, node),
+            "BinaryOp": self.handle_binary_expr,
+            "UnaryOp": self.handle_unary_op,
+            "FunctionCall": self.handle_function_call,
+        }
+        self._operadores = {op: self._aritmetica for op in _ARITMETICOS}
+        self._operadores.update({op: self._comparacion for op in _COMPARACIONES})
+        self._operadores.update({
+            "+": self._suma,
+            "^": lambda op, lhs, rhs: self.handle_power(lhs, rhs),
+            "and": self._logica,
+            "or": self._logica,
+        })
 
 
 
@@ -23,47 +84,43 @@ class LLVMGeneratorLen:
     
 
     def generate(self, node):
-        if node.type == "Program":
-            return self.handle_program(node)
-        elif node.type == "Block":
-            return self.handle_block(node)
-        elif node.type == "GlobalDeclaration":
-            return self.handle_global_declaration(node)
-        elif node.type == "Declaration":
-            return self.handle_declaration(node)
-        elif node.type == "Function":
-            return self.handle_function(node)
-        elif node.type == "Print":
-            return self.handle_print(node)
-        elif node.type == "If":
-            return self.handle_if(node)
-        elif node.type == "While":
-            return self.handle_while(node)
-        elif node.type == "Assign":
-            return self.handle_assign(node)
-        elif node.type == "DoWhile":
-            return self.handle_do_while(node)
-        elif node.type == "For":
-            return self.handle_for(node)
-        elif node.type == "Return":
-            return self.handle_return(node)
-        elif node.type == "InferredDeclaration":
-            return self.handle_inferred_declaration(node)
-        elif node.type == "FunctionCall":
-            return self.handle_function_call(node)
-        elif node.type == "Functions":
-            for func in node.children:
-                self.generate(func)
-        else:
+        manejador = self._sentencias.get(node.type)
+        if manejador is None:
             raise Exception(f"⚠️ Nodo no soportado en generate: {node.type}")
-        
+        return manejador(node)
+
+    def handle_functions(self, node):
+        for func in node.children:
+            self.generate(func)
+
     def handle_inferred_declaration(self, node):
         nombre = node.value
         expr = node.children[0]
         val = self.generate_expr(expr)
         ptr = self.builder.alloca(val.type, name=nombre)
         self.builder.store(val, ptr)
-        self.variables[nombre] = ptr
+        self.registrar_variable(node, nombre, ptr)
+
+    def registrar_variable(self, node, nombre, ptr, tabla=None):
+        # Con AST anotado la variable se guarda por su símbolo; el nombre queda como respaldo
+        simbolo = getattr(node, "simbolo", None)
+        if simbolo is not None:
+            self.simbolos[simbolo] = ptr
+        if tabla is None:
+            self._declaradas.append((nombre, self.variables.get(nombre)))
+            tabla = self.variables
+        tabla[nombre] = ptr
+
+    def buscar_variable(self, node, nombre):
+        simbolo = getattr(node, "simbolo", None)
+        if simbolo is not None and simbolo in self.simbolos:
+            return self.simbolos[simbolo]
+        ptr = self.variables.get(nombre)
+        if ptr is None:
+            ptr = self.globales.get(nombre)
+        if ptr is None:
+            raise Exception(f"Variable '{nombre}' no declarada")
+        return ptr
 
 
     def handle_function_call(self, node):
@@ -76,18 +133,10 @@ class LLVMGeneratorLen:
         final_args = []
 
         for val, expected_type in zip(arg_vals, param_types):
-            if val.type != expected_type:
-                if val.type == ir.IntType(32) and expected_type == ir.DoubleType():
-                    val = self.builder.sitofp(val, ir.DoubleType())
-                elif val.type == ir.DoubleType() and expected_type == ir.IntType(32):
-                    val = self.builder.fptosi(val, ir.IntType(32))
-                elif val.type == ir.IntType(1) and expected_type == ir.IntType(32):
-                    val = self.builder.zext(val, ir.IntType(32))
-                elif val.type == ir.IntType(32) and expected_type == ir.IntType(1):
-                    val = self.builder.trunc(val, ir.IntType(1))
-                else:
-                    raise Exception(f"Incompatibilidad de tipos en argumentos: {val.type} vs {expected_type}")
-            final_args.append(val)
+            convertido = self.ajustar_tipo(val, expected_type)
+            if convertido is None:
+                raise Exception(f"Incompatibilidad de tipos en argumentos: {val.type} vs {expected_type}")
+            final_args.append(convertido)
 
         return self.builder.call(func, final_args)
 
@@ -144,8 +193,12 @@ class LLVMGeneratorLen:
 
         self.builder.position_at_start(body_bb)
         self.generate(node.children[0])  # cuerpo
-        if self.builder.block.terminator is None:
-            self.builder.branch(cond_bb)
+        if self.builder.block.terminator is not None:
+            # El cuerpo siempre retorna (no hay break): la condición y la salida no se alcanzan
+            self.builder.function.blocks.remove(cond_bb)
+            self.builder.function.blocks.remove(after_bb)
+            return
+        self.builder.branch(cond_bb)
 
         self.builder.position_at_start(cond_bb)
         cond = self.generate_expr(node.children[1])
@@ -163,10 +216,7 @@ class LLVMGeneratorLen:
 
 
     def handle_assign(self, node):
-        nombre = node.value
-        if nombre not in self.variables:
-            raise Exception(f"Variable '{nombre}' no declarada")
-        ptr = self.variables[nombre]
+        ptr = self.buscar_variable(node, node.value)
         val = self.generate_expr(node.children[0])
         self.builder.store(val, ptr)
 
@@ -203,7 +253,8 @@ class LLVMGeneratorLen:
 
         # Paso 3: Generar el cuerpo principal
         self.builder = ir.IRBuilder(main_block)
-        self.variables = self.variables.copy()
+        self.variables = {}
+        self._declaradas = []
 
         for child in node.children:
             if child.type not in ["Functions", "GlobalDeclaration"]:
@@ -221,8 +272,19 @@ class LLVMGeneratorLen:
 
     
     def handle_block(self, node):
+        # Al salir se deshacen solo los nombres que declaró el bloque: vuelven a verse los de afuera
+        marca = len(self._declaradas)
         for stmt in node.children:
+            # Tras un 'ret' el bloque ya está cerrado: lo que sigue no se ejecuta
+            if self.builder.block.terminator is not None:
+                break
             self.generate(stmt)
+        while len(self._declaradas) > marca:
+            nombre, anterior = self._declaradas.pop()
+            if anterior is None:
+                del self.variables[nombre]
+            else:
+                self.variables[nombre] = anterior
 
     def handle_declaration(self, node):
         tipo = node.value["tipo"]
@@ -232,21 +294,12 @@ class LLVMGeneratorLen:
 
         if node.children:
             val = self.generate_expr(node.children[0])
-            if val.type != ptr.type.pointee:
-                if val.type == ir.IntType(32) and ptr.type.pointee == ir.DoubleType():
-                    val = self.builder.sitofp(val, ir.DoubleType())
-                elif val.type == ir.DoubleType() and ptr.type.pointee == ir.IntType(32):
-                    val = self.builder.fptosi(val, ir.IntType(32))
-                elif val.type == ir.IntType(1) and ptr.type.pointee == ir.IntType(32):
-                    val = self.builder.zext(val, ir.IntType(32))
-                elif val.type == ir.IntType(32) and ptr.type.pointee == ir.IntType(1):
-                    val = self.builder.trunc(val, ir.IntType(1))
-                else:
-                    raise Exception(f"Tipo incompatible en declaración: {val.type} → {ptr.type.pointee}")
-            self.builder.store(val, ptr)
-
-
-        self.variables[nombre] = ptr
+            convertido = self.ajustar_tipo(val, ptr.type.pointee)
+            if convertido is None:
+                raise Exception(f"Tipo incompatible en declaración: {val.type} → {ptr.type.pointee}")
+            self.builder.store(convertido, ptr)
+
+        self.registrar_variable(node, nombre, ptr)
 
     def handle_if(self, node):
         cond = self.generate_expr(node.children[0])
@@ -264,6 +317,7 @@ class LLVMGeneratorLen:
         merge_bb = self.builder.append_basic_block("if_merge")
 
         # ✅ Verificar si el bloque actual ya tiene terminador antes de cbranch
+        llega_merge = else_bb is None
         if self.builder.block.terminator is None:
             self.builder.cbranch(cond, then_bb, else_bb if else_bb else merge_bb)
 
@@ -272,6 +326,7 @@ class LLVMGeneratorLen:
         self.generate(node.children[1])
         if self.builder.block.terminator is None:
             self.builder.branch(merge_bb)
+            llega_merge = True
 
         # ELSE
         if else_bb:
@@ -279,9 +334,13 @@ class LLVMGeneratorLen:
             self.generate(node.children[2])
             if self.builder.block.terminator is None:
                 self.builder.branch(merge_bb)
+                llega_merge = True
 
-        # MERGE
-        self.builder.position_at_start(merge_bb)
+        # MERGE: si ambas ramas retornan no hay a dónde seguir y el bloque vacío sobra
+        if llega_merge:
+            self.builder.position_at_start(merge_bb)
+        else:
+            self.builder.function.blocks.remove(merge_bb)
 
 
     def handle_while(self, node):
@@ -331,14 +390,13 @@ class LLVMGeneratorLen:
         else:
             var.initializer = ir_type(0)
 
-        self.variables[nombre] = var
+        self.registrar_variable(node, nombre, var, self.globales)
 
 
     def handle_function(self, node):
         nombre = node.value["nombre"]
         tipo_retorno = self.map_type(node.value["tipo"])
-        args = [self.map_type(p.value["tipo"]) for p in node.children if p.type == "Param"]
-        arg_nombres = [p.value["nombre"] for p in node.children if p.type == "Param"]
+        params = [p for p in node.children if p.type == "Param"]
 
         # ✅ Recuperar función pre-registrada (no volver a crearla)
         func = self.funcs[nombre]
@@ -346,17 +404,18 @@ class LLVMGeneratorLen:
         block = func.append_basic_block(name="entry")
         self.builder = ir.IRBuilder(block)
 
-        local_vars = self.variables.copy()  # incluir variables globales
-        self.variables = local_vars
+        # Las globales se buscan en self.globales: no hace falta copiarlas en cada función
+        self.variables = {}
+        self._declaradas = []
 
-        for i, arg in enumerate(func.args):
-            arg.name = arg_nombres[i]
+        for arg, param in zip(func.args, params):
+            arg.name = param.value["nombre"]
             ptr = self.builder.alloca(arg.type, name=arg.name)
             self.builder.store(arg, ptr)
-            self.variables[arg.name] = ptr
+            self.registrar_variable(param, arg.name, ptr)
 
         cuerpo = node.children[-1]
-        self.generate_block(cuerpo)
+        self.handle_block(cuerpo)
 
         if self.builder.block.terminator is None:
             if isinstance(func.function_type.return_type, ir.VoidType):
@@ -369,9 +428,6 @@ class LLVMGeneratorLen:
         fflush_ty = ir.FunctionType(ir.IntType(32), [voidptr_ty])
         return ir.Function(self.module, fflush_ty, name="fflush")
 
-    def generate_block(self, node):
-        for stmt in node.children:
-            self.generate(stmt)
 
     def handle_print(self, node):
         if not node.children:
@@ -451,39 +507,61 @@ class LLVMGeneratorLen:
         return fn
 
     def generate_expr(self, node):
+        return self.aplicar_conversion(self._generar_valor(node), node)
+
+    def aplicar_conversion(self, val, node):
+        # AST anotado: la conversión implícita ya la decidió el análisis semántico
+        conversion = getattr(node, "conversion", None)
+        if conversion is None:
+            return val
+        return self.convertir(val, node.tipo, conversion)
+
+    def convertir(self, val, origen, destino):
+        instruccion = CONVERSIONES.get((origen, destino))
+        if instruccion is None:
+            raise Exception(f"Conversión no soportada: {origen} → {destino}")
+        return getattr(self.builder, instruccion)(val, self.map_type(destino))
+
+    def ajustar_tipo(self, val, destino):
+        # Sin anotación, la conversión sale de los tipos de LLVM; None si no hay una implícita
+        if val.type == destino:
+            return val
+        origen, destino = _TIPOS_LEN.get(val.type), _TIPOS_LEN.get(destino)
+        if (origen, destino) not in CONVERSIONES:
+            return None
+        return self.convertir(val, origen, destino)
+
+    def _generar_valor(self, node):
         if node is None:
             raise Exception("Error: nodo es None")
-
-        if node.type == "Literal":
-            return self.handle_literal(node.value)
-
-        elif node.type == "Variable":
-            return self.handle_variable(node.value)
-
-        elif node.type == "BinaryOp":
-            lhs = self.generate_expr(node.children[0])
-            rhs = self.generate_expr(node.children[1])
-            lhs, rhs = self.promote_types(lhs, rhs)
-            return self.handle_binary_op(node.value, lhs, rhs)
-
-        elif node.type == "UnaryOp":
-            operand = self.generate_expr(node.children[0])
-            if node.value == "not":
-                if operand.type != ir.IntType(1):
-                    raise Exception(f"'not' requiere tipo booleano (i1), pero se recibió: {operand.type}")
-                return self.builder.not_(operand)
-            elif node.value == "+":
-                return operand  # no-op
-            elif node.value == "-":
-                zero = ir.Constant(operand.type, 0)
-                return self.builder.fsub(zero, operand) if operand.type == ir.DoubleType() else self.builder.sub(zero, operand)
-            else:
-                raise Exception(f"Operador unario no soportado: {node.value}")
-
-        elif node.type == "FunctionCall":
-            return self.handle_function_call(node)
-
-        raise Exception(f"No se pudo generar código para el nodo: {node}")
+        manejador = self._expresiones.get(node.type)
+        if manejador is None:
+            raise Exception(f"No se pudo generar código para el nodo: {node}")
+        return manejador(node)
+
+    def handle_binary_expr(self, node):
+        izquierdo, derecho = node.children
+        lhs = self._generar_valor(izquierdo)
+        rhs = self._generar_valor(derecho)
+        # Las conversiones de los operandos van después de evaluar ambos (como en promote_types)
+        lhs = self.aplicar_conversion(lhs, izquierdo)
+        rhs = self.aplicar_conversion(rhs, derecho)
+        lhs, rhs = self.promote_types(lhs, rhs)
+        return self.handle_binary_op(node.value, lhs, rhs)
+
+    def handle_unary_op(self, node):
+        operand = self.generate_expr(node.children[0])
+        if node.value == "not":
+            if operand.type != ir.IntType(1):
+                raise Exception(f"'not' requiere tipo booleano (i1), pero se recibió: {operand.type}")
+            return self.builder.not_(operand)
+        elif node.value == "+":
+            return operand  # no-op
+        elif node.value == "-":
+            zero = ir.Constant(operand.type, 0)
+            return self.builder.fsub(zero, operand) if operand.type == ir.DoubleType() else self.builder.sub(zero, operand)
+        else:
+            raise Exception(f"Operador unario no soportado: {node.value}")
 
     def handle_literal(self, value):
         if isinstance(value, bool):
@@ -517,11 +595,8 @@ class LLVMGeneratorLen:
         else:
             raise Exception(f"Tipo de literal no soportado: {type(value)}")
 
-    def handle_variable(self, name):
-        if name not in self.variables:
-            raise Exception(f"Variable '{name}' no declarada")
-        ptr = self.variables[name]
-        return self.builder.load(ptr)
+    def handle_variable(self, name, node=None):
+        return self.builder.load(self.buscar_variable(node, name))
 
     def promote_types(self, lhs, rhs):
         # Si ambos tipos ya son iguales, no se hace nada
@@ -544,52 +619,30 @@ class LLVMGeneratorLen:
 
 
     def handle_binary_op(self, op, lhs, rhs):
-        # Aritméticos
-        if op == "+":
-            if lhs.type == ir.PointerType(ir.IntType(8)) and rhs.type == ir.PointerType(ir.IntType(8)):
-                concat_fn = self.define_concat_function()
-                return self.builder.call(concat_fn, [lhs, rhs])
-            return self.builder.fadd(lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.add(lhs, rhs)
-        elif op == "-":
-            return self.builder.fsub(lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.sub(lhs, rhs)
-        elif op == "*":
-            return self.builder.fmul(lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.mul(lhs, rhs)
-        elif op == "/":
-            return self.builder.fdiv(lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.sdiv(lhs, rhs)
-        elif op == "%":
-            return self.builder.frem(lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.srem(lhs, rhs)
-        elif op == "^":
-            return self.handle_power(lhs, rhs)
-
-        # Relacionales
-        elif op == "<":
-            return self.builder.fcmp_ordered("<", lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.icmp_signed("<", lhs, rhs)
-        elif op == "<=":
-            return self.builder.fcmp_ordered("<=", lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.icmp_signed("<=", lhs, rhs)
-        elif op == ">":
-            return self.builder.fcmp_ordered(">", lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.icmp_signed(">", lhs, rhs)
-        elif op == ">=":
-            return self.builder.fcmp_ordered(">=", lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.icmp_signed(">=", lhs, rhs)
-        elif op == "==":
-            return self.builder.fcmp_ordered("==", lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.icmp_signed("==", lhs, rhs)
-        elif op == "!=":
-            return self.builder.fcmp_ordered("!=", lhs, rhs) if lhs.type == ir.DoubleType() else self.builder.icmp_signed("!=", lhs, rhs)
-
-        # Booleanos
-        elif op == "and":
-            if lhs.type == ir.IntType(1) and rhs.type == ir.IntType(1):
-                return self.builder.and_(lhs, rhs)
-            else:
-                raise Exception(f"'and' requiere booleanos: {lhs.type}, {rhs.type}")
-        elif op == "or":
-            if lhs.type == ir.IntType(1) and rhs.type == ir.IntType(1):
-                return self.builder.or_(lhs, rhs)
-            else:
-                raise Exception(f"'or' requiere booleanos: {lhs.type}, {rhs.type}")
-
-        else:
+        manejador = self._operadores.get(op)
+        if manejador is None:
             raise Exception(f"Operador binario no soportado: {op}")
-
+        return manejador(op, lhs, rhs)
+
+    def _aritmetica(self, op, lhs, rhs):
+        flotante, entera = _ARITMETICOS[op]
+        return getattr(self.builder, flotante if isinstance(lhs.type, ir.DoubleType) else entera)(lhs, rhs)
+
+    def _suma(self, op, lhs, rhs):
+        if lhs.type == ir.PointerType(ir.IntType(8)) and rhs.type == ir.PointerType(ir.IntType(8)):
+            concat_fn = self.define_concat_function()
+            return self.builder.call(concat_fn, [lhs, rhs])
+        return self._aritmetica(op, lhs, rhs)
+
+    def _comparacion(self, op, lhs, rhs):
+        if isinstance(lhs.type, ir.DoubleType):
+            return self.builder.fcmp_ordered(op, lhs, rhs)
+        return self.builder.icmp_signed(op, lhs, rhs)
+
+    def _logica(self, op, lhs, rhs):
+        if lhs.type == ir.IntType(1) and rhs.type == ir.IntType(1):
+            return self.builder.and_(lhs, rhs) if op == "and" else self.builder.or_(lhs, rhs)
+        raise Exception(f"'{op}' requiere booleanos: {lhs.type}, {rhs.type}")
 
 
     def handle_power(self, lhs, rhs):
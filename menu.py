@@ -1,13 +1,26 @@
+import time
+
+_INICIO_ARRANQUE = time.perf_counter()
+
+import argparse
 import os
 import subprocess
-import time
-from antlr4 import FileStream, CommonTokenStream, ParseTreeWalker
-from LenLexer import LenLexer
-from LenParser import LenParser
-from creador_ast import ASTBuilder
-from generador_len import LLVMGeneratorLen
-from SemanticoVal import SemanticListener, SemanticError
+import sys
 from SintacticoVal import validar_len_sintaxis_general
+from cache_compilacion import CacheCompilacion, TAMANO_MAXIMO_CACHE
+from diagnosticos import SEVERIDADES, ColectorDiagnosticos, Diagnostico, exportar_diagnosticos, limite_errores
+from metricas import RegistroMetricas, exportar_metricas
+
+# antlr4, el parser generado y llvmlite se importan dentro de la fase que los usa:
+# las acciones que no compilan (ejecutar un .ll, generar .exe, caché) arrancan sin cargarlos
+
+# previa: heurísticas de SintacticoVal en cada compilación; en_error: solo si el parser falla
+MODOS_VALIDACION = ("previa", "en_error")
+
+def reportar_arranque():
+    # CPU del proceso incluye el arranque del intérprete
+    print(f"[INFO] Arranque: {time.perf_counter() - _INICIO_ARRANQUE:.4f} seg "
+          f"(CPU del proceso: {time.process_time():.4f} seg)")
 
 def listar_archivos_txt(directorio="."):
     return [f for f in os.listdir(directorio) if f.endswith(".txt")]
@@ -18,125 +31,293 @@ def ejecutar_ll_con_lli(nombre_archivo_ll):
         inicio = time.perf_counter()
         
         # ✅ Ejecutar directamente sin capturar para ver salida en tiempo real
-        subprocess.run(["lli", nombre_archivo_ll])
+        sys.stdout.flush()
+        proceso = subprocess.run(["lli", nombre_archivo_ll], stderr=subprocess.PIPE, text=True, errors="replace")
         
         fin = time.perf_counter()
         print(f"[INFO] Tiempo de ejecución: {fin - inicio:.4f} segundos")
+        if proceso.returncode != 0:
+            print(f"✖ `lli` terminó con código {proceso.returncode}")
+            # Solo el inicio del error (un fallo de `lli` vuelca la pila completa)
+            for linea in proceso.stderr.splitlines()[:3]:
+                print(f"    {linea}")
+            return False
+        return True
 
     except FileNotFoundError:
         print("✖ Error: No se encontró `lli`. Asegúrate de tener LLVM instalado y `lli` disponible en PATH.")
     except Exception as e:
         print(f"✖ Error al ejecutar: {e}")
+    return False
+
 
+def leer_fuente(ruta):
+    # Única lectura del archivo: validadores, lexer y diagnósticos usan este texto
+    with open(ruta, "r", encoding="utf-8") as f:
+        return f.read()
 
-def encontrar_funciones(tree):
-    from LenParser import LenParser
-    for i in range(tree.getChildCount()):
-        hijo = tree.getChild(i)
-        if isinstance(hijo, LenParser.FuncionesContext):
-            return hijo
-        if hasattr(hijo, 'getChildCount') and hijo.getChildCount() > 0:
-            resultado = encontrar_funciones(hijo)
-            if resultado:
-                return resultado
-    return None
+def escribir_ll(texto_ir, archivo_salida):
+    with open(archivo_salida, "w", encoding="ascii", newline="\n") as f:
+        f.write(texto_ir)
+        f.flush()
+        os.fsync(f.fileno())
+
+def compilar_archivo(ruta, optimizar=False, modo_ejecucion="lli", pases=None, guardar_optimizado=False,
+                     ejecutar=True, cache=None, metricas=None, solo_verificar=False, binario=None,
+                     modo_parseo="dos_etapas", validacion="previa", max_errores=1, diagnosticos=None):
+    # `metricas` (RegistroMetricas) recibe el tiempo, CPU y memoria de cada fase.
+    # Con `solo_verificar` se detiene tras el análisis semántico (no carga llvmlite).
+    # `binario` ({"objetivo", "triple", "cpu", "features"}) genera un ejecutable nativo del módulo en memoria.
+    # `modo_parseo`: "dos_etapas" (SLL y, si falla, LL), "sll", "ll" o "rapido" (ver construir_ast_rapido)
+    # `validacion`: "previa" corre las heurísticas de SintacticoVal antes de parsear; "en_error" parsea
+    # primero y solo las corre para enriquecer el reporte cuando el parser encuentra errores
+    # `max_errores`: errores semánticos a reunir antes de detenerse (1 = el primero, 0 = sin límite)
+    # `diagnosticos` (ColectorDiagnosticos) recibe los errores y advertencias semánticos como registros.
+    metricas = metricas or RegistroMetricas()
+    # Propio si no viene uno: sus advertencias se guardan con la entrada de la caché
+    diagnosticos = diagnosticos if diagnosticos is not None else ColectorDiagnosticos()
+    nombre_base = os.path.splitext(ruta)[0]
+    archivo_salida = f"{nombre_base}.ll"
 
-def compilar_archivo(ruta, optimizar=False):
-    tiempos = {}
-    tiempo_total_inicio = time.perf_counter()  # Inicio total
+    nivel = None
+    if optimizar and not solo_verificar:
+        from optimizador import normalizar_nivel
+        try:
+            nivel = normalizar_nivel(optimizar)
+        except ValueError as e:
+            print(f"✖ {e}")
+            return None
+    if pases and not nivel:
+        nivel = "O0"
+    optimizado = bool(nivel)
+    if optimizado and ejecutar and modo_ejecucion == "lli":
+        # El módulo optimizado lo produce el LLVM de llvmlite: su IR en texto puede no ser legible
+        # para el `lli` del sistema (otra versión de LLVM), así que se ejecuta en memoria
+        print("[INFO] El módulo optimizado se ejecuta con JIT en memoria en lugar de `lli`.")
+        modo_ejecucion = "jit"
+
+    # Fase 0: Lectura única de la fuente
+    with metricas.fase('Lectura'):
+        fuente = leer_fuente(ruta)
+
+    # Caché: un acierto salta directo a la ejecución
+    clave_cache = None
+    if cache is not None and not solo_verificar:
+        with metricas.fase('Caché'):
+            clave_cache = cache.clave(fuente, nivel, pases, modo_parseo)
+            entrada = cache.obtener(clave_cache)
+            acierto = entrada and (not optimizado or entrada[1] is not None)
+            if acierto:
+                texto_ir, bitcode_opt, registros = entrada
+                # Las advertencias del análisis que se salta se reponen desde la entrada
+                for registro in registros:
+                    diagnosticos.agregar(Diagnostico(**registro))
+                diagnosticos.emitir(severidades=("advertencia",))
+                escribir_ll(texto_ir, archivo_salida)
+                print(f"✔ Resultado recuperado de la caché; archivo guardado como '{archivo_salida}'")
+        if acierto:
+            ir_a_ejecutar = bitcode_opt if optimizado else texto_ir
+            archivo_a_ejecutar = archivo_salida
+            if optimizado and guardar_optimizado:
+                from entorno_llvm import parsear_modulo
+                ir_a_ejecutar = parsear_modulo(bitcode_opt)
+                archivo_a_ejecutar = guardar_ir_optimizado(ir_a_ejecutar, nombre_base, metricas)
+            if binario and not generar_binario(bitcode_opt if optimizado else texto_ir, ruta, binario, metricas):
+                return None
+            if not ejecutar_ir(ir_a_ejecutar, archivo_a_ejecutar, modo_ejecucion, ejecutar, metricas):
+                return None
+            reportar_tiempos(metricas)
+            return archivo_salida
 
     # Fase 1: Validación sintáctica
-    tiempo_ini = time.perf_counter()
-    errores_sintacticos = validar_len_sintaxis_general(ruta)
+    if validacion not in MODOS_VALIDACION:
+        print(f"✖ Modo de validación desconocido '{validacion}'. Opciones: {', '.join(MODOS_VALIDACION)}")
+        return None
+    if validacion == "previa" and not validar_sintaxis(fuente, metricas):
+        return None
+
+    # Fases 2-4 con el parser rápido (opcional): sin árbol de ANTLR, con el análisis semántico sobre el AST
+    ast = None
+    if modo_parseo == "rapido" and not solo_verificar:
+        ast = construir_ast_rapido(fuente, metricas)
+
+    if ast is not None:
+        try:
+            generator = generar_llvm(ast, metricas, verificar=True)
+        except Exception as e:
+            print(f"[INFO] El AST del parser rápido no generó IR válido ({type(e).__name__}); se repite con ANTLR.")
+            ast = None
+
+    if ast is None:
+        # Fases 2-4: Lexer/Parser, Semántico y AST con ANTLR
+        ast = analizar_con_antlr(fuente, "dos_etapas" if modo_parseo == "rapido" else modo_parseo, metricas,
+                                 validacion, max_errores, diagnosticos)
+        if ast is None:
+            return None
+        if solo_verificar:
+            reportar_tiempos(metricas)
+            return ruta
+
+        # Fase 5: LLVM IR
+        generator = generar_llvm(ast, metricas)
+
+    # Fase 6: Escritura .ll
+    with metricas.fase('Escritura .ll'):
+        texto_ir = str(generator.module)
+        escribir_ll(texto_ir, archivo_salida)
+    print(f"✔ Archivo guardado como '{archivo_salida}'")
+
+    # Fase 7: Optimización en memoria (si aplica)
+    ir_a_ejecutar = generator.module
+    archivo_a_ejecutar = archivo_salida
+    if optimizado:
+        from optimizador import optimizar_modulo
+        with metricas.fase('Optimización'):
+            try:
+                ir_a_ejecutar, tiempos_pases = optimizar_modulo(generator.module, nivel=nivel, pases=pases)
+            except (RuntimeError, ValueError) as e:
+                print(f"✖ Error al optimizar: {e}")
+                return None
+            for nombre_pase, (pared, cpu) in tiempos_pases.items():
+                metricas.registrar(nombre_pase, pared, cpu)
+        descripcion = ", ".join(pases) if pases else f"-{nivel}"
+        print(f"✔ Optimización {descripcion} aplicada en memoria")
+
+        if guardar_optimizado:
+            archivo_a_ejecutar = guardar_ir_optimizado(ir_a_ejecutar, nombre_base, metricas)
+
+    if cache is not None:
+        with metricas.fase('Caché'):
+            cache.guardar(clave_cache, texto_ir, ir_a_ejecutar.as_bitcode() if optimizado else None,
+                          diagnosticos.advertencias)
+
+    # Fase 8: Ejecutable nativo (si se pide)
+    if binario and not generar_binario(ir_a_ejecutar, ruta, binario, metricas):
+        return None
+
+    # Fase 9: Ejecución IR
+    if not ejecutar_ir(ir_a_ejecutar, archivo_a_ejecutar, modo_ejecucion, ejecutar, metricas):
+        return None
+
+    reportar_tiempos(metricas)
+    return archivo_salida
+
+def validar_sintaxis(fuente, metricas, errores_parser=()):
+    # Heurísticas de SintacticoVal; los errores del parser (modo "en_error") se reportan después
+    with metricas.fase('Sintáctico'):
+        errores_sintacticos = validar_len_sintaxis_general(fuente, metricas) + list(errores_parser)
     if errores_sintacticos:
         print("✖ Errores sintácticos encontrados:")
         for err in errores_sintacticos:
             print(err)
-        return None
+        return False
     print("✔ Validación sintáctica completada.")
-    tiempos['Sintáctico'] = time.perf_counter() - tiempo_ini
-
-    # Fase 2: Lexer + Parser
-    tiempo_ini = time.perf_counter()
-    input_stream = FileStream(ruta, encoding='utf-8')
-    lexer = LenLexer(input_stream)
-    tokens = CommonTokenStream(lexer)
-    parser = LenParser(tokens)
-    tree = parser.prog()
-    tiempos['Lexer/Parser'] = time.perf_counter() - tiempo_ini
-
-    # Fase 3: Semántico
+    return True
+
+def analizar_con_antlr(fuente, modo_parseo, metricas, validacion="previa", max_errores=1, diagnosticos=None):
+    # Devuelve el AST, o None si el modo de parseo no es válido o (modo "en_error") hay errores
+    # de sintaxis; los errores semánticos se propagan
+    from cache_dfa import cargar_cache_dfa
+    from parseo_len import ColectorErroresSintaxis, parsear_fuente
+
+    # Fase 2: Lexer + Parser (el DFA de predicción guardado por ejecuciones anteriores se carga una vez)
+    colector = ColectorErroresSintaxis() if validacion == "en_error" else None
+    with metricas.fase('Lexer/Parser'):
+        cargar_cache_dfa()
+        try:
+            tree = parsear_fuente(fuente, modo_parseo, metricas, colector)
+        except ValueError as e:
+            print(f"✖ {e}")
+            return None
+    if colector is not None:
+        if colector.errores:
+            validar_sintaxis(fuente, metricas, colector.errores)
+            return None
+        print("✔ Validación sintáctica completada.")
+
+    # Fases 3-4: Semántico y AST en un solo recorrido del árbol
+    from analisis_fusionado import analizar_y_construir_ast
     print("👀 Validando semánticamente...")
-    tiempo_ini = time.perf_counter()
-    walker = ParseTreeWalker()
-    sem_listener = SemanticListener()
-    funciones_node = encontrar_funciones(tree)
-    if funciones_node:
-        sem_listener.pre_register_functions(funciones_node)
-    walker.walk(sem_listener, tree)
+    with metricas.fase('Semántico+AST'):
+        ast = analizar_y_construir_ast(tree, max_errores, diagnosticos)
+    del tree
     print("✔ Validación semántica completada.")
-    tiempos['Semántico'] = time.perf_counter() - tiempo_ini
-
-    # Fase 4: AST
-    tiempo_ini = time.perf_counter()
-    builder = ASTBuilder()
-    ast = builder.visit(tree)
     print("✔ AST construido correctamente")
-    tiempos['AST'] = time.perf_counter() - tiempo_ini
-
-    # Fase 5: LLVM IR
-    tiempo_ini = time.perf_counter()
-    generator = LLVMGeneratorLen()
-    llvm_module = generator.generate(ast)
+    return ast
+
+def construir_ast_rapido(fuente, metricas):
+    # Modo optimista: el parser propio arma el AST en una pasada y semantico_rapido aplica las
+    # reglas semánticas sobre él. Si no reconoce la entrada, o el análisis encuentra un error,
+    # un aviso o un caso dudoso, devuelve None y se usa la cadena completa de ANTLR
+    from parser_rapido import ErrorParseoRapido, parsear_rapido
+    from semantico_rapido import NoVerificable, verificar_ast_rapido
+    with metricas.fase('Parser rápido'):
+        try:
+            ast = parsear_rapido(fuente)
+        except ErrorParseoRapido as e:
+            print(f"[INFO] Parser rápido no aplicable ({e}); se usa ANTLR.")
+            return None
+    with metricas.fase('Semántico rápido'):
+        try:
+            verificar_ast_rapido(ast)
+        except NoVerificable as e:
+            print(f"[INFO] Análisis rápido no concluyente ({e}); se usa ANTLR.")
+            return None
+    print("✔ Validación semántica completada.")
+    print("✔ AST construido con el parser rápido")
+    return ast
+
+def generar_llvm(ast, metricas, verificar=False):
+    from cfg_len import podar_inalcanzable
+    from generador_len import LLVMGeneratorLen
+    with metricas.fase('Poda CFG'):
+        # Lo que nunca se ejecuta no llega al generador
+        podar_inalcanzable(ast)
+    with metricas.fase('LLVM Gen'):
+        generator = LLVMGeneratorLen()
+        generator.generate(ast)
+        if verificar:
+            # Sin análisis semántico previo, LLVM es quien rechaza un programa mal tipado
+            from entorno_llvm import parsear_modulo
+            parsear_modulo(str(generator.module))
     print("✔ LLVM IR generado correctamente")
-    tiempos['LLVM Gen'] = time.perf_counter() - tiempo_ini
+    return generator
+
+def guardar_ir_optimizado(modulo_optimizado, nombre_base, metricas):
+    archivo_opt = f"{nombre_base}_opt.ll"
+    with metricas.fase('Escritura opt'):
+        with open(archivo_opt, "w", encoding="ascii", newline="\n") as f:
+            f.write(str(modulo_optimizado))
+    print(f"✔ Archivo optimizado guardado como '{archivo_opt}'")
+    return archivo_opt
+
+def generar_binario(modulo, ruta, binario, metricas):
+    from emisor_nativo import generar_ejecutable
+    return generar_ejecutable(modulo, os.path.splitext(ruta)[0], metricas=metricas, ruta_fuente=ruta,
+                              **binario) is not None
+
+def ejecutar_ir(ir_a_ejecutar, archivo_a_ejecutar, modo_ejecucion, ejecutar, metricas):
+    if ejecutar and modo_ejecucion == "jit":
+        from ejecutor_jit import ejecutar_modulo_jit
+        return ejecutar_modulo_jit(ir_a_ejecutar, metricas) is not None
+    elif ejecutar:
+        with metricas.fase('Ejecución IR'):
+            return ejecutar_ll_con_lli(archivo_a_ejecutar)
+    return True
+
+def reportar_tiempos(metricas):
+    metricas.registrar_total()
 
-    # Fase 6: Escritura .ll
-    tiempo_ini = time.perf_counter()
-    nombre_base = os.path.splitext(ruta)[0]
-    archivo_salida = f"{nombre_base}.ll"
-    with open(archivo_salida, "w", encoding="ascii", newline="\n") as f:
-        f.write(str(generator.module))
-        f.flush()
-        os.fsync(f.fileno())
-    print(f"✔ Archivo guardado como '{archivo_salida}'")
-    tiempos['Escritura .ll'] = time.perf_counter() - tiempo_ini
-
-    # Fase 7: Optimización (si aplica)
-    if optimizar:
-        tiempo_ini = time.perf_counter()
-        archivo_opt = f"{nombre_base}_opt.ll"
-        resultado = subprocess.run(
-            ["opt", "-O2", archivo_salida, "-S", "-o", archivo_opt],
-            capture_output=True, text=True
-        )
-        if resultado.returncode != 0:
-            print("✖ Error al optimizar con `opt`:")
-            print(resultado.stderr)
-            return None
-        print(f"✔ Archivo optimizado guardado como '{archivo_opt}'")
-        tiempos['Optimización'] = time.perf_counter() - tiempo_ini
-
-        # Fase 8: Ejecución IR optimizado
-        tiempo_ini = time.perf_counter()
-        ejecutar_ll_con_lli(archivo_opt)
-        tiempos['Ejecución IR'] = time.perf_counter() - tiempo_ini
-    else:
-        # Fase 8: Ejecución IR sin optimizar
-        tiempo_ini = time.perf_counter()
-        ejecutar_ll_con_lli(archivo_salida)
-        tiempos['Ejecución IR'] = time.perf_counter() - tiempo_ini
-
-    # Tiempo total
-    tiempo_total_fin = time.perf_counter()
-    tiempos['TOTAL'] = tiempo_total_fin - tiempo_total_inicio
-
-    # Reporte final
     print("\n=== TIEMPOS DE FASES ===")
-    for fase, duracion in tiempos.items():
+    for fase, duracion in metricas.tiempos.items():
         print(f"{fase:15}: {duracion:.4f} seg")
-
-    return archivo_salida
+        if fase in ('Sintáctico', 'Lexer/Parser'):
+            for sub in metricas.subfases(fase):
+                print(f"  {sub['fase']:33}: {sub['tiempo_pared']:.4f} seg")
+    pases = {m["fase"]: (m["tiempo_pared"], m["tiempo_cpu"]) for m in metricas.subfases('Optimización')}
+    if pases:
+        from optimizador import imprimir_tiempos_pases
+        imprimir_tiempos_pases(pases)
 
 
 
@@ -160,40 +341,27 @@ def generar_exe_desde_ll():
         print("✖ Entrada no válida.")
         return
 
-    output_base = os.path.splitext(input_ll)[0]
-    output_obj = output_base + ".o"
-    output_exe = output_base + ".exe"
-
-    print("[INFO] Generando archivo objeto con llc...")
-    result_llc = subprocess.run(
-        ["llc", "-mtriple=x86_64-pc-windows-gnu", "-filetype=obj", input_ll, "-o", output_obj],
-        capture_output=True, text=True
-    )
-    if result_llc.returncode != 0:
-        print("[ERROR] Falló la compilación con llc:")
-        print(result_llc.stderr)
-        return
-
-    print("[INFO] Enlazando con x86_64-w64-mingw32-gcc...")
-    result_gcc = subprocess.run([
-        "x86_64-w64-mingw32-gcc", output_obj, "-o", output_exe
-    ], capture_output=True, text=True)
-    if result_gcc.returncode != 0:
-        print("[ERROR] Falló el enlace con mingw-w64:")
-        print(result_gcc.stderr)
-        return
+    objetivo = input("Objetivo (linux/windows) [linux]: ").strip().lower() or "linux"
+    cpu = input("CPU (Enter = genérico, 'native' = el de este equipo): ").strip()
 
-    print(f"[OK] Ejecutable generado: {output_exe}")
+    from emisor_nativo import generar_ejecutable
+    print("[INFO] Generando archivo objeto en proceso...")
+    with open(input_ll, "r", encoding="ascii") as f:
+        texto_ir = f.read()
+    generar_ejecutable(texto_ir, os.path.splitext(input_ll)[0], objetivo=objetivo, cpu=cpu, ruta_fuente=input_ll)
 
 
-def main():
+def menu_interactivo(cache=None):
+    modo_ejecucion = "lli"
     while True:
         print("\n=== MENÚ COMPILADOR LEN ===")
         print("1. Ejecutar sin optimizar")
-        print("2. Ejecutar con optimización -O2")
+        print("2. Ejecutar con optimización (O0-O3, Os o pases propios)")
         print("3. Ejecutar .ll optimizado manualmente")
-        print("4. Generar .exe para Windows")
-        print("5. Salir")
+        print("4. Generar ejecutable nativo (Linux o Windows)")
+        print(f"5. Cambiar modo de ejecución (actual: {modo_ejecucion})")
+        print("6. Ver / limpiar caché de compilación")
+        print("7. Salir")
 
         opcion = input("Seleccione una opción: ").strip()
 
@@ -209,7 +377,16 @@ def main():
                 print("Opcion inválida.")
                 continue
             ruta = archivos[idx - 1]
-            compilar_archivo(ruta, optimizar=(opcion == "2"))
+            if opcion == "1":
+                compilar_archivo(ruta, modo_ejecucion=modo_ejecucion, cache=cache)
+                continue
+            from optimizador import NIVELES_OPTIMIZACION
+            nivel = input(f"Nivel de optimización ({', '.join(NIVELES_OPTIMIZACION)}) [O2]: ").strip() or "O2"
+            pases = input("Pases propios separados por coma (Enter para usar el nivel): ").strip()
+            pases = [p.strip() for p in pases.split(",") if p.strip()] or None
+            guardar = input("¿Guardar el IR optimizado en disco? (s/N): ").strip().lower() == "s"
+            compilar_archivo(ruta, optimizar=nivel, modo_ejecucion=modo_ejecucion,
+                             pases=pases, guardar_optimizado=guardar, cache=cache)
 
         elif opcion == "3":
             ll_file = input("Ingrese nombre de archivo .ll manual: ").strip()
@@ -224,11 +401,117 @@ def main():
             generar_exe_desde_ll()
 
         elif opcion == "5":
+            modo_ejecucion = "jit" if modo_ejecucion == "lli" else "lli"
+            print(f"✔ Modo de ejecución: {modo_ejecucion}")
+
+        elif opcion == "6":
+            if cache is None:
+                print("✖ La caché está desactivada.")
+                continue
+            cache.imprimir_estadisticas()
+            if input("¿Limpiar la caché? (s/N): ").strip().lower() == "s":
+                print(f"✔ {cache.limpiar()} entrada(s) eliminada(s).")
+
+        elif opcion == "7":
             print("Saliendo del compilador.")
             break
 
         else:
             print("✖ Opción no válida.")
 
+def parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compilador Len. Sin argumentos abre el menú interactivo; "
+                    "con archivos o directorios compila en lote."
+    )
+    parser.add_argument("fuentes", nargs="*", help="Archivos .txt o directorios a compilar en lote")
+    parser.add_argument("-j", "--trabajadores", type=int, default=None,
+                        help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("-O", "--optimizar", default=None, metavar="NIVEL",
+                        help="Nivel de optimización (O0-O3, Os)")
+    parser.add_argument("--pases", default=None, help="Pases propios separados por coma")
+    parser.add_argument("--ejecutar", action="store_true", help="Ejecutar cada programa después de compilarlo")
+    parser.add_argument("--parseo", choices=("dos_etapas", "sll", "ll", "rapido"), default="dos_etapas",
+                        help="Predicción del parser: SLL con respaldo LL (por defecto), solo SLL, solo LL, "
+                             "o el parser rápido con análisis semántico conservador (con respaldo ANTLR)")
+    parser.add_argument("--validacion", choices=MODOS_VALIDACION, default="previa",
+                        help="Heurísticas de sintaxis antes de parsear (por defecto) o solo si el parser "
+                             "encuentra errores")
+    parser.add_argument("--max-errores", type=limite_errores, default=1, metavar="N",
+                        help="Errores semánticos a reportar antes de detenerse (por defecto 1; 0 = todos)")
+    parser.add_argument("--solo-verificar", action="store_true",
+                        help="Solo validar sintaxis y semántica, sin generar IR")
+    parser.add_argument("--modo", choices=("lli", "jit"), default="lli", help="Modo de ejecución")
+    parser.add_argument("--binario", choices=("linux", "windows"), default=None,
+                        help="Generar además un ejecutable nativo para el objetivo indicado")
+    parser.add_argument("--triple", default=None, help="Triple de destino del ejecutable (por defecto, el del objetivo)")
+    parser.add_argument("--cpu", default="", help="CPU de destino ('native' = el de este equipo)")
+    parser.add_argument("--features", default="", help="Extensiones del CPU, p. ej. +avx2,+fma")
+    parser.add_argument("--resumen-json", default=None, metavar="RUTA", help="Guardar el resumen del lote en JSON")
+    parser.add_argument("--metricas", default=None, metavar="RUTA",
+                        help="Exportar tiempo de pared, CPU y memoria por fase (.json o .csv)")
+    parser.add_argument("--diagnosticos", default=None, metavar="RUTA",
+                        help="Exportar errores y advertencias semánticos (.json o texto)")
+    parser.add_argument("--severidad", choices=SEVERIDADES, default="advertencia",
+                        help="Severidad mínima de los diagnósticos que se muestran y exportan")
+    parser.add_argument("--ignorar", default="", metavar="CODIGOS",
+                        help="Códigos de diagnóstico a omitir, separados por coma (p. ej. variable-sin-uso)")
+    parser.add_argument("--sin-cache", action="store_true", help="No usar la caché de compilación")
+    parser.add_argument("--cache-max-mb", type=float, default=TAMANO_MAXIMO_CACHE / (1024 * 1024),
+                        help="Tamaño máximo de la caché antes de desalojar (LRU)")
+    parser.add_argument("--cache-info", action="store_true", help="Mostrar el contenido de la caché y salir")
+    parser.add_argument("--cache-limpiar", action="store_true", help="Vaciar la caché y salir")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parsear_argumentos(argv)
+    cache = None if args.sin_cache else CacheCompilacion(tamano_maximo=int(args.cache_max_mb * 1024 * 1024))
+
+    if args.cache_info or args.cache_limpiar:
+        cache = cache or CacheCompilacion()
+        if args.cache_limpiar:
+            print(f"✔ {cache.limpiar()} entrada(s) eliminada(s) de la caché.")
+        if args.cache_info:
+            cache.imprimir_estadisticas()
+        return 0
+
+    reportar_arranque()
+    if not args.fuentes:
+        menu_interactivo(cache)
+        return 0
+
+    from compilacion_lote import compilar_lote, imprimir_resumen, guardar_resumen_json, recolectar_fuentes
+    archivos = recolectar_fuentes(args.fuentes)
+    if not archivos:
+        print("✖ No se encontraron archivos .txt para compilar.")
+        return 1
+
+    opciones = {
+        "optimizar": args.optimizar or False,
+        "pases": [p.strip() for p in args.pases.split(",") if p.strip()] if args.pases else None,
+        "modo_ejecucion": args.modo,
+        "ejecutar": args.ejecutar,
+        "cache": cache,
+        "solo_verificar": args.solo_verificar,
+        "modo_parseo": args.parseo,
+        "validacion": args.validacion,
+        "max_errores": args.max_errores,
+        "binario": {"objetivo": args.binario, "triple": args.triple, "cpu": args.cpu,
+                    "features": args.features} if args.binario else None,
+    }
+    filtro = {"severidad": args.severidad, "ignorar": [c.strip() for c in args.ignorar.split(",") if c.strip()]}
+    resultados = compilar_lote(archivos, opciones, trabajadores=args.trabajadores,
+                               medir_memoria=bool(args.metricas), diagnosticos=filtro)
+    imprimir_resumen(resultados)
+    if args.resumen_json:
+        guardar_resumen_json(resultados, args.resumen_json)
+    if args.metricas:
+        exportar_metricas(args.metricas, [fila for r in resultados for fila in r["mediciones"]])
+    if args.diagnosticos:
+        exportar_diagnosticos(args.diagnosticos, [d for r in resultados for d in r["diagnosticos"]])
+    return 0 if all(r["estado"] == 0 for r in resultados) else 1
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,111 @@
+import csv
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+CAMPOS_CSV = ("maquina", "fecha", "archivo", "fase", "padre", "tiempo_pared", "tiempo_cpu", "memoria_pico")
+
+
+def datos_maquina():
+    return {
+        "maquina": platform.node(),
+        "sistema": platform.platform(),
+        "python": platform.python_version(),
+        "procesadores": os.cpu_count(),
+    }
+
+
+class RegistroMetricas:
+    # Registra tiempo de pared, tiempo de CPU y pico de memoria de cada fase.
+    # Las fases pueden anidarse: una subfase guarda el nombre de su fase padre.
+    def __init__(self, medir_memoria=False, tiempos=None):
+        self.mediciones = []
+        self.medir_memoria = medir_memoria
+        # Diccionario compatible con el reporte clásico: solo fases de primer nivel
+        self.tiempos = {} if tiempos is None else tiempos
+        self._pila = []
+        self._inicio_pared = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+        self._inicio_memoria_propio = False
+        if medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._inicio_memoria_propio = True
+
+    def _padre(self):
+        return self._pila[-1]["fase"] if self._pila else None
+
+    @contextmanager
+    def fase(self, nombre):
+        medicion = {"fase": nombre, "padre": self._padre(), "tiempo_pared": 0.0,
+                    "tiempo_cpu": 0.0, "memoria_pico": None}
+        pico_padre = None
+        if self.medir_memoria:
+            # reset_peak es global: conservar el pico que llevaba la fase padre
+            pico_padre = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            medicion["_pico_hijos"] = 0
+
+        self._pila.append(medicion)
+        inicio_pared = time.perf_counter()
+        inicio_cpu = time.process_time()
+        try:
+            yield medicion
+        finally:
+            medicion["tiempo_pared"] = time.perf_counter() - inicio_pared
+            medicion["tiempo_cpu"] = time.process_time() - inicio_cpu
+            self._pila.pop()
+            if self.medir_memoria:
+                pico = max(tracemalloc.get_traced_memory()[1], medicion.pop("_pico_hijos"))
+                medicion["memoria_pico"] = pico
+                if self._pila:
+                    padre = self._pila[-1]
+                    padre["_pico_hijos"] = max(padre["_pico_hijos"], pico, pico_padre)
+            self._agregar(medicion)
+
+    def registrar(self, nombre, tiempo_pared, tiempo_cpu=None, memoria_pico=None):
+        # Para mediciones hechas fuera de Python (p. ej. los pases de LLVM)
+        self._agregar({"fase": nombre, "padre": self._padre(), "tiempo_pared": tiempo_pared,
+                       "tiempo_cpu": tiempo_cpu, "memoria_pico": memoria_pico})
+
+    def _agregar(self, medicion):
+        self.mediciones.append(medicion)
+        if medicion["padre"] is None:
+            self.tiempos[medicion["fase"]] = self.tiempos.get(medicion["fase"], 0.0) + medicion["tiempo_pared"]
+
+    def registrar_total(self):
+        memoria = None
+        if self.medir_memoria:
+            picos = [m["memoria_pico"] for m in self.mediciones if m["memoria_pico"] is not None]
+            memoria = max(picos + [tracemalloc.get_traced_memory()[1]])
+        self.registrar("TOTAL", time.perf_counter() - self._inicio_pared,
+                       time.process_time() - self._inicio_cpu, memoria)
+        if self._inicio_memoria_propio:
+            tracemalloc.stop()
+            self._inicio_memoria_propio = False
+
+    def subfases(self, padre):
+        return [m for m in self.mediciones if m["padre"] == padre]
+
+    def filas(self, archivo=None):
+        return [dict(m, archivo=archivo) for m in self.mediciones]
+
+
+def exportar_metricas(ruta, filas):
+    # El formato se elige por la extensión: .csv o .json
+    maquina = datos_maquina()
+    fecha = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    if ruta.lower().endswith(".csv"):
+        with open(ruta, "w", encoding="utf-8", newline="") as f:
+            escritor = csv.DictWriter(f, fieldnames=CAMPOS_CSV)
+            escritor.writeheader()
+            for fila in filas:
+                escritor.writerow({**fila, "maquina": maquina["maquina"], "fecha": fecha})
+    else:
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({"maquina": maquina, "fecha": fecha, "mediciones": filas}, f, ensure_ascii=False, indent=2)
+    print(f"✔ Métricas guardadas en '{ruta}'")
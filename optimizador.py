@@ -0,0 +1,116 @@
+import re
+import time
+
+import llvmlite.binding as llvm
+from entorno_llvm import crear_target_machine, parsear_modulo
+
+NIVELES_OPTIMIZACION = ("O0", "O1", "O2", "O3", "Os")
+
+# LLVM omite las columnas de usuario/sistema cuando valen cero, pero siempre
+# termina con usuario+sistema (si no es cero) y el tiempo de pared
+_PATRON_FILA_REPORTE = re.compile(r"^\s+((?:[\d.]+ \(\s*[\d.]+%\)\s+)+)(\S.*?)\s*$", re.MULTILINE)
+_PATRON_COLUMNA = re.compile(r"([\d.]+) \(\s*[\d.]+%\)")
+
+
+def normalizar_nivel(nivel):
+    # Acepta True, "O2", "-O2", "o2" o "2"
+    if nivel is True:
+        return "O2"
+    texto = str(nivel).strip().lstrip("-").lower()
+    if not texto.startswith("o"):
+        texto = "o" + texto
+    for valido in NIVELES_OPTIMIZACION:
+        if valido.lower() == texto:
+            return valido
+    raise ValueError(f"Nivel de optimización no soportado: '{nivel}'. Use uno de {', '.join(NIVELES_OPTIMIZACION)}.")
+
+
+def pases_disponibles():
+    prefijo, sufijo = "add_", "_pass"
+    return sorted(
+        nombre[len(prefijo):-len(sufijo)]
+        for nombre in dir(llvm.ModulePassManager)
+        if nombre.startswith(prefijo) and nombre.endswith(sufijo)
+    )
+
+
+def _opciones_pipeline(nivel):
+    if nivel == "Os":
+        # La API de llvmlite no expone el nivel de tamaño: se aproxima -Os con
+        # el pipeline O2 sin desenrollado/vectorización y con menos inlining
+        pto = llvm.create_pipeline_tuning_options(speed_level=2)
+        pto.loop_unrolling = False
+        pto.loop_vectorization = False
+        pto.slp_vectorization = False
+        pto.inlining_threshold = 50
+        return pto
+    return llvm.create_pipeline_tuning_options(speed_level=int(nivel[1]))
+
+
+def _leer_reporte_pases(reporte):
+    tiempos = {}
+    for columnas, nombre in _PATRON_FILA_REPORTE.findall(reporte):
+        if nombre == "Total":
+            continue
+        valores = [float(v) for v in _PATRON_COLUMNA.findall(columnas)]
+        pared = valores[-1]
+        cpu = valores[-2] if len(valores) >= 2 else 0.0
+        pared_acum, cpu_acum = tiempos.get(nombre, (0.0, 0.0))
+        tiempos[nombre] = (pared_acum + pared, cpu_acum + cpu)
+    return tiempos
+
+
+def _ejecutar_pases_personalizados(mod, target_machine, pases):
+    tiempos = {}
+    for pase in pases:
+        metodo = f"add_{pase}_pass"
+        pto = llvm.create_pipeline_tuning_options(speed_level=0)
+        pb = llvm.create_pass_builder(target_machine, pto)
+        mpm = llvm.create_new_module_pass_manager()
+        if not hasattr(mpm, metodo):
+            raise ValueError(f"Pase de optimización desconocido: '{pase}'. Disponibles: {', '.join(pases_disponibles())}.")
+        getattr(mpm, metodo)()
+
+        inicio_pared = time.perf_counter()
+        inicio_cpu = time.process_time()
+        mpm.run(mod, pb)
+        mpm.close()
+        pb.close()
+        pared_acum, cpu_acum = tiempos.get(pase, (0.0, 0.0))
+        tiempos[pase] = (
+            pared_acum + time.perf_counter() - inicio_pared,
+            cpu_acum + time.process_time() - inicio_cpu,
+        )
+    return tiempos
+
+
+def optimizar_modulo(modulo, nivel="O2", pases=None):
+    # Devuelve el ModuleRef optimizado y {pase: (tiempo_pared, tiempo_cpu)}
+    mod = parsear_modulo(modulo)
+    target_machine = crear_target_machine()
+
+    if pases:
+        tiempos_pases = _ejecutar_pases_personalizados(mod, target_machine, pases)
+    else:
+        nivel = normalizar_nivel(nivel)
+        pb = llvm.create_pass_builder(target_machine, _opciones_pipeline(nivel))
+        mpm = pb.getModulePassManager()
+        pb.start_pass_timing()
+        mpm.run(mod, pb)
+        tiempos_pases = _leer_reporte_pases(pb.finish_pass_timing())
+        mpm.close()
+        pb.close()
+
+    mod.verify()
+    return mod, tiempos_pases
+
+
+def imprimir_tiempos_pases(tiempos_pases, limite=15):
+    if not tiempos_pases:
+        return
+    ordenados = sorted(tiempos_pases.items(), key=lambda item: item[1][0], reverse=True)
+    print("\n=== TIEMPOS POR PASE ===")
+    for nombre, (pared, cpu) in ordenados[:limite]:
+        print(f"{nombre[:40]:40}: {pared:.4f} seg (CPU {cpu:.4f})")
+    if len(ordenados) > limite:
+        print(f"... y {len(ordenados) - limite} pases más")
@@ -0,0 +1,70 @@
+from antlr4 import InputStream, CommonTokenStream
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener, ErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from LenLexer import LenLexer
+from LenParser import LenParser
+
+# dos_etapas: SLL sin recuperación y, solo si falla, LL completo con reporte normal de errores
+MODOS_PARSEO = ("dos_etapas", "sll", "ll")
+
+
+class ColectorErroresSintaxis(ErrorListener):
+    # Guarda los errores del parser con el mismo formato que los validadores de SintacticoVal
+    def __init__(self):
+        self.errores = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errores.append(f"[Línea {line}, Columna {column + 1}] Error: {msg}")
+
+
+def crear_parser(fuente):
+    lexer = LenLexer(InputStream(fuente))
+    tokens = CommonTokenStream(lexer)
+    return LenParser(tokens)
+
+
+def _parsear_ll(parser):
+    parser._interp.predictionMode = PredictionMode.LL
+    return parser.prog()
+
+
+def _parsear_sll(parser):
+    parser._interp.predictionMode = PredictionMode.SLL
+    return parser.prog()
+
+
+def parsear_fuente(fuente, modo="dos_etapas", metricas=None, escucha=None):
+    # `escucha` (p. ej. ColectorErroresSintaxis) recibe los errores en lugar de la consola
+    if modo not in MODOS_PARSEO:
+        raise ValueError(f"Modo de parseo desconocido '{modo}'. Opciones: {', '.join(MODOS_PARSEO)}")
+    parser = crear_parser(fuente)
+    if escucha is not None:
+        for reconocedor in (parser.getTokenStream().tokenSource, parser):
+            reconocedor.removeErrorListeners()
+            reconocedor.addErrorListener(escucha)
+    if modo == "ll":
+        return _parsear_ll(parser)
+    if modo == "sll":
+        return _parsear_sll(parser)
+
+    # Etapa 1: SLL sin mensajes; el primer error cancela el parseo
+    parser.removeErrorListeners()
+    parser._errHandler = BailErrorStrategy()
+    try:
+        if metricas is None:
+            return _parsear_sll(parser)
+        with metricas.fase('SLL'):
+            return _parsear_sll(parser)
+    except ParseCancellationException:
+        pass
+
+    # Etapa 2: el error puede ser solo una limitación de SLL; LL completo decide
+    parser.reset()
+    parser.addErrorListener(escucha or ConsoleErrorListener.INSTANCE)
+    parser._errHandler = DefaultErrorStrategy()
+    if metricas is None:
+        return _parsear_ll(parser)
+    with metricas.fase('LL'):
+        return _parsear_ll(parser)
@@ -0,0 +1,379 @@
+import re
+
+from ast_node import ASTNode
+
+# Parser descendente recursivo de Len.g4 que arma los ASTNode en una sola pasada,
+# sin árbol de ANTLR ni ASTBuilder. Solo acepta entradas que ANTLR aceptaría sin
+# errores; ante cualquier duda lanza ErrorParseoRapido y el llamador usa ANTLR.
+
+
+class ErrorParseoRapido(Exception):
+    pass
+
+
+# Palabras clave sin distinción de mayúsculas (como [Mm][Ss][Tt] en la gramática)
+PALABRAS_CLAVE = {
+    "mst": "MOSTRAR", "ret": "RET", "for": "PARA", "no": "SINO", "do": "HACER", "si": "SI",
+    "loop": "LOP", "ini": "START", "prog": "PROGRAM", "fin": "END",
+    "str": "CADENA", "aut": "VAR", "bol": "BOOL", "flt": "DECIMAL", "vd": "VOID", "int": "ENTERO",
+}
+# Estas sí distinguen mayúsculas
+PALABRAS_EXACTAS = {"funs": "FUNS", "true": "BOOL_LIT", "false": "BOOL_LIT"}
+
+SIMBOLOS = {
+    "||": "O", "&&": "Y", "==": "IGUAL", "!=": "DIF", "<=": "MEN_IGUAL", ">=": "MAY_IGUAL",
+    "*": "MULT", "=": "ASIGN", "(": "PAR_IZQ", ">": "MAYOR", ";": "PUNTOCOMA", "-": "RESTA",
+    "{": "LLAVE_IZQ", "<": "MENOR", "^": "POTENCIA", ")": "PAR_DER", "/": "DIV", ",": "COMA",
+    "}": "LLAVE_DER", "!": "NOT", "+": "SUMA", "%": "RESIDUO",
+}
+
+TIPOS = {"ENTERO", "DECIMAL", "BOOL", "CADENA", "VOID"}
+
+_PATRON_TOKEN = re.compile(r"""
+    (?P<espacio>[ \t\r\n]+)
+  | (?P<comentario>\#[^\r\n]*)
+  | (?P<texto>"(?:[^"\\\r\n]|\\[\s\S])*")
+  | (?P<numero>[0-9]+(?:\.[0-9]+)?)
+  | (?P<id>[a-zA-Z][a-zA-Z0-9_]*)
+  | (?P<simbolo>\|\||&&|==|!=|<=|>=|[*=(>;\-{<^)/,}!+%])
+""", re.VERBOSE)
+
+# Niveles binarios de menor a mayor precedencia: token -> valor del nodo BinaryOp
+_OPERADORES_BINARIOS = (
+    {"O": "or"},
+    {"Y": "and"},
+    {"IGUAL": "==", "DIF": "!="},
+    {"MENOR": "<", "MAYOR": ">", "MEN_IGUAL": "<=", "MAY_IGUAL": ">="},
+    {"SUMA": "+", "RESTA": "-"},
+    {"MULT": "*", "DIV": "/", "RESIDUO": "%"},
+)
+
+
+def tokenizar(fuente):
+    tokens = []
+    linea = 1
+    posicion = 0
+    while posicion < len(fuente):
+        match = _PATRON_TOKEN.match(fuente, posicion)
+        if not match:
+            raise ErrorParseoRapido(f"Línea {linea}: carácter no reconocido {fuente[posicion]!r}")
+        clase = match.lastgroup
+        texto = match.group()
+        if clase == "id":
+            tipo = PALABRAS_EXACTAS.get(texto) or PALABRAS_CLAVE.get(texto.lower(), "ID")
+            tokens.append((tipo, texto, linea))
+        elif clase == "numero":
+            tokens.append(("NUMERO", texto, linea))
+        elif clase == "texto":
+            tokens.append(("TEXTO", texto, linea))
+        elif clase == "simbolo":
+            tokens.append((SIMBOLOS[texto], texto, linea))
+        linea += texto.count("\n")
+        posicion = match.end()
+    tokens.append(("EOF", "<EOF>", linea))
+    return tokens
+
+
+class ParserRapido:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    # ===== Utilidades =====
+
+    def _actual(self):
+        return self.tokens[self.pos][0]
+
+    def _siguiente(self):
+        return self.tokens[self.pos + 1][0] if self.pos + 1 < len(self.tokens) else "EOF"
+
+    def _consumir(self, tipo=None):
+        token = self.tokens[self.pos]
+        if tipo is not None and token[0] != tipo:
+            raise ErrorParseoRapido(f"Línea {token[2]}: se esperaba {tipo} y se encontró '{token[1]}'")
+        self.pos += 1
+        return token
+
+    def _aceptar(self, tipo):
+        if self.tokens[self.pos][0] == tipo:
+            self.pos += 1
+            return True
+        return False
+
+    # ===== Programa =====
+
+    def prog(self):
+        self._consumir("PROGRAM")
+        self._consumir("ID")
+        self._consumir("LLAVE_IZQ")
+        children = []
+        while self._actual() in TIPOS:
+            children.append(self.declaracion_global())
+        funciones = None
+        if self._actual() == "FUNS":
+            funciones = self.funciones()
+        bloque = self.bloque_program()
+        if funciones is None and self._actual() == "FUNS":
+            funciones = self.funciones()
+        if funciones is not None:
+            children.append(funciones)
+        children.append(bloque)
+        self._consumir("LLAVE_DER")
+        self._consumir("EOF")
+        return ASTNode("Program", children=children)
+
+    def declaracion_global(self):
+        tipo = self._consumir()[1].lower()
+        nombre = self._consumir("ID")[1]
+        expr = self.expr() if self._aceptar("ASIGN") else None
+        self._consumir("PUNTOCOMA")
+        return ASTNode("GlobalDeclaration", value={'tipo': tipo, 'nombre': nombre}, children=[expr] if expr else [])
+
+    def funciones(self):
+        self._consumir("FUNS")
+        self._consumir("LLAVE_IZQ")
+        funciones = []
+        while self._actual() != "LLAVE_DER":
+            funciones.append(self.funcion())
+        self._consumir("LLAVE_DER")
+        return ASTNode("Functions", children=funciones)
+
+    def funcion(self):
+        if self._actual() not in TIPOS:
+            token = self.tokens[self.pos]
+            raise ErrorParseoRapido(f"Línea {token[2]}: se esperaba una función y se encontró '{token[1]}'")
+        tipo_ret = self._consumir()[1].lower()
+        nombre = self._consumir("ID")[1]
+        self._consumir("PAR_IZQ")
+        parametros = []
+        if self._actual() != "PAR_DER":
+            parametros.append(self.param())
+            while self._aceptar("COMA"):
+                parametros.append(self.param())
+        self._consumir("PAR_DER")
+        cuerpo = self.bloque()
+        return ASTNode("Function", value={'nombre': nombre, 'tipo': tipo_ret}, children=parametros + [cuerpo])
+
+    def param(self):
+        if self._actual() not in TIPOS:
+            token = self.tokens[self.pos]
+            raise ErrorParseoRapido(f"Línea {token[2]}: se esperaba un tipo y se encontró '{token[1]}'")
+        tipo = self._consumir()[1].lower()
+        nombre = self._consumir("ID")[1]
+        return ASTNode("Param", value={'tipo': tipo, 'nombre': nombre})
+
+    def bloque_program(self):
+        self._consumir("START")
+        bloque = self.bloque()
+        self._consumir("END")
+        return bloque
+
+    def bloque(self):
+        self._consumir("LLAVE_IZQ")
+        sentencias = []
+        while self._actual() != "LLAVE_DER":
+            sentencias.append(self.sentencia())
+        self._consumir("LLAVE_DER")
+        return ASTNode("Block", children=sentencias)
+
+    # ===== Sentencias =====
+
+    def sentencia(self):
+        actual = self._actual()
+        if actual in TIPOS or actual == "VAR":
+            return self.declaracion()
+        if actual == "LLAVE_IZQ":
+            return self.bloque()
+        if actual == "SI":
+            return self.si()
+        if actual == "PARA":
+            return self.para()
+        if actual == "LOP":
+            return self.lop()
+        if actual == "HACER":
+            return self.hacer_lop()
+        if actual == "RET":
+            return self.retornar()
+        if actual == "MOSTRAR":
+            return self.mostrar()
+        # ANTLR resuelve 'expr ;' como 'asignacion ;': el nodo es el mismo
+        nodo = self.expr()
+        self._consumir("PUNTOCOMA")
+        return nodo
+
+    def declaracion(self):
+        if self._aceptar("VAR"):
+            nombre = self._consumir("ID")[1]
+            if not self._aceptar("ASIGN"):
+                # ASTBuilder no admite 'aut' sin valor; el análisis semántico da el error
+                raise ErrorParseoRapido(f"Línea {self.tokens[self.pos][2]}: 'aut' sin expresión")
+            expr = self.expr()
+            self._consumir("PUNTOCOMA")
+            return ASTNode("InferredDeclaration", value=nombre, children=[expr])
+        tipo = self._consumir()[1].lower()
+        nombre = self._consumir("ID")[1]
+        expr = self.expr() if self._aceptar("ASIGN") else None
+        self._consumir("PUNTOCOMA")
+        return ASTNode("Declaration", value={'tipo': tipo, 'nombre': nombre}, children=[expr] if expr else [])
+
+    def si(self):
+        self._consumir("SI")
+        self._consumir("PAR_IZQ")
+        cond = self.expr()
+        self._consumir("PAR_DER")
+        entonces = self.sentencia()
+        sino = self.sentencia() if self._aceptar("SINO") else None
+        return ASTNode("If", children=[cond, entonces] + ([sino] if sino else []))
+
+    def para(self):
+        self._consumir("PARA")
+        self._consumir("PAR_IZQ")
+        declaracion = None
+        expresiones = []
+        if self._actual() in TIPOS or self._actual() == "VAR":
+            declaracion = self.declaracion()
+        else:
+            expresiones.append(self.expr())
+            self._consumir("PUNTOCOMA")
+        if self._actual() != "PUNTOCOMA":
+            expresiones.append(self.expr())
+        self._consumir("PUNTOCOMA")
+        if self._actual() != "PAR_DER":
+            expresiones.append(self.expr())
+        self._consumir("PAR_DER")
+        cuerpo = self.sentencia()
+        # Igual que ASTBuilder.visitParaSentencia: toma expr(1) y expr(2) por posición
+        # entre las expresiones directas del 'for', haya o no declaración inicial
+        init = declaracion if declaracion else expresiones[0]
+        cond = expresiones[1] if len(expresiones) > 1 else None
+        step = expresiones[2] if len(expresiones) > 2 else None
+        return ASTNode("For", children=[init, cond, step, cuerpo])
+
+    def lop(self):
+        self._consumir("LOP")
+        self._consumir("PAR_IZQ")
+        cond = self.expr()
+        self._consumir("PAR_DER")
+        cuerpo = self.sentencia()
+        return ASTNode("While", children=[cond, cuerpo])
+
+    def hacer_lop(self):
+        self._consumir("HACER")
+        cuerpo = self.sentencia()
+        self._consumir("LOP")
+        self._consumir("PAR_IZQ")
+        cond = self.expr()
+        self._consumir("PAR_DER")
+        self._consumir("PUNTOCOMA")
+        return ASTNode("DoWhile", children=[cuerpo, cond])
+
+    def retornar(self):
+        self._consumir("RET")
+        expr = self.expr() if self._actual() != "PUNTOCOMA" else None
+        self._consumir("PUNTOCOMA")
+        return ASTNode("Return", children=[expr] if expr else [])
+
+    def mostrar(self):
+        self._consumir("MOSTRAR")
+        self._consumir("PAR_IZQ")
+        args = self.argumentos() if self._actual() != "PAR_DER" else []
+        self._consumir("PAR_DER")
+        self._consumir("PUNTOCOMA")
+        return ASTNode("Print", children=args)
+
+    # ===== Expresiones =====
+
+    def expr(self):
+        if self._actual() == "ID" and self._siguiente() == "ASIGN":
+            nombre = self._consumir()[1]
+            self._consumir("ASIGN")
+            return ASTNode("Assign", value=nombre, children=[self.expr()])
+        return self.binaria(0)
+
+    def binaria(self, nivel):
+        # Niveles asociativos por la izquierda, igual que las reglas recursivas de la gramática
+        if nivel == len(_OPERADORES_BINARIOS):
+            return self.potencia()
+        operadores = _OPERADORES_BINARIOS[nivel]
+        izquierda = self.binaria(nivel + 1)
+        while self._actual() in operadores:
+            op = operadores[self._consumir()[0]]
+            izquierda = ASTNode("BinaryOp", value=op, children=[izquierda, self.binaria(nivel + 1)])
+        return izquierda
+
+    def potencia(self):
+        base = self.unario()
+        if self._aceptar("POTENCIA"):
+            return ASTNode("BinaryOp", value="^", children=[base, self.potencia()])
+        return base
+
+    def unario(self):
+        if self._aceptar("NOT"):
+            return ASTNode("UnaryOp", value="not", children=[self.unario()])
+        if self._aceptar("SUMA"):
+            return ASTNode("UnaryOp", value="+", children=[self.unario()])
+        if self._aceptar("RESTA"):
+            return ASTNode("UnaryOp", value="-", children=[self.unario()])
+        return self.llamada()
+
+    def llamada(self):
+        token = self.tokens[self.pos]
+        primario = self.primary()
+        if self._actual() != "PAR_IZQ":
+            return primario
+        if primario.type != "Variable" or token[0] != "ID":
+            # ASTBuilder falla con llamadas sobre algo que no es un identificador
+            raise ErrorParseoRapido(f"Línea {token[2]}: llamada sobre una expresión que no es un nombre")
+        self._consumir("PAR_IZQ")
+        args = self.argumentos() if self._actual() != "PAR_DER" else []
+        self._consumir("PAR_DER")
+        if self._actual() == "PAR_IZQ":
+            raise ErrorParseoRapido(f"Línea {token[2]}: llamadas encadenadas")
+        return ASTNode("FunctionCall", value=primario.value, children=args)
+
+    def argumentos(self):
+        args = [self.expr()]
+        while self._aceptar("COMA"):
+            args.append(self.expr())
+        return args
+
+    def primary(self):
+        tipo, texto, linea = self._consumir()
+        if tipo == "PAR_IZQ":
+            expr = self.expr()
+            self._consumir("PAR_DER")
+            return expr
+        if tipo == "NUMERO":
+            return ASTNode("Literal", value=float(texto) if '.' in texto else int(texto))
+        if tipo == "BOOL_LIT":
+            return ASTNode("Literal", value=texto.lower() == 'true')
+        if tipo == "TEXTO":
+            return ASTNode("Literal", value=texto[1:-1])
+        if tipo == "ID":
+            return ASTNode("Variable", value=texto)
+        raise ErrorParseoRapido(f"Línea {linea}: expresión inesperada '{texto}'")
+
+
+def parsear_rapido(fuente):
+    # Devuelve el ASTNode raíz o lanza ErrorParseoRapido
+    try:
+        return ParserRapido(tokenizar(fuente)).prog()
+    except RecursionError:
+        raise ErrorParseoRapido("anidamiento demasiado profundo para el parser rápido")
+
+
+def diferencia_ast(a, b, ruta="Program"):
+    # Primera diferencia entre dos árboles (None si son idénticos); para las pruebas diferenciales
+    if a is None or b is None:
+        return None if a is b else f"{ruta}: {a!r} vs {b!r}"
+    if a.type != b.type:
+        return f"{ruta}: tipo {a.type} vs {b.type}"
+    if type(a.value) is not type(b.value) or a.value != b.value:
+        return f"{ruta}: valor {a.value!r} vs {b.value!r}"
+    if len(a.children) != len(b.children):
+        return f"{ruta}: {len(a.children)} hijos vs {len(b.children)}"
+    for i, (hijo_a, hijo_b) in enumerate(zip(a.children, b.children)):
+        diferencia = diferencia_ast(hijo_a, hijo_b, f"{ruta}/{hijo_a.type if hijo_a else None}[{i}]")
+        if diferencia:
+            return diferencia
+    return None
@@ -0,0 +1,76 @@
+; ModuleID = "len_module"
+target triple = "x86_64-unknown-linux-gnu"
+target datalayout = ""
+
+declare i32 @"printf"(i8* %".1", ...)
+
+declare i32 @"fflush"(i8* %".1")
+
+declare i8* @"malloc"(i64 %".1")
+
+declare i64 @"strlen"(i8* %".1")
+
+declare i8* @"memcpy"(i8* %".1", i8* %".2", i64 %".3")
+
+define void @"main"()
+{
+entry:
+  %".2" = bitcast [34 x i8]* @"str_21874619" to i8*
+  %".3" = bitcast [4 x i8]* @"fstr_140460952248400" to i8*
+  %".4" = call i32 (i8*, ...) @"printf"(i8* %".3", i8* %".2")
+  %".5" = call i32 @"fflush"(i8* null)
+  %"i" = alloca i32
+  store i32 0, i32* %"i"
+  br label %"while_cond"
+while_cond:
+  %".8" = load i32, i32* %"i"
+  %".9" = icmp sle i32 %".8", 45
+  br i1 %".9", label %"while_body", label %"while_end"
+while_body:
+  %"f" = alloca i32
+  %".11" = load i32, i32* %"i"
+  %".12" = call i32 @"fibonacci"(i32 %".11")
+  store i32 %".12", i32* %"f"
+  %".14" = load i32, i32* %"f"
+  %".15" = bitcast [4 x i8]* @"fstr_140460948562832" to i8*
+  %".16" = call i32 (i8*, ...) @"printf"(i8* %".15", i32 %".14")
+  %".17" = call i32 @"fflush"(i8* null)
+  %".18" = load i32, i32* %"i"
+  %".19" = add i32 %".18", 1
+  store i32 %".19", i32* %"i"
+  br label %"while_cond"
+while_end:
+  %".22" = bitcast [28 x i8]* @"str_82183861" to i8*
+  %".23" = bitcast [4 x i8]* @"fstr_140460948569104" to i8*
+  %".24" = call i32 (i8*, ...) @"printf"(i8* %".23", i8* %".22")
+  %".25" = call i32 @"fflush"(i8* null)
+  ret void
+}
+
+define i32 @"fibonacci"(i32 %"n")
+{
+entry:
+  %"n.1" = alloca i32
+  store i32 %"n", i32* %"n.1"
+  %".4" = load i32, i32* %"n.1"
+  %".5" = icmp sle i32 %".4", 1
+  br i1 %".5", label %"if_then", label %"if_else"
+if_then:
+  %".7" = load i32, i32* %"n.1"
+  ret i32 %".7"
+if_else:
+  %".9" = load i32, i32* %"n.1"
+  %".10" = sub i32 %".9", 1
+  %".11" = call i32 @"fibonacci"(i32 %".10")
+  %".12" = load i32, i32* %"n.1"
+  %".13" = sub i32 %".12", 2
+  %".14" = call i32 @"fibonacci"(i32 %".13")
+  %".15" = add i32 %".11", %".14"
+  ret i32 %".15"
+}
+
+@"str_21874619" = internal constant [34 x i8] c"Serie Fibonacci desde 0 hasta 45:\00"
+@"fstr_140460952248400" = internal constant [4 x i8] c"%s\0a\00"
+@"fstr_140460948562832" = internal constant [4 x i8] c"%d\0a\00"
+@"str_82183861" = internal constant [28 x i8] c"Fin del programa Fibonacci.\00"
+@"fstr_140460948569104" = internal constant [4 x i8] c"%s\0a\00"
\ No newline at end of file
@@ -0,0 +1,284 @@
+from cfg_len import garantiza_retorno
+from simbolos import Simbolo, mapear_tipo
+
+# Reglas de SemanticListener sobre el AST del parser rápido, para que el modo 'rapido' no se
+# salte el análisis semántico. Es conservador: ante cualquier error, advertencia o caso dudoso
+# lanza NoVerificable y el llamador repite con ANTLR, que da los diagnósticos exactos. Así un
+# programa solo sigue por el camino rápido si SemanticListener lo acepta sin advertencias.
+# Al aceptar deja el AST anotado como AnalizadorFusionado (tipo, conversion, simbolo).
+#
+# `marcar` sigue qué expresiones infiere SemanticListener: solo esas cuentan como lecturas de
+# variables (para los avisos de variable sin usar) y llevan anotaciones de tipo. No infiere las
+# condiciones de si y hacer-loop, ni las expresiones sueltas o las del for fuera de la condición;
+# las asignaciones sí se revisan siempre, estén donde estén.
+
+
+class NoVerificable(Exception):
+    pass
+
+
+_NUMERICOS = ("entero", "decimal")
+_VALORES = ("entero", "decimal", "bool", "cadena")
+_COMPARACIONES = frozenset(("<", ">", "<=", ">=", "==", "!="))
+_LOGICOS = frozenset(("and", "or"))
+
+
+class VerificadorRapido:
+    def __init__(self):
+        self.funciones = {}         # nombre -> (tipo de retorno, [tipos de los parámetros])
+        self.ambitos = [{}]         # nombre -> Simbolo por ámbito; el primero es el global
+        self._visibles = {}         # nombre -> pila de símbolos que se sombrean
+        self.tipo_retorno = None
+        self._sentencias = {
+            "Block": self._bloque,
+            "Declaration": self._declaracion,
+            "InferredDeclaration": self._declaracion_inferida,
+            "Print": self._mostrar,
+            "If": self._si,
+            "While": self._loop,
+            "DoWhile": self._hacer_loop,
+            "For": self._para,
+            "Return": self._retorno,
+        }
+        self._expresiones = {
+            "Literal": self._literal,
+            "Variable": lambda nodo, marcar: self._resolver(nodo, marcar).tipo,
+            "Assign": self._asignacion,
+            "BinaryOp": self._binaria,
+            "UnaryOp": self._unaria,
+            "FunctionCall": self._llamada,
+        }
+
+    def verificar(self, programa):
+        for hijo in programa.children:
+            if hijo.type == "Functions":
+                for funcion in hijo.children:
+                    nombre = funcion.value["nombre"]
+                    if nombre in self.funciones:
+                        raise NoVerificable(f"función '{nombre}' duplicada")
+                    params = [mapear_tipo(p.value["tipo"]) for p in funcion.children[:-1]]
+                    self.funciones[nombre] = (mapear_tipo(funcion.value["tipo"]), params)
+        for hijo in programa.children:
+            if hijo.type == "GlobalDeclaration":
+                # SemanticListener no revisa el valor inicial de una global
+                if hijo.children:
+                    raise NoVerificable("declaración global con valor inicial")
+                hijo.simbolo = self._declarar(hijo.value["nombre"], self._tipo_variable(hijo.value["tipo"]))
+            elif hijo.type == "Functions":
+                for funcion in hijo.children:
+                    self._funcion(funcion)
+            else:
+                self._sentencia(hijo)
+        return programa
+
+    # ===== Ámbitos y símbolos =====
+
+    def _tipo_variable(self, tipo_fuente):
+        tipo = mapear_tipo(tipo_fuente)
+        if tipo not in _VALORES:
+            raise NoVerificable(f"variable de tipo '{tipo}'")
+        return tipo
+
+    def _declarar(self, nombre, tipo):
+        ambito = self.ambitos[-1]
+        if nombre in ambito:
+            raise NoVerificable(f"variable '{nombre}' duplicada")
+        simbolo = Simbolo(nombre, tipo, len(self.ambitos) - 1, len(ambito))
+        ambito[nombre] = simbolo
+        self._visibles.setdefault(nombre, []).append(simbolo)
+        return simbolo
+
+    def _cerrar_ambito(self, avisar):
+        for nombre, simbolo in self.ambitos.pop().items():
+            pila = self._visibles[nombre]
+            pila.pop()
+            if not pila:
+                del self._visibles[nombre]
+            # SemanticListener avisa de las variables de un bloque que nunca se leen
+            if avisar and not simbolo.leida:
+                raise NoVerificable(f"variable '{nombre}' sin leer")
+
+    def _resolver(self, nodo, marcar):
+        pila = self._visibles.get(nodo.value)
+        if not pila:
+            raise NoVerificable(f"variable '{nodo.value}' no declarada")
+        simbolo = pila[-1]
+        if marcar:
+            simbolo.leida = True
+        nodo.simbolo = simbolo
+        return simbolo
+
+    def _convertir(self, nodo, origen, destino):
+        # Única conversión implícita de las reglas: entero -> decimal
+        if origen == "entero" and destino == "decimal":
+            nodo.conversion = destino
+
+    # ===== Sentencias =====
+
+    def _funcion(self, funcion):
+        *params, cuerpo = funcion.children
+        self.tipo_retorno = mapear_tipo(funcion.value["tipo"])
+        self.ambitos.append({})
+        for param in params:
+            param.simbolo = self._declarar(param.value["nombre"], self._tipo_variable(param.value["tipo"]))
+        self._sentencia(cuerpo)
+        self._cerrar_ambito(avisar=False)
+        if self.tipo_retorno != "void" and not garantiza_retorno(cuerpo):
+            raise NoVerificable(f"la función '{funcion.value['nombre']}' no garantiza un retorno")
+        self.tipo_retorno = None
+
+    def _sentencia(self, nodo):
+        regla = self._sentencias.get(nodo.type)
+        if regla is None:
+            # Expresión suelta ('f(x);', 'x = 1;')
+            self._expresion(nodo, False)
+        else:
+            regla(nodo)
+
+    def _bloque(self, nodo):
+        self.ambitos.append({})
+        for hijo in nodo.children:
+            self._sentencia(hijo)
+        self._cerrar_ambito(avisar=True)
+
+    def _declaracion(self, nodo):
+        tipo = self._tipo_variable(nodo.value["tipo"])
+        if nodo.children:
+            expr = nodo.children[0]
+            self._compatible(tipo, self._expresion(expr, True), expr)
+        nodo.simbolo = self._declarar(nodo.value["nombre"], tipo)
+        nodo.simbolo.asignada = bool(nodo.children)
+
+    def _declaracion_inferida(self, nodo):
+        tipo = self._expresion(nodo.children[0], True)
+        if tipo not in _VALORES:
+            raise NoVerificable(f"'aut' de tipo '{tipo}'")
+        nodo.simbolo = self._declarar(nodo.value, tipo)
+        nodo.simbolo.asignada = True
+
+    def _mostrar(self, nodo):
+        for arg in nodo.children:
+            if self._expresion(arg, True) not in _VALORES:
+                raise NoVerificable("mst de un valor void")
+
+    def _condicion(self, cond, marcar, permitidos):
+        tipo = self._expresion(cond, marcar)
+        if tipo not in permitidos:
+            raise NoVerificable(f"condición de tipo '{tipo}'")
+
+    def _si(self, nodo):
+        # Sin regla en SemanticListener: la condición no se infiere ni se exige bool
+        self._condicion(nodo.children[0], False, ("bool", "entero", "decimal"))
+        for rama in nodo.children[1:]:
+            self._sentencia(rama)
+
+    def _loop(self, nodo):
+        self._condicion(nodo.children[0], True, ("bool",))
+        self._sentencia(nodo.children[1])
+
+    def _hacer_loop(self, nodo):
+        self._sentencia(nodo.children[0])
+        self._condicion(nodo.children[1], False, ("bool", "entero", "decimal"))
+
+    def _para(self, nodo):
+        init, cond, paso, cuerpo = nodo.children
+        # Con declaración inicial SemanticListener revisa la condición antes de declarar la
+        # variable; sin condición avisa que el ciclo puede no terminar
+        if init.type in ("Declaration", "InferredDeclaration") or cond is None:
+            raise NoVerificable("for con declaración inicial o sin condición")
+        self._condicion(cond, True, ("bool",))
+        self._expresion(init, False)
+        if paso is not None:
+            self._expresion(paso, False)
+        self._sentencia(cuerpo)
+
+    def _retorno(self, nodo):
+        if self.tipo_retorno is None:
+            raise NoVerificable("'ret' fuera de una función")
+        tipo = self._expresion(nodo.children[0], True) if nodo.children else "void"
+        if tipo != self.tipo_retorno:
+            raise NoVerificable(f"retorno de tipo '{tipo}' en una función '{self.tipo_retorno}'")
+
+    # ===== Expresiones =====
+
+    def _expresion(self, nodo, marcar):
+        regla = self._expresiones.get(nodo.type)
+        if regla is None:
+            raise NoVerificable(f"expresión '{nodo.type}'")
+        tipo = regla(nodo, marcar)
+        if marcar:
+            nodo.tipo = tipo
+        return tipo
+
+    def _compatible(self, destino, origen, expr):
+        if origen != destino and not (destino == "decimal" and origen == "entero"):
+            raise NoVerificable(f"se asigna '{origen}' a '{destino}'")
+        self._convertir(expr, origen, destino)
+
+    def _literal(self, nodo, marcar):
+        valor = nodo.value
+        if isinstance(valor, bool):
+            return "bool"
+        if isinstance(valor, int):
+            return "entero"
+        if isinstance(valor, float):
+            return "decimal"
+        return "cadena"
+
+    def _asignacion(self, nodo, marcar):
+        # Revisada siempre (exitAsignacionExp): el valor se infiere y el destino cuenta como leído
+        valor = nodo.children[0]
+        tipo_valor = self._expresion(valor, True)
+        simbolo = self._resolver(nodo, True)
+        self._compatible(simbolo.tipo, tipo_valor, valor)
+        simbolo.asignada = True
+        return simbolo.tipo
+
+    def _binaria(self, nodo, marcar):
+        op = nodo.value
+        izquierdo, derecho = nodo.children
+        tipo_izq = self._expresion(izquierdo, marcar)
+        tipo_der = self._expresion(derecho, marcar)
+        if op in _LOGICOS:
+            if tipo_izq != "bool" or tipo_der != "bool":
+                raise NoVerificable(f"'{op}' con operandos '{tipo_izq}' y '{tipo_der}'")
+            return "bool"
+        if marcar:
+            self._convertir(izquierdo, tipo_izq, tipo_der)
+            self._convertir(derecho, tipo_der, tipo_izq)
+        if op == "+" and tipo_izq == tipo_der == "cadena":
+            return "cadena"
+        if op in ("==", "!=") and tipo_izq == tipo_der == "bool":
+            return "bool"
+        if tipo_izq not in _NUMERICOS or tipo_der not in _NUMERICOS:
+            raise NoVerificable(f"'{op}' con operandos '{tipo_izq}' y '{tipo_der}'")
+        if op in _COMPARACIONES:
+            return "bool"
+        return "decimal" if "decimal" in (tipo_izq, tipo_der) else "entero"
+
+    def _unaria(self, nodo, marcar):
+        tipo = self._expresion(nodo.children[0], marcar)
+        esperados = ("bool",) if nodo.value == "not" else _NUMERICOS
+        if tipo not in esperados:
+            raise NoVerificable(f"'{nodo.value}' con operando '{tipo}'")
+        return tipo
+
+    def _llamada(self, nodo, marcar):
+        firma = self.funciones.get(nodo.value)
+        if firma is None:
+            raise NoVerificable(f"función '{nodo.value}' no definida")
+        tipo_retorno, params = firma
+        if len(nodo.children) != len(params):
+            raise NoVerificable(f"llamada a '{nodo.value}' con {len(nodo.children)} argumento(s)")
+        for arg, tipo in zip(nodo.children, params):
+            if self._expresion(arg, marcar) != tipo:
+                raise NoVerificable(f"argumento inválido en la llamada a '{nodo.value}'")
+        return tipo_retorno
+
+
+def verificar_ast_rapido(programa):
+    # Devuelve el AST anotado o lanza NoVerificable (el llamador repite con ANTLR)
+    try:
+        return VerificadorRapido().verificar(programa)
+    except RecursionError:
+        raise NoVerificable("anidamiento demasiado profundo")
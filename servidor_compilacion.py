@@ -0,0 +1,295 @@
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from diagnosticos import limite_errores
+
+RUTA_SOCKET = os.environ.get("LEN_SOCKET") or os.path.join(tempfile.gettempdir(), f"len_compilador_{os.getuid()}.sock")
+
+# Segundos que puede correr el programa de un cliente antes de detenerlo
+LIMITE_EJECUCION = 10.0
+
+# Programa mínimo que se compila al arrancar para llenar la caché DFA del parser
+PROGRAMA_CALENTAMIENTO = """prog CALENTAR {
+    funs {
+        int doble(int n) {
+            si (n > 0) {
+                ret n * 2;
+            } no {
+                ret 0;
+            }
+        }
+    }
+    ini {
+        int i = 0;
+        flt x = 1.5;
+        loop (i < 3) {
+            mst(doble(i) + x);
+            i = i + 1;
+        }
+        mst("listo");
+    }
+    Fin
+}
+"""
+
+def nombre_programa(nombre):
+    # Nombre de archivo dentro del directorio temporal; None si el cliente mandó una ruta
+    if nombre is None:
+        return "programa.txt"
+    if not isinstance(nombre, str) or not nombre.strip() or nombre.startswith("."):
+        return None
+    if os.path.basename(nombre) != nombre or any(c in nombre for c in "/\\\0"):
+        return None
+    return os.path.splitext(nombre)[0] + ".txt"
+
+
+def compilar_solicitud(solicitud, cache=None, limite_ejecucion=LIMITE_EJECUCION):
+    from menu import compilar_archivo
+    from SemanticoVal import SemanticError
+    from diagnosticos import ColectorDiagnosticos
+    from ejecutor_jit import describir_fallo, ejecutar_aislado
+    from metricas import RegistroMetricas
+
+    fuente = solicitud.get("fuente")
+    if not isinstance(fuente, str):
+        return {"ok": False, "mensaje": "La solicitud no incluye 'fuente'."}
+    nombre = nombre_programa(solicitud.get("nombre"))
+    if nombre is None:
+        return {"ok": False, "mensaje": "El 'nombre' debe ser un nombre de archivo simple, sin rutas."}
+    max_errores = solicitud.get("max_errores", 1)
+    if type(max_errores) is not int or max_errores < 0:
+        return {"ok": False, "mensaje": "'max_errores' debe ser un entero >= 0 (0 = sin límite)."}
+
+    respuesta = {"ok": False, "mensaje": "", "salida": "", "ejecucion": "", "tiempos": {}}
+    metricas = RegistroMetricas()
+    diagnosticos = ColectorDiagnosticos()
+    salida = io.StringIO()
+    ejecutar = bool(solicitud.get("ejecutar"))
+    devolver_ir = bool(solicitud.get("devolver_ir"))
+
+    with tempfile.TemporaryDirectory(prefix="len_srv_") as directorio:
+        ruta = os.path.join(directorio, nombre)
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(fuente)
+
+        try:
+            # El programa no corre dentro del servidor: se compila aquí y se ejecuta aparte, en un
+            # proceso hijo con límite de tiempo; el IR optimizado queda en disco para ese paso
+            with redirect_stdout(salida):
+                resultado = compilar_archivo(
+                    ruta,
+                    optimizar=solicitud.get("optimizar") or False,
+                    pases=solicitud.get("pases"),
+                    modo_ejecucion="jit",
+                    guardar_optimizado=ejecutar or devolver_ir,
+                    validacion=solicitud.get("validacion") or "previa",
+                    max_errores=max_errores,
+                    ejecutar=False,
+                    cache=cache,
+                    metricas=metricas,
+                    diagnosticos=diagnosticos,
+                )
+            respuesta["ok"] = bool(resultado)
+        except SemanticError as e:
+            respuesta["mensaje"] = str(e)
+        except Exception as e:
+            respuesta["mensaje"] = f"{type(e).__name__}: {e}"
+
+        if respuesta["ok"] and (ejecutar or devolver_ir):
+            base = os.path.splitext(ruta)[0]
+            optimizado = f"{base}_opt.ll"
+            with open(optimizado if os.path.exists(optimizado) else f"{base}.ll", "r", encoding="ascii") as f:
+                texto_ir = f.read()
+            if devolver_ir:
+                respuesta["ir"] = texto_ir
+            if ejecutar:
+                with metricas.fase("Ejecución IR"):
+                    codigo, respuesta["ejecucion"] = ejecutar_aislado(texto_ir, limite_ejecucion)
+                fallo = describir_fallo(codigo, limite_ejecucion)
+                if fallo:
+                    respuesta["ok"] = False
+                    respuesta["mensaje"] = fallo
+
+        respuesta["salida"] = salida.getvalue()
+        respuesta["tiempos"] = metricas.tiempos
+        respuesta["diagnosticos"] = [d.a_dict() for d in diagnosticos.registros]
+
+    if not respuesta["ok"] and not respuesta["mensaje"]:
+        errores = [l for l in respuesta["salida"].splitlines() if l.startswith(("✖", "["))]
+        respuesta["mensaje"] = "\n".join(errores) or "La compilación falló."
+    return respuesta
+
+
+class ManejadorCompilacion(socketserver.StreamRequestHandler):
+    # Protocolo: una solicitud JSON por línea, una respuesta JSON por línea
+    def handle(self):
+        for linea in self.rfile:
+            if not linea.strip():
+                continue
+            try:
+                solicitud = json.loads(linea)
+            except ValueError as e:
+                self._responder({"ok": False, "mensaje": f"JSON inválido: {e}"})
+                continue
+
+            accion = solicitud.get("accion", "compilar")
+            if accion == "ping":
+                self._responder({"ok": True, "pid": os.getpid(), "atendidas": self.server.atendidas})
+            elif accion == "detener":
+                self._responder({"ok": True, "mensaje": "Servidor detenido."})
+                self.server.detener = True
+                return
+            elif accion == "compilar":
+                inicio = time.perf_counter()
+                respuesta = compilar_solicitud(solicitud, self.server.cache, self.server.limite_ejecucion)
+                respuesta["duracion"] = time.perf_counter() - inicio
+                self.server.atendidas += 1
+                self._responder(respuesta)
+            else:
+                self._responder({"ok": False, "mensaje": f"Acción desconocida: {accion}"})
+
+    def _responder(self, respuesta):
+        self.wfile.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class ServidorCompilacion(socketserver.UnixStreamServer):
+    # Atiende una conexión a la vez: el parser de ANTLR no se puede compartir entre hilos
+    def __init__(self, ruta_socket=RUTA_SOCKET, cache=None, limite_ejecucion=LIMITE_EJECUCION):
+        self.cache = cache
+        self.limite_ejecucion = limite_ejecucion
+        self.atendidas = 0
+        self.detener = False
+        if os.path.exists(ruta_socket):
+            os.remove(ruta_socket)
+        super().__init__(ruta_socket, ManejadorCompilacion)
+        os.chmod(ruta_socket, 0o600)
+
+    def calentar(self):
+        # Importa la cadena completa, inicializa LLVM y llena la caché DFA del parser
+        from entorno_llvm import inicializar_llvm
+        inicio = time.perf_counter()
+        inicializar_llvm()
+        respuesta = compilar_solicitud({"fuente": PROGRAMA_CALENTAMIENTO, "ejecutar": True},
+                                       limite_ejecucion=self.limite_ejecucion)
+        estado = "✔" if respuesta["ok"] else "✖"
+        print(f"{estado} Calentamiento en {time.perf_counter() - inicio:.4f} seg")
+        if not respuesta["ok"]:
+            print(respuesta["mensaje"])
+
+    def servir(self):
+        print(f"[INFO] Servidor de compilación escuchando en {self.server_address}")
+        try:
+            while not self.detener:
+                self.handle_request()
+        except KeyboardInterrupt:
+            print("\n[INFO] Servidor interrumpido.")
+        finally:
+            self.server_close()
+            if os.path.exists(self.server_address):
+                os.remove(self.server_address)
+
+
+def enviar_solicitud(solicitud, ruta_socket=RUTA_SOCKET, timeout=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as cliente:
+        cliente.settimeout(timeout)
+        cliente.connect(ruta_socket)
+        cliente.sendall(json.dumps(solicitud, ensure_ascii=False).encode("utf-8") + b"\n")
+        with cliente.makefile("rb") as respuesta:
+            linea = respuesta.readline()
+    if not linea:
+        raise ConnectionError("El servidor cerró la conexión sin responder.")
+    return json.loads(linea)
+
+
+def parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Servidor de compilación Len: mantiene ANTLR y LLVM cargados entre compilaciones."
+    )
+    parser.add_argument("archivo", nargs="?", help="Con --cliente: archivo .txt a compilar")
+    parser.add_argument("--socket", default=RUTA_SOCKET, help="Ruta del socket Unix")
+    parser.add_argument("--cliente", action="store_true", help="Enviar el archivo a un servidor ya iniciado")
+    parser.add_argument("--detener", action="store_true", help="Detener el servidor")
+    parser.add_argument("-O", "--optimizar", default=None, metavar="NIVEL", help="Nivel de optimización")
+    parser.add_argument("--pases", default=None, help="Pases propios separados por coma")
+    parser.add_argument("--ejecutar", action="store_true",
+                        help="Ejecutar el programa con JIT en un proceso hijo del servidor")
+    parser.add_argument("--limite-ejecucion", type=float, default=LIMITE_EJECUCION, metavar="SEG",
+                        help="Segundos que puede correr un programa antes de detenerlo")
+    parser.add_argument("--ir", action="store_true", help="Mostrar el IR generado")
+    parser.add_argument("--validacion", choices=("previa", "en_error"), default="previa",
+                        help="Heurísticas de sintaxis antes de parsear o solo si el parser encuentra errores")
+    parser.add_argument("--max-errores", type=limite_errores, default=1, metavar="N",
+                        help="Errores semánticos a reportar antes de detenerse (0 = todos)")
+    parser.add_argument("--sin-cache", action="store_true", help="El servidor no usa la caché de compilación")
+    parser.add_argument("--timeout", type=float, default=None, help="Segundos máximos de espera del cliente")
+    return parser.parse_args(argv)
+
+
+def ejecutar_cliente(args):
+    if args.detener:
+        solicitud = {"accion": "detener"}
+    elif args.archivo:
+        with open(args.archivo, "r", encoding="utf-8") as f:
+            solicitud = {
+                "accion": "compilar",
+                "fuente": f.read(),
+                "nombre": os.path.basename(args.archivo),
+                "optimizar": args.optimizar,
+                "pases": [p.strip() for p in args.pases.split(",") if p.strip()] if args.pases else None,
+                "ejecutar": args.ejecutar,
+                "devolver_ir": args.ir,
+                "validacion": args.validacion,
+                "max_errores": args.max_errores,
+            }
+    else:
+        solicitud = {"accion": "ping"}
+
+    try:
+        respuesta = enviar_solicitud(solicitud, args.socket, args.timeout)
+    except (OSError, ConnectionError) as e:
+        print(f"✖ No se pudo contactar al servidor en '{args.socket}': {e}")
+        return 1
+
+    if solicitud["accion"] != "compilar":
+        print(json.dumps(respuesta, ensure_ascii=False))
+        return 0 if respuesta.get("ok") else 1
+
+    print(respuesta.get("salida", ""), end="")
+    if respuesta.get("ejecucion"):
+        print("\n=== SALIDA DEL PROGRAMA ===")
+        print(respuesta["ejecucion"], end="")
+    if respuesta.get("ir"):
+        print("\n=== LLVM IR ===")
+        print(respuesta["ir"])
+    mensaje = respuesta.get("mensaje", "")
+    if not respuesta.get("ok") and mensaje not in respuesta.get("salida", ""):
+        print(f"✖ {mensaje}")
+    print(f"[INFO] Respuesta del servidor en {respuesta.get('duracion', 0.0):.4f} segundos")
+    return 0 if respuesta.get("ok") else 1
+
+
+def main(argv=None):
+    args = parsear_argumentos(argv)
+    if args.cliente or args.detener:
+        return ejecutar_cliente(args)
+
+    cache = None
+    if not args.sin_cache:
+        from cache_compilacion import CacheCompilacion
+        cache = CacheCompilacion()
+    servidor = ServidorCompilacion(args.socket, cache, args.limite_ejecucion)
+    servidor.calentar()
+    servidor.servir()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
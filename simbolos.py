@@ -0,0 +1,35 @@
+# Símbolos y nombres de tipo compartidos por SemanticoVal y semantico_rapido (sin depender de ANTLR)
+
+_TIPOS = {
+    "int": "entero", "entero": "entero",
+    "flt": "decimal", "decimal": "decimal",
+    "str": "cadena", "cadena": "cadena",
+    "bool": "bool", "bol": "bool",
+    "void": "void", "vd": "void",
+}
+
+
+def mapear_tipo(tipo_fuente):
+    # Palabra de tipo del programa (int, flt, str, bol, vd...) -> tipo semántico
+    t = tipo_fuente.lower()
+    return _TIPOS.get(t, t)
+
+
+class Simbolo:
+    # Variable declarada: ámbito (profundidad en la pila de ámbitos) y posición dentro de él (slot).
+    # De la declaración guarda solo línea y columna: el AST anotado lleva los símbolos hasta la
+    # generación de código y un contexto de ANTLR mantendría vivo todo el árbol de parseo
+    __slots__ = ("nombre", "tipo", "profundidad", "slot", "asignada", "leida", "linea", "columna")
+
+    def __init__(self, nombre, tipo, profundidad, slot, linea=None, columna=None):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.profundidad = profundidad
+        self.slot = slot
+        self.asignada = False
+        self.leida = False
+        self.linea = linea
+        self.columna = columna
+
+    def __repr__(self):
+        return f"Simbolo({self.nombre}: {self.tipo}, ámbito {self.profundidad}, slot {self.slot})"